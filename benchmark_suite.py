@@ -0,0 +1,345 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 可复现的基准测试套件
+在合成语料（见 synthetic_pdf）上按 文档 x 后端 x 引擎 x 工作数 x 批次大小 运行完整转换，
+记录每个场景的用时、页/秒和峰值内存（RSS，含工作进程和java子进程），结果写入JSON；
+与保存的基线比较时，速度下降或峰值内存增长超过阈值、表格数变化或转换失败的场景标记为回归（退出码1）
+
+每个场景在独立的子进程中运行：JVM、内存状态不会从上一个场景带过来，峰值内存只属于本场景；
+不使用提取结果缓存和版式模板
+
+示例:
+    python benchmark_suite.py run -o baseline.json
+    python benchmark_suite.py run -o current.json --baseline baseline.json
+    python benchmark_suite.py run --max-pages 10000 --engines process --workers 2,4 --batch-sizes auto,100
+    python benchmark_suite.py compare baseline.json current.json
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+
+import psutil
+
+from synthetic_pdf import generate_corpus
+from tabula_backend import BACKEND_AUTO, BACKEND_MODES
+from extraction_pool import ENGINE_THREAD, ENGINE_PROCESS, ENGINES
+from output_formats import OUTPUT_FORMATS, FORMAT_EXTENSIONS
+
+# 结果文件格式版本
+SUITE_FORMAT_VERSION = 1
+DEFAULT_CORPUS_DIR = os.path.join(tempfile.gettempdir(), "pdf2excel_benchmark_corpus")
+# 默认只运行不超过这么多页的文档（10000页的文档用 --max-pages 10000 加入）
+DEFAULT_MAX_PAGES = 1000
+DEFAULT_ENGINES = (ENGINE_THREAD, ENGINE_PROCESS)
+DEFAULT_WORKERS = (1, 2, 4)
+DEFAULT_BATCH_SIZES = (None, 20, 100)  # None为按预扫描自适应划分
+# 峰值内存的采样间隔（秒）
+RSS_SAMPLE_INTERVAL = 0.05
+# 页/秒下降超过此比例、峰值内存增长超过此比例时判为回归
+MAX_SPEED_REGRESSION = 0.15
+MAX_MEMORY_REGRESSION = 0.25
+
+def batch_label(batch_size):
+    return "auto" if batch_size is None else str(batch_size)
+
+def scenario_id(scenario):
+    """场景的稳定标识，用于与基线配对"""
+    return (f"{scenario['document']}/{scenario['backend']}/{scenario['engine']}"
+            f"/w{scenario['workers']}/b{batch_label(scenario['batch_size'])}")
+
+def build_scenarios(manifest, backends, engines, workers_list, batch_sizes, output_format):
+    """语料中每个文档与各组设置的笛卡尔积"""
+    scenarios = []
+    for document, info in manifest.items():
+        for backend in backends:
+            for engine in engines:
+                for workers in workers_list:
+                    for batch_size in batch_sizes:
+                        scenarios.append({
+                            "document": document, "pdf_path": info["path"], "pages": info["pages"],
+                            "backend": backend, "engine": engine, "workers": workers,
+                            "batch_size": batch_size, "format": output_format,
+                        })
+    return scenarios
+
+def run_scenario(scenario):
+    """在当前进程中运行一个场景（由子进程调用），返回 {ok, seconds, tables, message}"""
+    from converter_engine import convert_pdf_to_excel
+
+    status = {"message": "", "tables": 0}
+
+    def progress(percent, status_text, tables_found):
+        status["message"] = status_text
+        status["tables"] = tables_found
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        output_path = os.path.join(output_dir, "output" + FORMAT_EXTENSIONS[scenario["format"]])
+        start_time = time.perf_counter()
+        ok = convert_pdf_to_excel(
+            scenario["pdf_path"], output_path, progress, {"cancel": False},
+            backend=scenario["backend"], engine=scenario["engine"], use_cache=False,
+            workers=scenario["workers"], batch_size=scenario["batch_size"],
+            output_format=scenario["format"], use_templates=False
+        )
+        seconds = time.perf_counter() - start_time
+    return {"ok": ok, "seconds": seconds, "tables": status["tables"], "message": status["message"]}
+
+def _tree_rss_mb(process):
+    """进程及其所有子进程的RSS之和（MB），进程已退出时为None"""
+    try:
+        processes = [process] + process.children(recursive=True)
+    except psutil.Error:
+        return None
+    total = 0
+    for member in processes:
+        try:
+            total += member.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / 1024 / 1024
+
+def measure_scenario(scenario, timeout=None):
+    """
+    在子进程中运行一个场景，同时采样整个进程树的峰值内存
+
+    返回 {ok, seconds, tables, message, peak_rss_mb}；子进程失败时ok为False，message为标准错误的末尾
+    """
+    command = [sys.executable, os.path.abspath(__file__), "_scenario", json.dumps(scenario)]
+    child = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                             stdin=subprocess.DEVNULL, cwd=os.path.dirname(os.path.abspath(__file__)))
+    peak = {"rss_mb": 0.0}
+    done = threading.Event()
+
+    def sample():
+        process = psutil.Process(child.pid)
+        while not done.is_set():
+            usage = _tree_rss_mb(process)
+            if usage is not None:
+                peak["rss_mb"] = max(peak["rss_mb"], usage)
+            done.wait(RSS_SAMPLE_INTERVAL)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        stdout, stderr = child.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        child.kill()
+        stdout, stderr = child.communicate()
+    finally:
+        done.set()
+        sampler.join()
+
+    result = None
+    for line in stdout.decode("utf-8", errors="replace").splitlines():
+        if line.startswith("{"):
+            result = json.loads(line)
+    if child.returncode != 0 or result is None:
+        tail = stderr.decode("utf-8", errors="replace").strip().splitlines()[-3:]
+        result = {"ok": False, "seconds": None, "tables": 0,
+                  "message": " | ".join(tail) or f"子进程退出码 {child.returncode}"}
+    result["peak_rss_mb"] = round(peak["rss_mb"], 1)
+    return result
+
+def environment_info():
+    """运行环境，比较不同机器上的结果时作为提示"""
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "memory_mb": round(psutil.virtual_memory().total / 1024 / 1024),
+    }
+
+def run_suite(scenarios, manifest, repeat=1, timeout=None, progress=print):
+    """
+    依次运行所有场景，每个场景重复repeat次，用时取中位数、峰值内存取最大值
+
+    返回结果字典（可直接写入JSON）
+    """
+    results = []
+    for idx, scenario in enumerate(scenarios, start=1):
+        runs = [measure_scenario(scenario, timeout) for _ in range(repeat)]
+        times = [run["seconds"] for run in runs if run["ok"]]
+        ok = len(times) == len(runs)
+        seconds = statistics.median(times) if times else None
+        entry = {key: value for key, value in scenario.items() if key != "pdf_path"}
+        entry.update({
+            "id": scenario_id(scenario),
+            "ok": ok,
+            "seconds": round(seconds, 3) if seconds is not None else None,
+            "runs": [round(run["seconds"], 3) if run["ok"] else None for run in runs],
+            "pages_per_second": round(scenario["pages"] / seconds, 2) if seconds else None,
+            "peak_rss_mb": max(run["peak_rss_mb"] for run in runs),
+            "tables": runs[-1]["tables"],
+        })
+        if not ok:
+            entry["message"] = next(run["message"] for run in runs if not run["ok"])
+        results.append(entry)
+        speed = f"{entry['pages_per_second']:.1f}页/秒" if entry["pages_per_second"] else "失败"
+        progress(f"[{idx}/{len(scenarios)}] {entry['id']}: {speed}，峰值内存 {entry['peak_rss_mb']:.0f}MB，"
+                 f"{entry['tables']}个表格")
+    return {
+        "format": SUITE_FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "environment": environment_info(),
+        "corpus": {name: {"pages": info["pages"], "sha256": info["sha256"]} for name, info in manifest.items()},
+        "scenarios": results,
+    }
+
+def compare_results(baseline, current, max_speed_regression=MAX_SPEED_REGRESSION,
+                    max_memory_regression=MAX_MEMORY_REGRESSION):
+    """
+    与基线逐场景比较
+
+    返回列表 [(场景标识, 基线页/秒, 当前页/秒, 基线峰值内存, 当前峰值内存, 问题列表)]，
+    只包含两边都有的场景；问题列表非空即为回归。语料内容不同（SHA-256不一致）的文档不比较
+    """
+    changed_documents = {name for name, info in current.get("corpus", {}).items()
+                         if name in baseline.get("corpus", {})
+                         and baseline["corpus"][name]["sha256"] != info["sha256"]}
+    baseline_by_id = {entry["id"]: entry for entry in baseline["scenarios"]}
+    rows = []
+    for entry in current["scenarios"]:
+        reference = baseline_by_id.get(entry["id"])
+        if reference is None or entry["document"] in changed_documents:
+            continue
+        problems = []
+        if reference["ok"] and not entry["ok"]:
+            problems.append("转换失败")
+        elif reference["ok"] and entry["ok"]:
+            speed_change = entry["pages_per_second"] / reference["pages_per_second"] - 1
+            if speed_change < -max_speed_regression:
+                problems.append(f"速度下降{-speed_change:.0%}")
+            if reference["peak_rss_mb"]:
+                memory_change = entry["peak_rss_mb"] / reference["peak_rss_mb"] - 1
+                if memory_change > max_memory_regression:
+                    problems.append(f"内存增长{memory_change:.0%}")
+            if entry["tables"] != reference["tables"]:
+                problems.append(f"表格数 {reference['tables']}→{entry['tables']}")
+        rows.append((entry["id"], reference["pages_per_second"], entry["pages_per_second"],
+                     reference["peak_rss_mb"], entry["peak_rss_mb"], problems))
+    return rows
+
+def print_comparison(baseline, current, rows):
+    """打印比较结果，返回回归的场景数"""
+    if baseline.get("environment") != current.get("environment"):
+        print("注意: 基线与本次结果的运行环境不同，速度和内存的差异可能来自机器本身")
+        print(f"  基线: {baseline.get('environment')}")
+        print(f"  本次: {current.get('environment')}")
+    changed = sorted(name for name, info in current.get("corpus", {}).items()
+                     if name in baseline.get("corpus", {}) and baseline["corpus"][name]["sha256"] != info["sha256"])
+    if changed:
+        print(f"注意: 语料内容与基线不同，未比较: {', '.join(changed)}")
+
+    def number(value, digits=1):
+        return "-" if value is None else f"{value:.{digits}f}"
+
+    print(f"\n{'场景':<48} {'基线页/秒':<10} {'本次页/秒':<10} {'基线内存MB':<11} {'本次内存MB':<11} 结果")
+    print("-" * 110)
+    regressions = 0
+    for scenario, base_speed, speed, base_rss, rss, problems in rows:
+        regressions += bool(problems)
+        verdict = "回归: " + "，".join(problems) if problems else "正常"
+        print(f"{scenario:<48} {number(base_speed):<10} {number(speed):<10} {number(base_rss, 0):<11} "
+              f"{number(rss, 0):<11} {verdict}")
+    print(f"\n共比较 {len(rows)} 个场景，回归 {regressions} 个")
+    return regressions
+
+def _parse_list(text, convert=str):
+    return [convert(item.strip()) for item in text.split(",") if item.strip()]
+
+def _parse_batch_size(text):
+    return None if text == "auto" else int(text)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="在合成语料上运行可复现的转换基准测试")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="生成语料并运行所有场景")
+    run_parser.add_argument("-o", "--output", required=True, help="结果JSON文件")
+    run_parser.add_argument("--corpus", default=DEFAULT_CORPUS_DIR, help=f"语料目录（默认 {DEFAULT_CORPUS_DIR}）")
+    run_parser.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES,
+                            help=f"只运行不超过此页数的文档（默认{DEFAULT_MAX_PAGES}）")
+    run_parser.add_argument("--documents", default=None, help="只运行这些文档（逗号分隔，如 ruled_10,mixed_100）")
+    run_parser.add_argument("--backends", default=BACKEND_AUTO, help=f"提取后端（逗号分隔: {', '.join(BACKEND_MODES)}）")
+    run_parser.add_argument("--engines", default=",".join(DEFAULT_ENGINES),
+                            help=f"提取引擎（逗号分隔: {', '.join(ENGINES)}）")
+    run_parser.add_argument("--workers", default=",".join(map(str, DEFAULT_WORKERS)), help="工作数（逗号分隔）")
+    run_parser.add_argument("--batch-sizes", default=",".join(map(batch_label, DEFAULT_BATCH_SIZES)),
+                            help="批次页数（逗号分隔，auto为按预扫描自适应划分）")
+    run_parser.add_argument("--format", choices=OUTPUT_FORMATS, default="xlsx", help="输出格式（默认xlsx）")
+    run_parser.add_argument("--repeat", type=int, default=1, help="每个场景重复次数，用时取中位数")
+    run_parser.add_argument("--timeout", type=float, default=None, help="单个场景的超时时间（秒）")
+    run_parser.add_argument("--baseline", default=None, help="运行后与此基线比较，有回归时退出码为1")
+    run_parser.add_argument("--max-speed-regression", type=float, default=MAX_SPEED_REGRESSION,
+                            help=f"页/秒下降超过此比例判为回归（默认{MAX_SPEED_REGRESSION}）")
+    run_parser.add_argument("--max-memory-regression", type=float, default=MAX_MEMORY_REGRESSION,
+                            help=f"峰值内存增长超过此比例判为回归（默认{MAX_MEMORY_REGRESSION}）")
+
+    compare_parser = subparsers.add_parser("compare", help="比较两个结果文件")
+    compare_parser.add_argument("baseline", help="基线结果JSON")
+    compare_parser.add_argument("current", help="本次结果JSON")
+    compare_parser.add_argument("--max-speed-regression", type=float, default=MAX_SPEED_REGRESSION)
+    compare_parser.add_argument("--max-memory-regression", type=float, default=MAX_MEMORY_REGRESSION)
+
+    scenario_parser = subparsers.add_parser("_scenario", help=argparse.SUPPRESS)
+    scenario_parser.add_argument("scenario")
+    return parser
+
+def load_results(path):
+    with open(path, 'r', encoding='utf-8') as result_file:
+        results = json.load(result_file)
+    if results.get("format") != SUITE_FORMAT_VERSION:
+        raise ValueError(f"不支持的结果文件格式: {path}")
+    return results
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == "_scenario":
+        # 子进程：转换引擎的诊断输出改到标准错误，标准输出只有一行结果
+        real_stdout = sys.stdout
+        sys.stdout = sys.stderr
+        result = run_scenario(json.loads(args.scenario))
+        real_stdout.write(json.dumps(result) + "\n")
+        return 0
+
+    if args.command == "compare":
+        baseline, current = load_results(args.baseline), load_results(args.current)
+        rows = compare_results(baseline, current, args.max_speed_regression, args.max_memory_regression)
+        return 1 if print_comparison(baseline, current, rows) else 0
+
+    manifest = generate_corpus(args.corpus, max_pages=args.max_pages)
+    if args.documents:
+        wanted = set(_parse_list(args.documents))
+        manifest = {name: info for name, info in manifest.items() if name in wanted}
+    if not manifest:
+        print("没有符合条件的语料文档")
+        return 2
+    scenarios = build_scenarios(manifest, _parse_list(args.backends), _parse_list(args.engines),
+                                _parse_list(args.workers, int), _parse_list(args.batch_sizes, _parse_batch_size),
+                                args.format)
+    documents = ", ".join(f"{name}({info['pages']}页)" for name, info in manifest.items())
+    print(f"语料: {documents}，共 {len(scenarios)} 个场景")
+    results = run_suite(scenarios, manifest, max(1, args.repeat), args.timeout)
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        json.dump(results, output_file, ensure_ascii=False, indent=2)
+    print(f"结果已保存到 {args.output}")
+
+    if args.baseline:
+        baseline = load_results(args.baseline)
+        rows = compare_results(baseline, results, args.max_speed_regression, args.max_memory_regression)
+        return 1 if print_comparison(baseline, results, rows) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
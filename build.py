@@ -3,6 +3,9 @@
 
 """
 PDF表格转Excel工具打包脚本
+
+默认打包为目录（--onedir），启动时不需要先把整个程序解压到临时目录，冷启动明显更快；
+需要单个可执行文件时使用 python build.py --onefile
 """
 
 import os
@@ -36,7 +39,7 @@ def clean_build_dirs():
             print(f"清理目录: {dir_name}...")
             shutil.rmtree(dir_name)
 
-def build_app():
+def build_app(onefile=False):
     """打包应用程序"""
     print("=" * 60)
     print("开始打包PDF表格转Excel工具...")
@@ -60,11 +63,12 @@ def build_app():
     
     print(f"检测到平台: {platform_name}")
     print(f"使用源文件: {source_file}")
+    print(f"打包方式: {'单文件' if onefile else '目录'}")
     
     # 构建PyInstaller命令
     cmd = [
         "pyinstaller",
-        "--onefile",
+        "--onefile" if onefile else "--onedir",
         "--windowed",
         "--name", f"PDF表格转Excel工具",
         "--add-data", f"requirements.txt{';' if platform == 'win32' else ':'}.",
@@ -94,7 +98,8 @@ def build_app():
             os.chdir("dist")
             try:
                 if platform == "win32":
-                    zip_cmd = ["powershell", "Compress-Archive", "-Path", "PDF表格转Excel工具.exe", "-DestinationPath", output_zip]
+                    target = "PDF表格转Excel工具.exe" if onefile else "PDF表格转Excel工具"
+                    zip_cmd = ["powershell", "Compress-Archive", "-Path", target, "-DestinationPath", output_zip]
                     subprocess.check_call(zip_cmd)
                 else:
                     if platform == "darwin":
@@ -108,7 +113,10 @@ def build_app():
                 
                 print(f"\n发布包创建成功: dist/{output_zip}")
                 exe_extension = ".exe" if platform == "win32" else ""
-                print(f"可执行文件路径: dist/PDF表格转Excel工具{exe_extension}")
+                if onefile or platform == "darwin":
+                    print(f"可执行文件路径: dist/PDF表格转Excel工具{exe_extension}")
+                else:
+                    print(f"可执行文件路径: dist/PDF表格转Excel工具/PDF表格转Excel工具{exe_extension}")
                 
                 return True
             except subprocess.CalledProcessError as e:
@@ -166,7 +174,7 @@ def main():
     create_release_notes()
     
     # 构建应用
-    if build_app():
+    if build_app(onefile="--onefile" in sys.argv[1:]):
         print("\n构建完成。你可以在dist目录找到可执行文件和发布包。")
         print("\n发布步骤:")
         print("1. 登录GitHub仓库")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 转换检查点
+在输出文件旁的 <输出文件>.journal 目录中记录本次转换的批次划分和每个已完成批次的表格，
+转换失败、取消或进程崩溃后可以继续：已完成的批次直接从检查点读取，只提取剩余的页。
+所有文件都先写临时文件再原子替换，崩溃时不会留下半个检查点；
+批次文件由一个后台线程按提交顺序写入并落盘，调度线程不等待磁盘同步
+"""
+
+import os
+import json
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from extraction_pool import serialize_tables, deserialize_tables
+
+# 检查点格式版本，格式变化时递增以使旧检查点失效
+JOURNAL_FORMAT_VERSION = 2
+MANIFEST_NAME = "manifest.json"
+BATCH_FILE_SUFFIX = ".tables"
+
+def write_atomic(path, data):
+    """写入临时文件并落盘后原子替换目标文件"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as tmp_file:
+        tmp_file.write(data)
+        tmp_file.flush()
+        os.fsync(tmp_file.fileno())
+    os.replace(tmp_path, path)
+
+class ConversionJournal:
+    """一次转换的检查点目录"""
+
+    def __init__(self, output_path, pdf_path, options=None):
+        self.journal_dir = f"{output_path}.journal"
+        self.pdf_path = os.path.abspath(pdf_path)
+        self.options = options or {}
+        self._writer = None  # 写入批次文件的后台线程，第一次记录时创建
+        self._pending = []  # [((起始页, 结束页), future)] 已提交、尚未确认结果的写入
+
+    def _identity(self):
+        """用于判断检查点是否属于同一个PDF和同样的提取参数"""
+        stat = os.stat(self.pdf_path)
+        return {
+            "format": JOURNAL_FORMAT_VERSION,
+            "pdf": self.pdf_path,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "options": self.options,
+        }
+
+    def _batch_path(self, start_page, end_page):
+        return os.path.join(self.journal_dir, f"{start_page}-{end_page}{BATCH_FILE_SUFFIX}")
+
+    def load_plan(self):
+        """
+        读取可继续的批次划分 [(起始页, 结束页)]
+
+        没有检查点，或检查点属于其他文件/参数时返回None（并删除不匹配的检查点）
+        """
+        try:
+            with open(os.path.join(self.journal_dir, MANIFEST_NAME), 'r', encoding='utf-8') as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            return None
+        identity = self._identity()
+        if any(manifest.get(key) != value for key, value in identity.items()):
+            self.discard()
+            return None
+        return [tuple(page_range) for page_range in manifest["ranges"]]
+
+    def start(self, page_ranges):
+        """开始新的检查点，记录批次划分"""
+        self.discard()
+        os.makedirs(self.journal_dir, exist_ok=True)
+        manifest = dict(self._identity(), ranges=[list(page_range) for page_range in page_ranges])
+        write_atomic(os.path.join(self.journal_dir, MANIFEST_NAME),
+                     json.dumps(manifest, ensure_ascii=False).encode('utf-8'))
+
+    def has(self, start_page, end_page):
+        """该批次是否已完成"""
+        return os.path.exists(self._batch_path(start_page, end_page))
+
+    def completed_count(self, page_ranges):
+        return sum(1 for start_page, end_page in page_ranges if self.has(start_page, end_page))
+
+    def record(self, start_page, end_page, tables=None, payload=None):
+        """
+        记录一个已完成批次的表格（payload为已序列化的表格时直接写入）
+
+        在后台线程中写入，立即返回；写入失败由 flush() 报告，读取检查点前也要先调用 flush()
+        """
+        if payload is None:
+            payload = serialize_tables(tables)
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal")
+        future = self._writer.submit(write_atomic, self._batch_path(start_page, end_page), payload)
+        self._pending.append(((start_page, end_page), future))
+
+    def flush(self, wait=True):
+        """
+        确认已提交的写入，返回写入失败的批次 [(起始页, 结束页, 出错信息)]
+
+        wait为False时只确认已经写完的批次，不等待其余的批次
+        """
+        failures = []
+        pending = []
+        for page_range, future in self._pending:
+            if not wait and not future.done():
+                pending.append((page_range, future))
+                continue
+            try:
+                future.result()
+            except OSError as e:
+                failures.append(page_range + (str(e),))
+        self._pending = pending
+        return failures
+
+    def close(self):
+        """等待剩余的写入并结束后台线程（保留检查点）"""
+        failures = self.flush()
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+            self._writer = None
+        return failures
+
+    def load(self, start_page, end_page):
+        """读取一个已完成批次的表格"""
+        with open(self._batch_path(start_page, end_page), 'rb') as batch_file:
+            return deserialize_tables(batch_file.read())
+
+    def discard(self):
+        """删除检查点（转换成功后或不再需要时）"""
+        self.close()
+        shutil.rmtree(self.journal_dir, ignore_errors=True)
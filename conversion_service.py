@@ -0,0 +1,515 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 本地转换服务
+在本机运行的HTTP服务，供其他内部工具上传PDF并取回转换结果，不需要打开图形界面；
+只使用标准库（http.server），所有任务在一个ConversionQueue中调度，共享同一个常驻的提取执行器
+
+接口（JSON，路径中的<id>为提交时返回的任务编号）:
+    POST   /jobs?filename=report.pdf&format=xlsx   请求体为PDF文件内容，返回202和任务状态；
+                                                   等待中的任务已满时返回503（Retry-After）
+    GET    /jobs                                  全部任务的状态
+    GET    /jobs/<id>[?wait=<version>&timeout=30]  任务状态；给出wait时等到状态版本变化再返回（长轮询）
+    GET    /jobs/<id>/events                      以Server-Sent Events推送进度，任务结束后发送done事件并关闭
+    GET    /jobs/<id>/result                      下载转换结果，任务未完成时返回409
+    DELETE /jobs/<id>                             取消任务；已结束的任务删除其文件
+    GET    /health                                服务和队列概况
+
+提交参数: format（xlsx、xlsx-long、csv-zip、parquet、arrow，默认xlsx）、backend、workers（本任务同时在途的
+批次按此并行数计算，不超过服务的 --job-workers）、skip_empty_pages、stitch、templates（0/1）
+
+示例:
+    python conversion_service.py --port 8765 --engine process --workers 4
+    curl --data-binary @report.pdf "http://127.0.0.1:8765/jobs?filename=report.pdf"
+    curl -N http://127.0.0.1:8765/jobs/<id>/events
+    curl -o report.xlsx http://127.0.0.1:8765/jobs/<id>/result
+"""
+
+import os
+import re
+import sys
+import hmac
+import json
+import time
+import uuid
+import shutil
+import signal
+import argparse
+import tempfile
+import threading
+from urllib.parse import urlsplit, parse_qs, quote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from job_queue import ConversionQueue, MAX_ACTIVE_JOBS, JOB_QUEUED, JOB_DONE, FINISHED_STATES
+from tabula_backend import BACKEND_AUTO, BACKEND_MODES
+from extraction_pool import ENGINE_THREAD, ENGINES
+from output_formats import (OUTPUT_XLSX, OUTPUT_XLSX_LONG, OUTPUT_CSV_ZIP, OUTPUT_PARQUET, OUTPUT_ARROW,
+                            FORMAT_EXTENSIONS)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# 等待中的任务数上限，超出时拒绝新任务（503）
+MAX_PENDING_JOBS = 20
+# 单个上传文件的大小上限（MB）
+MAX_UPLOAD_MB = 200
+# 已结束任务的结果保留时间（秒），之后删除文件和任务
+RESULT_TTL_SECONDS = 3600
+# SSE的心跳间隔和长轮询的最长等待时间（秒）
+HEARTBEAT_SECONDS = 15
+MAX_WAIT_SECONDS = 60
+# 状态中保留的最近批次日志条数
+STATUS_LOG_RECORDS = 20
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+# 服务只提供单个输出文件的格式（csv为每个表格一个文件，请使用csv-zip）
+CONTENT_TYPES = {
+    OUTPUT_XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    OUTPUT_XLSX_LONG: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    OUTPUT_CSV_ZIP: "application/zip",
+    OUTPUT_PARQUET: "application/vnd.apache.parquet",
+    OUTPUT_ARROW: "application/vnd.apache.arrow.file",
+}
+
+_UNSAFE_FILENAME_RE = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+class ServiceError(Exception):
+    """请求无法处理，status 为HTTP状态码"""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+def safe_filename(name):
+    """上传文件名去掉路径和不能用于文件名的字符，扩展名统一为.pdf"""
+    name = _UNSAFE_FILENAME_RE.sub("_", os.path.basename((name or "").replace("\\", "/"))).strip(". ")
+    stem = os.path.splitext(name)[0] or "upload"
+    return stem[:100] + ".pdf"
+
+def _flag(query, name, default):
+    values = query.get(name)
+    if not values:
+        return default
+    return values[-1].lower() not in ("0", "false", "no", "off")
+
+class ConversionService:
+    """
+    转换服务的任务管理（与HTTP无关，可以单独使用）
+
+    每个任务一个目录（上传的PDF和输出文件），任务记录为字典：
+    id、job（ConversionJob）、dir、filename、format、created、version（状态每次变化加1）、log（最近的批次日志）
+    """
+
+    def __init__(self, data_dir=None, engine=ENGINE_THREAD, backend=BACKEND_AUTO, use_cache=True, workers=None,
+                 job_workers=None, max_active=MAX_ACTIVE_JOBS, max_pending=MAX_PENDING_JOBS,
+                 max_upload_mb=MAX_UPLOAD_MB, result_ttl=RESULT_TTL_SECONDS, token=None):
+        self.owns_data_dir = data_dir is None
+        self.data_dir = data_dir or tempfile.mkdtemp(prefix="pdf2excel-service-")
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.job_workers = job_workers
+        self.max_pending = max_pending
+        self.max_upload_bytes = int(max_upload_mb * 1024 * 1024)
+        self.result_ttl = result_ttl
+        self.token = token
+        self.records = {}
+        self._by_job = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        # 所有任务共享一个常驻执行器（进程池时工作进程和JVM只启动一次）
+        self.queue = ConversionQueue(on_progress=self._on_progress, on_finished=self._on_finished,
+                                     max_active=max_active, on_log=self._on_log, keep_executor=True)
+        self.queue.configure(engine, use_cache, backend, workers)
+
+    # ---- 队列回调（在转换线程中调用） ----
+
+    def _touch(self, job, records=None):
+        with self._changed:
+            record = self._by_job.get(job.job_id)
+            if record is None:
+                return
+            if records:
+                record["log"] = (record["log"] + records)[-STATUS_LOG_RECORDS:]
+            record["version"] += 1
+            self._changed.notify_all()
+
+    def _on_progress(self, job, percent, status_text, tables_found):
+        self._touch(job)
+
+    def _on_finished(self, job):
+        self._touch(job)
+
+    def _on_log(self, job, start_page, end_page, records):
+        self._touch(job, [dict(record, pages=[start_page, end_page]) for record in records])
+
+    # ---- 任务 ----
+
+    def check_token(self, authorization):
+        """设置了令牌时检查 Authorization: Bearer <令牌>"""
+        if not self.token:
+            return True
+        scheme, _, value = (authorization or "").partition(" ")
+        return scheme.lower() == "bearer" and hmac.compare_digest(value.strip(), self.token)
+
+    def submit(self, stream, length, filename=None, options=None):
+        """
+        保存上传的PDF并加入队列，返回任务记录
+
+        options: format、backend、workers、skip_empty_pages、stitch、templates；参数不合法、文件过大或
+        等待中的任务已满时抛出ServiceError
+        """
+        options = options or {}
+        output_format = options.get("format") or OUTPUT_XLSX
+        if output_format not in CONTENT_TYPES:
+            raise ServiceError(400, f"不支持的输出格式: {output_format}（可用: {', '.join(CONTENT_TYPES)}）")
+        backend = options.get("backend") or None
+        if backend is not None and backend not in BACKEND_MODES:
+            raise ServiceError(400, f"未知的提取后端: {backend}")
+        workers = options.get("workers")
+        if workers is not None and workers < 1:
+            raise ServiceError(400, "workers必须为正整数")
+        if self.job_workers:
+            workers = min(workers or self.job_workers, self.job_workers)
+        if length is None:
+            raise ServiceError(411, "需要Content-Length")
+        if length > self.max_upload_bytes:
+            raise ServiceError(413, f"文件超过上限 {self.max_upload_bytes // 1024 // 1024} MB")
+
+        self.purge_expired()
+        with self._lock:
+            pending = sum(1 for record in self.records.values() if record["job"].status == JOB_QUEUED)
+        if pending >= self.max_pending:
+            raise ServiceError(503, f"等待中的任务已达上限（{self.max_pending}），请稍后重试",
+                               {"Retry-After": str(HEARTBEAT_SECONDS)})
+
+        job_id = uuid.uuid4().hex[:12]
+        job_dir = os.path.join(self.data_dir, job_id)
+        os.makedirs(job_dir)
+        filename = safe_filename(filename)
+        pdf_path = os.path.join(job_dir, filename)
+        try:
+            self._save_upload(stream, length, pdf_path)
+        except Exception:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+        output_path = os.path.join(job_dir, os.path.splitext(filename)[0] + FORMAT_EXTENSIONS[output_format])
+
+        record = {"id": job_id, "job": None, "dir": job_dir, "filename": filename, "format": output_format,
+                  "created": time.time(), "version": 0, "log": []}
+        # 加入队列时不持有服务的锁：队列的回调可能在持有队列锁时调用 _touch
+        job = self.queue.add(pdf_path, output_path, skip_empty_pages=options.get("skip_empty_pages", False),
+                             stitch_tables=options.get("stitch", True), output_format=output_format,
+                             backend=backend, use_templates=options.get("templates", True), workers=workers)
+        with self._changed:
+            record["job"] = job
+            self.records[job_id] = record
+            self._by_job[job.job_id] = record
+        return record
+
+    def _save_upload(self, stream, length, pdf_path):
+        remaining = length
+        with open(pdf_path, 'wb') as pdf_file:
+            first = True
+            while remaining > 0:
+                chunk = stream.read(min(UPLOAD_CHUNK_BYTES, remaining))
+                if not chunk:
+                    raise ServiceError(400, "上传的内容不完整")
+                if first and not chunk.startswith(b"%PDF"):
+                    raise ServiceError(400, "上传的内容不是PDF文件")
+                first = False
+                pdf_file.write(chunk)
+                remaining -= len(chunk)
+        if length == 0:
+            raise ServiceError(400, "上传的内容为空")
+
+    def get(self, job_id):
+        with self._lock:
+            record = self.records.get(job_id)
+        if record is None:
+            raise ServiceError(404, f"任务不存在: {job_id}")
+        return record
+
+    def list_records(self):
+        """全部任务记录，按提交时间排序"""
+        with self._lock:
+            records = list(self.records.values())
+        return sorted(records, key=lambda record: record["created"])
+
+    def status(self, record):
+        """任务状态（可直接序列化为JSON）"""
+        job = record["job"]
+        links = {"self": f"/jobs/{record['id']}", "events": f"/jobs/{record['id']}/events"}
+        if job.status == JOB_DONE:
+            links["result"] = f"/jobs/{record['id']}/result"
+        return {
+            "id": record["id"],
+            "file": record["filename"],
+            "format": record["format"],
+            "status": job.status,
+            "percent": job.percent,
+            "message": job.message,
+            "tables": job.tables_found,
+            "pages": job.total_pages,
+            "pages_per_second": round(job.pages_per_second, 2),
+            "workers": job.workers,
+            "created": round(record["created"], 3),
+            "started": round(job.start_time, 3) if job.start_time else None,
+            "finished": round(job.end_time, 3) if job.end_time else None,
+            "version": record["version"],
+            "log": list(record["log"]),
+            "links": links,
+        }
+
+    def wait_for_change(self, record, version, timeout):
+        """等到任务状态版本不等于version或任务已结束（最多timeout秒），返回 (版本, 状态)"""
+        deadline = time.time() + timeout
+        with self._changed:
+            while record["version"] == version and record["job"].status not in FINISHED_STATES:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            current = record["version"]
+        return current, self.status(record)
+
+    def result_path(self, record):
+        """已完成任务的输出文件路径，未完成时抛出ServiceError（409）"""
+        job = record["job"]
+        if job.status != JOB_DONE or not os.path.exists(job.output_path):
+            raise ServiceError(409, f"任务尚未完成（{job.status}）")
+        return job.output_path
+
+    def cancel(self, record):
+        """取消未结束的任务；已结束的任务删除文件和记录。返回是否已删除"""
+        job = record["job"]
+        if job.status not in FINISHED_STATES:
+            self.queue.cancel(job)
+            self._touch(job)  # 等待中的任务直接取消，没有on_finished回调
+            return False
+        self._remove(record)
+        return True
+
+    def _remove(self, record):
+        with self._lock:
+            self.records.pop(record["id"], None)
+            self._by_job.pop(record["job"].job_id, None)
+        self.queue.remove(record["job"])
+        shutil.rmtree(record["dir"], ignore_errors=True)
+
+    def purge_expired(self):
+        """删除结束超过result_ttl秒的任务"""
+        now = time.time()
+        with self._lock:
+            expired = [record for record in self.records.values()
+                       if record["job"].status in FINISHED_STATES and record["job"].end_time
+                       and now - record["job"].end_time > self.result_ttl]
+        for record in expired:
+            self._remove(record)
+
+    def health(self):
+        with self._lock:
+            jobs = [record["job"] for record in self.records.values()]
+        counts = {}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"status": "ok", "jobs": counts, "engine": self.queue.engine, "workers": self.queue._workers,
+                "max_active": self.queue.max_active, "max_pending": self.max_pending}
+
+    def close(self):
+        """取消全部任务，关闭执行器，删除自建的数据目录"""
+        self.queue.close()
+        if self.owns_data_dir:
+            shutil.rmtree(self.data_dir, ignore_errors=True)
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """HTTP请求处理，self.server.service 为ConversionService"""
+
+    server_version = "pdf2excel-service/1"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def dispatch(self, method):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        parts = [part for part in url.path.split("/") if part]
+        try:
+            if not self.service.check_token(self.headers.get("Authorization")):
+                raise ServiceError(401, "需要有效的访问令牌", {"WWW-Authenticate": "Bearer"})
+            if parts == ["health"] and method == "GET":
+                return self.send_json(200, self.service.health())
+            if parts == ["jobs"] and method == "POST":
+                return self.handle_submit(query)
+            if parts == ["jobs"] and method == "GET":
+                self.service.purge_expired()
+                return self.send_json(200, {"jobs": [self.service.status(record)
+                                                     for record in self.service.list_records()]})
+            if len(parts) >= 2 and parts[0] == "jobs":
+                record = self.service.get(parts[1])
+                action = parts[2] if len(parts) == 3 else None
+                if len(parts) <= 3 and method == "GET" and action is None:
+                    return self.handle_status(record, query)
+                if len(parts) == 3 and method == "GET" and action == "events":
+                    return self.handle_events(record)
+                if len(parts) == 3 and method == "GET" and action == "result":
+                    return self.handle_result(record)
+                if len(parts) == 2 and method == "DELETE":
+                    deleted = self.service.cancel(record)
+                    return self.send_json(200, {"id": record["id"], "deleted": deleted,
+                                                "status": record["job"].status})
+            raise ServiceError(404, f"没有这个接口: {method} {url.path}")
+        except ServiceError as e:
+            self.send_json(e.status, {"error": str(e)}, e.headers)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 客户端已断开
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_DELETE(self):
+        self.dispatch("DELETE")
+
+    def handle_submit(self, query):
+        length = self.headers.get("Content-Length")
+        try:
+            workers = int(query["workers"][-1]) if "workers" in query else None
+            length = int(length) if length is not None else None
+        except ValueError:
+            raise ServiceError(400, "workers和Content-Length必须为整数")
+        options = {
+            "format": query.get("format", [None])[-1],
+            "backend": query.get("backend", [None])[-1],
+            "workers": workers,
+            "skip_empty_pages": _flag(query, "skip_empty_pages", False),
+            "stitch": _flag(query, "stitch", True),
+            "templates": _flag(query, "templates", True),
+        }
+        filename = query.get("filename", [None])[-1] or self.headers.get("X-Filename")
+        try:
+            record = self.service.submit(self.rfile, length, filename, options)
+        except ServiceError:
+            self.close_connection = True  # 请求体可能没有读完
+            raise
+        self.send_json(202, self.service.status(record), {"Location": f"/jobs/{record['id']}"})
+
+    def handle_status(self, record, query):
+        if "wait" not in query:
+            return self.send_json(200, self.service.status(record))
+        try:
+            version = int(query["wait"][-1])
+            timeout = min(float(query.get("timeout", [MAX_WAIT_SECONDS])[-1]), MAX_WAIT_SECONDS)
+        except ValueError:
+            raise ServiceError(400, "wait和timeout必须为数字")
+        _, status = self.service.wait_for_change(record, version, timeout)
+        self.send_json(200, status)
+
+    def handle_events(self, record):
+        """Server-Sent Events：每次状态变化发送progress事件，结束时发送done事件"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.close_connection = True
+        version = None
+        while True:
+            current, status = self.service.wait_for_change(record, version, HEARTBEAT_SECONDS)
+            finished = status["status"] in FINISHED_STATES
+            if current != version or finished:
+                event = "done" if finished else "progress"
+                data = json.dumps(status, ensure_ascii=False)
+                self.wfile.write(f"event: {event}\nid: {current}\ndata: {data}\n\n".encode("utf-8"))
+            else:
+                self.wfile.write(b": keepalive\n\n")
+            self.wfile.flush()
+            if finished:
+                return
+            version = current
+
+    def handle_result(self, record):
+        path = self.service.result_path(record)
+        download_name = os.path.basename(path)
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES[record["format"]])
+        self.send_header("Content-Length", str(os.path.getsize(path)))
+        self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{quote(download_name)}")
+        self.end_headers()
+        with open(path, 'rb') as result_file:
+            shutil.copyfileobj(result_file, self.wfile, UPLOAD_CHUNK_BYTES)
+
+def create_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT, quiet=False):
+    """创建HTTP服务器（每个请求一个线程），port为0时由系统分配端口"""
+    server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.quiet = quiet
+    return server
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="本地PDF表格转换服务（HTTP接口）")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"监听地址（默认{DEFAULT_HOST}，只接受本机连接）")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"监听端口（默认{DEFAULT_PORT}）")
+    parser.add_argument("--data-dir", default=None, help="保存上传文件和结果的目录（默认为临时目录，退出时删除）")
+    parser.add_argument("--engine", choices=ENGINES, default=ENGINE_THREAD, help="提取引擎（默认thread）")
+    parser.add_argument("--backend", choices=BACKEND_MODES, default=BACKEND_AUTO, help="默认的提取后端（默认auto）")
+    parser.add_argument("--workers", type=int, default=None, help="共享执行器的工作数（默认按CPU和内存自动确定）")
+    parser.add_argument("--job-workers", type=int, default=None,
+                        help="每个任务同时在途的批次按此并行数计算（默认可用满全部工作数）")
+    parser.add_argument("--max-active", type=int, default=MAX_ACTIVE_JOBS,
+                        help=f"同时进行的转换数（默认{MAX_ACTIVE_JOBS}）")
+    parser.add_argument("--max-pending", type=int, default=MAX_PENDING_JOBS,
+                        help=f"等待中的任务数上限，超出时返回503（默认{MAX_PENDING_JOBS}）")
+    parser.add_argument("--max-upload-mb", type=float, default=MAX_UPLOAD_MB,
+                        help=f"单个上传文件的大小上限（默认{MAX_UPLOAD_MB}MB）")
+    parser.add_argument("--result-ttl", type=float, default=RESULT_TTL_SECONDS,
+                        help=f"结果保留时间（秒，默认{RESULT_TTL_SECONDS}）")
+    parser.add_argument("--token", default=os.environ.get("PDF2EXCEL_SERVICE_TOKEN"),
+                        help="访问令牌，设置后请求需带 Authorization: Bearer <令牌>（默认读取环境变量PDF2EXCEL_SERVICE_TOKEN）")
+    parser.add_argument("--no-cache", action="store_true", help="不使用提取结果缓存")
+    parser.add_argument("--quiet", action="store_true", help="不输出访问日志")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    service = ConversionService(
+        data_dir=args.data_dir, engine=args.engine, backend=args.backend, use_cache=not args.no_cache,
+        workers=args.workers, job_workers=args.job_workers, max_active=args.max_active,
+        max_pending=args.max_pending, max_upload_mb=args.max_upload_mb, result_ttl=args.result_ttl, token=args.token
+    )
+    server = create_server(service, args.host, args.port, args.quiet)
+    host, port = server.server_address[:2]
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # 收到SIGTERM时与Ctrl+C一样取消任务、关闭执行器并删除临时数据目录
+    signal.signal(signal.SIGTERM, stop)
+    print(f"转换服务已启动: http://{host}:{port}（引擎: {args.engine}，数据目录: {service.data_dir}）", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
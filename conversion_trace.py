@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 转换阶段计时
+记录一次转换中各阶段的时间段（span）：JVM启动、读取和预扫描PDF、每个批次的排队等待、提取
+（其中逐页解析PDF与构建DataFrame分开计时）、结果回传和后处理、写入（optimize_dataframe、写出表格、关闭文件），
+以及批次前后的内存；可导出为Chrome跟踪格式（chrome://tracing 或 ui.perfetto.dev 打开）和按阶段汇总的统计表
+
+时间段按线程收集，方式与 extraction_log 相同：批次中的时间段收集到批次自己的列表，随提取结果返回
+（工作进程中的也一样），主线程和写入线程直接记入本次转换的ConversionTrace；
+当前线程没有在收集时 span() 不做任何事
+"""
+
+import os
+import json
+import time
+import threading
+import contextlib
+
+# 跟踪文件格式版本（记录在otherData中）
+TRACE_FORMAT_VERSION = 1
+
+_local = threading.local()
+
+def current_sink():
+    """当前线程收集时间段的对象（列表或ConversionTrace），没有时为None"""
+    return getattr(_local, "sink", None)
+
+def activate(sink):
+    """让当前线程的时间段记入sink（None为停止收集），返回之前的对象，用 restore 恢复"""
+    previous = current_sink()
+    _local.sink = sink
+    return previous
+
+def restore(previous):
+    _local.sink = previous
+
+def _record(sink, name, category, start, end, args):
+    thread = threading.current_thread()
+    sink.append({"name": name, "cat": category or name, "ts": start, "dur": max(0.0, end - start),
+                 "pid": os.getpid(), "tid": thread.native_id or thread.ident, "thread": thread.name,
+                 "args": args})
+
+@contextlib.contextmanager
+def span(name, category=None, **args):
+    """
+    记录with块的用时，返回参数字典，块内可以继续向其中添加参数（如表格数、内存）
+
+    当前线程没有在收集时返回None，调用方添加参数前需要检查
+    """
+    sink = current_sink()
+    if sink is None:
+        yield None
+        return
+    start = time.time()
+    try:
+        yield args
+    finally:
+        _record(sink, name, category, start, time.time(), args)
+
+def add_span(name, start, end, category=None, **args):
+    """记录一个已知起止时间（time.time()）的时间段，例如批次在执行器中的排队等待"""
+    sink = current_sink()
+    if sink is not None:
+        _record(sink, name, category, start, end, args)
+
+@contextlib.contextmanager
+def collect_spans(enabled=True):
+    """
+    在with块中把当前线程的时间段收集到一个列表（可序列化，跨进程返回），返回该列表；可以嵌套
+
+    enabled为False时块内不记录任何时间段，返回空列表（没有请求记录时批次不必收集和传回时间段）
+    """
+    spans = []
+    previous = activate(spans if enabled else None)
+    try:
+        yield spans
+    finally:
+        restore(previous)
+
+class ConversionTrace:
+    """
+    一次转换的全部时间段
+
+    spans 为字典列表：name、cat、ts（开始时间，time.time()）、dur（秒）、pid、tid、thread、args；
+    时间段可以嵌套（例如batch包含extract，write包含optimize），汇总时各阶段分别统计
+    """
+
+    def __init__(self, label=None):
+        self.label = label
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def append(self, item):
+        with self._lock:
+            self.spans.append(item)
+
+    def extend(self, items):
+        with self._lock:
+            self.spans.extend(items)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.spans)
+
+    def wall_seconds(self):
+        """第一个时间段开始到最后一个结束的时间"""
+        spans = self.snapshot()
+        if not spans:
+            return 0.0
+        return max(item["ts"] + item["dur"] for item in spans) - min(item["ts"] for item in spans)
+
+    def summary(self):
+        """
+        按阶段汇总，返回按总用时降序的列表，每项为字典：stage、count、total、mean、max（秒）；
+        并行的批次各自计时，同一阶段的总用时可以超过转换的总时间
+        """
+        stages = {}
+        for item in self.snapshot():
+            stage = stages.setdefault(item["name"], {"stage": item["name"], "count": 0, "total": 0.0, "max": 0.0})
+            stage["count"] += 1
+            stage["total"] += item["dur"]
+            stage["max"] = max(stage["max"], item["dur"])
+        for stage in stages.values():
+            stage["mean"] = stage["total"] / stage["count"]
+        return sorted(stages.values(), key=lambda stage: stage["total"], reverse=True)
+
+    def format_summary(self):
+        """汇总表的文本（每行一个阶段）"""
+        wall = self.wall_seconds()
+        lines = [f"{'阶段':<18} {'次数':>6} {'总用时(秒)':>11} {'平均(毫秒)':>11} {'最长(毫秒)':>11} {'占比':>6}"]
+        for stage in self.summary():
+            share = f"{stage['total'] / wall:.0%}" if wall else "-"
+            lines.append(f"{stage['stage']:<18} {stage['count']:>6} {stage['total']:>11.3f} "
+                         f"{stage['mean'] * 1000:>11.1f} {stage['max'] * 1000:>11.1f} {share:>6}")
+        lines.append(f"总时间: {wall:.2f}秒（占比按总时间计算，并行阶段的占比之和可超过100%）")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """Chrome跟踪格式（JSON对象格式，时间单位为微秒，从第一个时间段开始计时）"""
+        spans = self.snapshot()
+        origin = min((item["ts"] for item in spans), default=0.0)
+        main_pid = os.getpid()
+        events = []
+        threads = {}
+        for item in spans:
+            threads[(item["pid"], item["tid"])] = item["thread"]
+            events.append({"name": item["name"], "cat": item["cat"], "ph": "X",
+                           "ts": round((item["ts"] - origin) * 1e6, 1), "dur": round(item["dur"] * 1e6, 1),
+                           "pid": item["pid"], "tid": item["tid"], "args": item["args"]})
+        for pid in sorted({pid for pid, _ in threads}):
+            name = "转换" if pid == main_pid else f"提取进程 {pid}"
+            events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": name}})
+        for (pid, tid), thread_name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}})
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"version": TRACE_FORMAT_VERSION, "label": self.label,
+                          "start": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(origin)) if spans else None,
+                          "summary": self.summary()},
+        }
+
+    def export_chrome_trace(self, path):
+        """写出Chrome跟踪文件，返回文件路径"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as trace_file:
+            json.dump(self.chrome_trace(), trace_file, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,743 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 转换引擎
+提取、调度、写入流水线，不依赖任何GUI工具包，图形界面和命令行共用；
+输出格式除Excel外还支持CSV、Parquet/Arrow和长表（见 table_writers）
+"""
+
+import os
+import sys
+import threading
+import PyPDF2
+import time
+import math
+import queue
+import gc
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+from extraction_log import capture_extraction_output
+from conversion_trace import span, add_span, collect_spans, activate, restore
+from tabula_backend import get_backend, BACKEND_AUTO, ExtractionCancelled
+from extraction_methods import METHOD_AUTO
+from table_writers import create_writer
+from output_formats import format_from_path, remove_output
+from extraction_cache import get_cache, extract_pages_cached
+from page_analysis import scan_pages, plan_work_units
+from checkpoint_journal import ConversionJournal
+from memory_budget import MemoryBudget, rss_mb
+from table_cleaning import optimize_dataframe, coerce_row
+from table_stitching import TableStitcher, STITCH_NEW, STITCH_HEADERLESS
+from layout_templates import get_registry, pdf_fingerprint, table_layout
+from pdf_subsetting import create_splitter, open_batch_document
+from extraction_pool import (ENGINE_THREAD, ENGINE_PROCESS, choose_worker_count,
+                             create_process_pool, extract_batch_in_worker, deserialize_tables, terminate_pool)
+
+# 取消后等待在途批次自行中止的时间（秒），超时后结束工作进程
+CANCEL_GRACE_SECONDS = 3.0
+
+# 确保Java路径问题不会影响程序运行
+if sys.platform == 'win32':
+    os.environ["PATH"] = os.environ["PATH"] + ";" + os.path.join(os.path.dirname(sys.executable), "java")
+else:
+    os.environ["PATH"] = os.environ["PATH"] + ":" + os.path.join(os.path.dirname(sys.executable), "java")
+
+def extract_tables_silent(pdf_path, page_range, backend=BACKEND_AUTO):
+    """静默提取表格，提取器的输出和错误只记入本次调用的日志，不输出任何信息"""
+    with capture_extraction_output(page_range) as log, span("extract", pages=page_range):
+        try:
+            # 复用会话共享的后端（常驻JVM），不再为每个批次启动Java进程
+            return get_backend(backend).read_pdf(pdf_path, page_range)
+        except Exception as e:
+            log.add("ERROR", "converter_engine", f"表格提取错误: {str(e)}")
+            # 确保返回空列表而不是None
+            return []
+
+def extract_batch_cached(pdf_path, pages, backend=BACKEND_AUTO, cache=None, cancel_token=None, method=None,
+                         hints=None, subset_path=None):
+    """
+    逐页提取一个批次，命中缓存的页直接读取，返回 (表格列表, 命中页数, 未命中页数)
+
+    method 为提取方式（见 extraction_methods），None时为后端的默认方式；
+    hints 为版式模板给出的提取参数（area、columns等，见 template_options）；
+    subset_path 为只含本批次页的子文档（见 pdf_subsetting），给出时提取器只打开子文档；
+    提取器的输出由调用方收集（见 process_batch）
+    """
+    pages = list(pages)
+    with span("open_document", subset=subset_path is not None):
+        document = open_batch_document(get_backend(backend), pdf_path, pages, subset_path, method, hints)
+    try:
+        with span("extract", pages=len(pages)):
+            return extract_pages_cached(document, pages, cache, cancel_token)
+    finally:
+        document.close()
+
+def batch_pages(args):
+    """
+    批次参数中需要提取的页码列表
+    
+    args = (pdf_path, start_page, end_page[, backend[, use_cache[, pages[, cancel_token[, method[, hints
+            [, subset_path[, traced]]]]]]]]])，
+    pages 为预扫描筛选后范围内可能有表格的页，省略时提取整个范围；
+    cancel_token 为取消标记文件路径，文件出现后正在提取的批次尽快中止；
+    method 为提取方式（见 extraction_methods）；hints 为版式模板给出的提取参数；
+    subset_path 为按页拆分出的子文档，其中依次为本批次的pages（见 pdf_subsetting）；
+    traced 为True时批次收集并返回时间段，否则返回空列表
+    """
+    start_page, end_page = args[1:3]
+    pages = args[5] if len(args) > 5 else None
+    return list(range(start_page, end_page + 1)) if pages is None else list(pages)
+
+def process_batch(args):
+    """
+    处理单个PDF批次的函数，用于并行处理，返回 (表格列表, 表格数, (缓存命中页数, 未命中页数), 日志记录, 时间段, 是否失败)
+
+    日志记录为本批次提取器输出和出错信息的字典列表（见 extraction_log.BatchLog），
+    只收集当前线程的输出，并发的批次互不影响；
+    时间段为本批次各阶段的计时（见 conversion_trace），最外层的batch时间段记录批次前后的内存；
+    提取出错时表格列表为空且是否失败为True，这样的批次不能记入检查点
+    """
+    pdf_path, start_page, end_page = args[:3]
+    backend = args[3] if len(args) > 3 else BACKEND_AUTO
+    use_cache = args[4] if len(args) > 4 else False
+    cancel_token = args[6] if len(args) > 6 else None
+    method = args[7] if len(args) > 7 else None
+    hints = args[8] if len(args) > 8 else None
+    subset_path = args[9] if len(args) > 9 else None
+    traced = args[10] if len(args) > 10 else False
+    pages = batch_pages(args)
+    page_range = f"{start_page}-{end_page}"
+    if not pages:
+        return [], 0, (0, 0), [], [], False  # 整个批次都被预扫描判定为无表格
+    with collect_spans(traced) as spans, span("batch", pages=page_range) as info:
+        if info is not None:
+            info["rss_before_mb"] = round(rss_mb(), 1)
+        with capture_extraction_output(page_range) as log:
+            failed = False
+            try:
+                # 逐页提取，每页之间可以响应取消
+                cache = get_cache() if use_cache else None
+                tables, hits, misses = extract_batch_cached(pdf_path, pages, backend, cache, cancel_token, method,
+                                                            hints, subset_path)
+            except ExtractionCancelled:
+                raise  # 取消的批次不能当作空结果记入检查点
+            except Exception as e:
+                log.add("ERROR", "converter_engine", f"处理页 {page_range} 出错: {str(e)}")
+                tables, hits, misses, failed = [], 0, 0, True
+        if info is not None:
+            info.update(tables=len(tables), rss_after_mb=round(rss_mb(), 1))
+    return tables, len(tables) if tables else 0, (hits, misses), log.to_records(), spans, failed
+
+def save_tables_chunk(args):
+    """
+    将一块表格写入共享的流式Excel写入器
+    
+    args = (表格列表, 起始工作表序号, 写入器[, TableStitcher])，给出拼接器时跨页续表接在上一个工作表后面；
+    返回 (是否成功, 新建工作表数, 拼接的续表数, 出错信息列表)；单个表格出错时跳过该表格，
+    出错信息列表中每个失败的表格一条，整块失败时是否成功为False
+    """
+    tables_chunk, start_idx, writer = args[:3]
+    stitcher = args[3] if len(args) > 3 else None
+    sheets = 0
+    stitched = 0
+    errors = []
+    try:
+        # 内存使用监控
+        start_time = time.time()
+        start_mem = rss_mb()
+        
+        for df in tables_chunk:
+            idx = start_idx + sheets
+            sheet_name = f"Table_{idx+1}"
+            # 表格名称长度限制
+            if len(sheet_name) > 31:  # Excel工作表名称最大31字符
+                sheet_name = f"T{idx+1}"
+            
+            # 检查空表格
+            if df.empty:
+                continue
+            
+            # 内存优化
+            try:
+                # 优化DataFrame内存
+                with span("optimize", rows=len(df)):
+                    df = optimize_dataframe(df)
+                
+                # 流式写出，不重新读取已写入的工作簿；续表放不下时另起工作表
+                with span("write_table", rows=len(df)):
+                    continuation = stitcher.classify(df) if stitcher is not None else STITCH_NEW
+                    header_row = None
+                    if continuation == STITCH_HEADERLESS:
+                        header_row = coerce_row(df.attrs.get("header_cells") or list(df.columns), df)
+                    if continuation != STITCH_NEW and writer.append_table(df, header_row):
+                        stitched += 1
+                    else:
+                        writer.write_table(df, sheet_name)
+                        sheets += 1
+                
+                # 显式删除DataFrame以释放内存
+                del df
+                    
+            except Exception as e:
+                errors.append(f"保存表格 {idx+1} 时出错: {str(e)}")
+        
+        end_mem = rss_mb()
+        add_span("write", start_time, time.time(), tables=len(tables_chunk), sheets=sheets, stitched=stitched,
+                 rss_before_mb=round(start_mem, 1), rss_after_mb=round(end_mem, 1))
+        
+        return True, sheets, stitched, errors
+    except Exception as e:
+        return False, sheets, stitched, errors + [f"保存批次出错: {str(e)}"]
+
+def template_options(template):
+    """
+    版式模板对应的 (提取方式, 提取参数)
+
+    给出区域时关闭tabula的表格检测（guess），stream方式按模板的列分隔位置分列
+    """
+    hints = template["hints"]
+    options = {"area": hints["area"], "guess": False}
+    if hints.get("columns"):
+        options["columns"] = hints["columns"]
+    return hints["method"], options
+
+def when_all_done(futures, callback):
+    """所有futures结束后调用一次callback（在最后结束的future的完成回调中执行，都已结束时立即执行）"""
+    remaining = {"count": len(futures)}
+    lock = threading.Lock()
+    
+    def done(_):
+        with lock:
+            remaining["count"] -= 1
+            last = remaining["count"] == 0
+        if last:
+            callback()
+    
+    if not futures:
+        callback()
+    for future in futures:
+        future.add_done_callback(done)
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def record_batch_spans(trace, spans, submitted, received, page_range):
+    """
+    把批次返回的时间段记入本次转换的跟踪，并补上批次在执行器中的排队等待（提交到开始执行）
+    和结果回传（执行结束到主线程收到结果，进程池引擎中包括结果的传输）
+    """
+    batch = next((item for item in spans if item["name"] == "batch"), None)
+    if batch is not None:
+        add_span("queue_wait", submitted, batch["ts"], pages=page_range)
+        add_span("result_transfer", batch["ts"] + batch["dur"], max(received, batch["ts"] + batch["dur"]),
+                 pages=page_range)
+    trace.extend(spans)
+
+def format_duration(seconds):
+    """格式化时间长度"""
+    if seconds > 3600:
+        return f"{seconds/3600:.1f}小时"
+    elif seconds > 60:
+        return f"{seconds/60:.1f}分钟"
+    return f"{seconds:.1f}秒"
+
+def write_stage(write_queue, output_path, state, state_lock, cancel_flag, stitch_tables=False, output_format=None):
+    """
+    写入阶段：按页序从队列中取出批次结果并写入Excel
+    
+    队列元素为 (批次序号, 起始页, 结束页, 表格列表)，None 表示结束。
+    输出文件由本阶段的一个写入器（按output_format创建，见 table_writers）独占，第一批表格到达时创建，
+    结束时一次性关闭；stitch_tables 为True时跨页续表写入同一个工作表；
+    state["layouts"] 为列表时，收集每个表格的版式摘要（见 layout_templates.table_layout）；
+    state["trace"] 为ConversionTrace时，写入各阶段的时间段记入其中；
+    保存失败的表格计入 state["failed_tables"]，出错信息交给 state["log_callback"]（与批次日志相同的记录格式）
+    """
+    writer = None
+    stitcher = TableStitcher() if stitch_tables else None
+    previous_sink = activate(state.get("trace"))
+    try:
+        while True:
+            item = write_queue.get()
+            if item is None:
+                break
+            if cancel_flag.get("cancel", False) or state["error"]:
+                continue  # 取消或出错后只消费队列，不再写入
+            
+            batch_index, start_page, end_page, tables = item
+            tables = [df for df in tables if not df.empty]
+            if state.get("layouts") is not None:
+                state["layouts"].extend(table_layout(df) for df in tables)
+            try:
+                if tables:
+                    if writer is None:
+                        writer = create_writer(output_path, output_format)
+                    success, sheets, stitched, errors = save_tables_chunk(
+                        (tables, state["saved_tables"], writer, stitcher))
+                    if not success:
+                        raise RuntimeError(f"写入页 {start_page}-{end_page} 的表格失败: {errors[-1]}")
+                else:
+                    sheets = stitched = 0
+                    errors = []
+                if errors and state.get("log_callback") is not None:
+                    state["log_callback"](start_page, end_page,
+                                          [{"level": "ERROR", "source": "converter_engine", "message": message}
+                                           for message in errors])
+                with state_lock:
+                    state["failed_tables"] += len(errors)
+                    state["saved_tables"] += sheets
+                    state["stitched_tables"] += stitched
+                    state["written_batches"] += 1
+                    state["written_pages"] += end_page - start_page + 1
+            except Exception as e:
+                with state_lock:
+                    state["error"] = str(e)
+            finally:
+                # 尽快释放已写入的表格
+                del tables, item
+    finally:
+        if writer is not None:
+            try:
+                with span("close_output"):
+                    writer.close()
+            except Exception as e:
+                with state_lock:
+                    state["error"] = state["error"] or f"关闭输出文件失败: {str(e)}"
+        restore(previous_sink)
+
+def convert_pdf_to_excel(pdf_path, output_path, progress_callback, cancel_flag, backend=BACKEND_AUTO,
+                         engine=ENGINE_THREAD, use_cache=True, adaptive=True, skip_empty_pages=False,
+                         executor=None, workers=None, resume=False, memory_limit_mb=None, stitch_tables=True,
+                         output_format=None, method=METHOD_AUTO, use_templates=True, layouts=None,
+                         log_callback=None, batch_size=None, trace=None, split_batches=None):
+    """
+    将PDF中的表格转换为Excel
+    
+    提取和写入组成流水线：完成的批次按页序经有界队列交给唯一的写入线程，
+    同时在途的批次数有上限，内存占用不随文档长度增长
+    
+    参数:
+    - pdf_path: PDF文件路径
+    - output_path: 输出Excel文件路径
+    - progress_callback: 进度回调函数, 接收 (percent, status_text, tables_found)
+    - cancel_flag: 取消标志字典 {"cancel": False}
+    - backend: 提取后端 ("auto"、"jvm"、"subprocess" 或不需要Java的 "pdfplumber")
+    - engine: 提取引擎 ("thread" 线程池 或 "process" 进程池)
+    - use_cache: 是否使用磁盘上的提取结果缓存（按页缓存，重复转换同一PDF时跳过已提取的页）
+    - adaptive: 是否按预扫描估算的每页开销划分批次（否则按总页数使用固定批次大小）
+    - skip_empty_pages: 是否跳过预扫描判定为无表格（没有框线也没有对齐文本列）的页
+    - executor: 多个转换共享的执行器（类型须与engine一致，进程池由create_process_pool创建），
+      为None时本次转换自行创建并在结束时关闭
+    - workers: 本次转换同时在途的批次按此并行数计算，默认按CPU和内存自动确定
+    - resume: 是否从上次未完成的检查点继续（已完成的批次不再提取）；
+      无论是否继续，本次转换都会在输出文件旁记录检查点，成功完成后删除
+    - memory_limit_mb: 内存上限（MB，进程池引擎计入工作进程），接近上限时减少在途批次，
+      超过上限时回收内存；默认为物理内存的一半
+    - stitch_tables: 是否把跨页的续表（表头相同或列位置一致）合并到同一个工作表
+    - output_format: 输出格式（见 output_formats，xlsx、xlsx-long、csv、csv-zip、parquet、arrow），
+      默认按输出文件扩展名推断
+    - method: 提取方式（见 extraction_methods）：auto逐页按框线选择lattice或stream，得分低的页用另一种方式重试；
+      guess为tabula原有的自动判断；lattice、stream固定使用一种方式
+    - use_templates: 第一页与已保存的版式模板匹配时按模板的区域、列和提取方式提取，跳过表格检测
+      （此时忽略method）
+    - layouts: 给出列表时，转换过程中向其中追加每个表格的版式摘要，可用于保存模板
+      （见 layout_templates.TemplateRegistry.save_from_run）
+    - log_callback: 批次日志回调，接收 (起始页, 结束页, 日志记录)，只对有提取器输出或出错的批次调用；
+      日志记录见 process_batch，为None时丢弃（与原来静默提取相同）；写入阶段保存表格出错时也以ERROR记录
+      报告（在写入线程中调用），这些表格计为失败，转换返回False
+    - batch_size: 固定的批次页数，给出时不再按预扫描划分批次（用于基准测试比较批次大小）；
+      默认按adaptive划分，或按总页数选择批次大小
+    - trace: 给出ConversionTrace（见 conversion_trace）时记录各阶段的时间段：JVM启动、读取和预扫描PDF，
+      每个批次的排队等待、提取（逐页解析与构建DataFrame）、结果回传、后处理和写入，以及批次前后的内存
+    - split_batches: 提交批次前把该批次的页拆分为子文档，提取器只解析自己的页（见 pdf_subsetting）；
+      None时总页数不少于SPLIT_MIN_PAGES才拆分
+    """
+    cancel_token = None
+    splitter = None
+    journal = None
+    lingering = []  # 取消后超过宽限时间仍在共享执行器中运行的批次
+    conversion_start = time.time()
+    previous_sink = activate(trace)
+    try:
+        # 初始化进度
+        progress_callback(0, "正在分析PDF文件...", 0)
+        
+        # 获取PDF总页数
+        with span("open_pdf"), open(pdf_path, 'rb') as pdf_file:
+            pdf_reader = PyPDF2.PdfReader(pdf_file)
+            total_pages = len(pdf_reader.pages)
+            template = get_registry().match(pdf_fingerprint(pdf_reader)) if use_templates else None
+        
+        hints = None
+        if template is not None:
+            method, hints = template_options(template)
+            progress_callback(0, f"使用版式模板: {template['name']}", 0)
+        
+        # 优化：根据系统可用核心数、内存和提取引擎确定并行程度
+        workers = workers or choose_worker_count(engine)
+        owns_executor = executor is None
+        
+        if not owns_executor:
+            # 与其他转换共享执行器，总并行数由执行器决定
+            engine_desc = f"共享{engine}/{workers}"
+        elif engine == ENGINE_PROCESS:
+            # 每个工作进程各自启动JVM并保持PDF打开
+            progress_callback(1, f"正在启动 {workers} 个提取进程...", 0)
+            executor = create_process_pool(workers, backend, use_cache)
+            engine_desc = f"{workers}进程"
+        else:
+            # 启动会话共享的提取后端（常驻JVM只启动一次，所有批次复用）
+            progress_callback(1, "正在启动表格提取引擎...", 0)
+            executor = ThreadPoolExecutor(max_workers=workers)
+            engine_desc = f"{workers}线程/{get_backend(backend).mode}"
+        
+        progress_callback(1, f"PDF共有 {total_pages} 页，开始提取表格 (引擎: {engine_desc})...", 0)
+        
+        # 检查点：参数不同的检查点不能继续使用
+        journal = ConversionJournal(output_path, pdf_path,
+                                    {"backend": backend, "skip_empty_pages": skip_empty_pages, "method": method,
+                                     "template": hints})
+        page_ranges = journal.load_plan() if resume else None
+        resumed = page_ranges is not None
+        if resume and not resumed:
+            progress_callback(1, "没有可继续的检查点，重新开始转换", 0)
+        
+        skipped_pages = set()
+        adaptive = adaptive and batch_size is None
+        if (adaptive and not resumed) or skip_empty_pages:
+            # 预扫描每页内容，按估算开销划分工作单元，避免固定页数批次造成的负载不均
+            progress_callback(1, "正在预扫描页面...", 0)
+            with span("prescan"), open(pdf_path, 'rb') as pdf_file:
+                page_stats = scan_pages(PyPDF2.PdfReader(pdf_file), cancel_flag)
+            if len(page_stats) == total_pages:
+                if skip_empty_pages:
+                    skipped_pages = {stat.page for stat in page_stats if not stat.might_contain_table()}
+                    progress_callback(1, f"预扫描: {len(skipped_pages)}/{total_pages}页无表格，将跳过", 0)
+                if adaptive and not resumed:
+                    page_ranges = plan_work_units(page_stats, workers, skipped_pages=skipped_pages)
+        
+        if page_ranges is None:
+            # 批处理大小，未指定时根据PDF大小动态调整
+            if batch_size is None:
+                if total_pages > 10000:
+                    batch_size = 500  # 超大PDF
+                elif total_pages > 1000:
+                    batch_size = 100  # 大型PDF
+                elif total_pages > 100:
+                    batch_size = 50   # 中型PDF
+                else:
+                    batch_size = 20   # 小型PDF
+            
+            page_ranges = []
+            for batch in range(math.ceil(total_pages / batch_size)):
+                page_ranges.append((batch * batch_size + 1, min((batch + 1) * batch_size, total_pages)))
+        
+        # 取消标记：取消时创建，正在提取的批次（包括工作进程中的）看到后在下一页之前中止
+        cancel_token = f"{output_path}.cancel"
+        if os.path.exists(cancel_token):
+            os.remove(cancel_token)
+        
+        # 创建批处理任务列表
+        batches = []
+        for start_page, end_page in page_ranges:
+            pages = None
+            if skipped_pages:
+                pages = [page for page in range(start_page, end_page + 1) if page not in skipped_pages]
+            batches.append((pdf_path, start_page, end_page, backend, use_cache, pages, cancel_token, method, hints))
+        total_batches = len(batches)
+        
+        if resumed:
+            progress_callback(1, f"从检查点继续: 已完成 {journal.completed_count(page_ranges)}/{total_batches} 批次", 0)
+        else:
+            journal.start(page_ranges)
+        
+        # 大文件按批次拆分为子文档，提取器不再为每个批次加载整个文件
+        with span("open_splitter"):
+            splitter = create_splitter(pdf_path, total_pages, total_batches, split_batches)
+        if splitter is not None:
+            progress_callback(1, f"按批次拆分PDF，每个批次只解析自己的页 ({total_batches}批次)", 0)
+        
+        # 清除旧的输出文件，写入阶段会在第一批表格到达时创建新文件
+        output_format = output_format or format_from_path(output_path)
+        remove_output(output_path, output_format)
+        
+        # 写入阶段：唯一的写入线程，有界队列提供背压
+        write_queue = queue.Queue(maxsize=workers)
+        state = {"saved_tables": 0, "stitched_tables": 0, "failed_tables": 0, "written_batches": 0,
+                 "written_pages": 0, "error": None, "layouts": layouts, "trace": trace, "log_callback": log_callback}
+        state_lock = threading.Lock()
+        writer = threading.Thread(
+            target=write_stage,
+            args=(write_queue, output_path, state, state_lock, cancel_flag, stitch_tables, output_format),
+            daemon=True
+        )
+        writer.start()
+        
+        # 同时在途（提取中或等待按页序写入）的批次上限
+        max_in_flight = workers * 2
+        # 内存预算：按采样的内存用量收紧在途窗口，只在超过上限时回收
+        budget = MemoryBudget(memory_limit_mb, include_children=engine == ENGINE_PROCESS)
+        
+        start_time = time.time()
+        total_tables_found = 0
+        cache_hits = 0
+        cache_misses = 0
+        extracted_batches = 0
+        failed_batches = 0  # 提取出错的批次，不记入检查点，继续转换时重新提取
+        restored_batches = 0
+        next_to_submit = 0
+        next_to_write = 0
+        in_flight = {}
+        submit_times = {}  # 批次提交到执行器的时间，用于计算排队等待
+        subset_paths = {}  # 批次的子文档，批次完成后删除
+        finished = {}  # 已完成提取、等待按页序写入的批次
+        batch_func = extract_batch_in_worker if engine == ENGINE_PROCESS else process_batch
+        
+        def put_for_write(item):
+            """交给写入阶段，队列满时等待（背压），期间响应取消"""
+            while not cancel_flag.get("cancel", False):
+                try:
+                    write_queue.put(item, timeout=0.2)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def report_journal_failures(failures):
+            for start_page, end_page, error in failures:
+                progress_callback(
+                    int(state["written_pages"] * 100 / total_pages),
+                    f"写入检查点失败 (页 {start_page}-{end_page}): {error}",
+                    total_tables_found
+                )
+        
+        def stopped_message(message):
+            """中断时提示可以从检查点继续"""
+            report_journal_failures(journal.flush())
+            if journal.completed_count(page_ranges):
+                return f"{message}（已保存检查点，可继续转换）"
+            return message
+        
+        def stop_pipeline():
+            # 撤回尚未开始的批次，通知正在提取的批次中止
+            running = [future for future in in_flight if not future.cancel()]
+            with open(cancel_token, 'w'):
+                pass
+            if owns_executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+            # 在宽限时间内等待在途批次退出，仍在运行的工作进程直接结束（共享执行器不能结束）
+            _, still_running = concurrent.futures.wait(running, timeout=CANCEL_GRACE_SECONDS)
+            if still_running and owns_executor and engine == ENGINE_PROCESS:
+                terminate_pool(executor)
+            elif still_running and not owns_executor:
+                # 共享执行器不能结束，这些批次退出前要一直能看到取消标记和子文档
+                lingering.extend(still_running)
+            in_flight.clear()
+            finished.clear()
+            gc.collect()
+            # 清空队列并通知写入线程退出
+            while True:
+                try:
+                    write_queue.get_nowait()
+                except queue.Empty:
+                    break
+            write_queue.put(None)
+        
+        with executor if owns_executor else contextlib.nullcontext():
+            while next_to_write < total_batches:
+                if cancel_flag.get("cancel", False):
+                    stop_pipeline()
+                    progress_callback(0, stopped_message("操作已取消"), 0)
+                    return False
+                
+                if state["error"]:
+                    stop_pipeline()
+                    progress_callback(0, stopped_message(f"保存表格时出错: {state['error']}"), total_tables_found)
+                    return False
+                
+                # 在窗口允许的范围内提交新批次，检查点中已完成的批次在写入时直接读取
+                restored_before = restored_batches
+                window = budget.window(max_in_flight)
+                while next_to_submit < total_batches and next_to_submit - next_to_write < window:
+                    start_page, end_page = batches[next_to_submit][1:3]
+                    if resumed and journal.has(start_page, end_page):
+                        finished[next_to_submit] = None
+                        restored_batches += 1
+                    else:
+                        batch = batches[next_to_submit]
+                        subset_path = None
+                        if splitter is not None and batch_pages(batch):
+                            try:
+                                with span("split", pages=f"{start_page}-{end_page}"):
+                                    subset_path = splitter.write_subset(batch_pages(batch))
+                            except Exception:
+                                subset_path = None  # 拆分失败的批次按原来的方式提取整个文件
+                        # 只有记录时间段时批次才收集并传回时间段
+                        future = executor.submit(batch_func, batch + (subset_path, trace is not None))
+                        in_flight[future] = next_to_submit
+                        submit_times[future] = time.time()
+                        subset_paths[future] = subset_path
+                    next_to_submit += 1
+                
+                done, _ = concurrent.futures.wait(
+                    list(in_flight), timeout=0.5, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                
+                for future in done:
+                    if cancel_flag.get("cancel", False):
+                        break  # 取消后中止的批次不算完成，留给下一轮循环停止流水线
+                    batch_index = in_flight.pop(future)
+                    submitted = submit_times.pop(future)
+                    if splitter is not None:
+                        splitter.discard(subset_paths.pop(future))
+                    received = time.time()
+                    start_page = batches[batch_index][1]
+                    end_page = batches[batch_index][2]
+                    records = []
+                    try:
+                        tables, tables_count, (hits, misses), records, spans, batch_failed = future.result()
+                        if trace is not None:
+                            record_batch_spans(trace, spans, submitted, received, f"{start_page}-{end_page}")
+                        with span("post_process", pages=f"{start_page}-{end_page}"):
+                            payload = None
+                            if engine == ENGINE_PROCESS:
+                                payload, tables = tables, deserialize_tables(tables)
+                            total_tables_found += tables_count
+                            cache_hits += hits
+                            cache_misses += misses
+                            if batch_failed:
+                                failed_batches += 1
+                            else:
+                                journal.record(start_page, end_page, tables=tables, payload=payload)
+                    except Exception as e:
+                        tables = []
+                        failed_batches += 1
+                        progress_callback(
+                            int(state["written_pages"] * 100 / total_pages),
+                            f"处理页 {start_page}-{end_page} 时出错: {str(e)}",
+                            total_tables_found
+                        )
+                    finished[batch_index] = tables
+                    extracted_batches += 1
+                    if records and log_callback is not None:
+                        log_callback(start_page, end_page, records)
+                
+                if done:
+                    budget.maybe_release()
+                    report_journal_failures(journal.flush(wait=False))
+                
+                # 按页序把连续完成的批次交给写入阶段
+                while next_to_write in finished:
+                    start_page, end_page = batches[next_to_write][1:3]
+                    tables = finished.pop(next_to_write)
+                    if tables is None:
+                        tables = journal.load(start_page, end_page)
+                        total_tables_found += len(tables)
+                    if not put_for_write((next_to_write, start_page, end_page, tables)):
+                        break
+                    next_to_write += 1
+                
+                if not done and restored_batches == restored_before:
+                    continue
+                
+                # 进度按流水线末端（已交给写入阶段的页数）计算，不再固定划分提取/保存比例
+                pages_done = batches[next_to_write - 1][2] if next_to_write > 0 else 0
+                percent = min(99, int(pages_done * 100 / total_pages))
+                
+                # 根据页处理速度估计剩余时间
+                elapsed = time.time() - start_time
+                status = (f"已提取: {extracted_batches}/{total_batches}批次 | 已写入: {state['written_batches']}批次 "
+                          f"({pages_done}/{total_pages}页) | 找到: {total_tables_found}表格")
+                if restored_batches:
+                    status += f" | 检查点: {restored_batches}批次"
+                if cache_hits or cache_misses:
+                    status += f" | 缓存: 命中{cache_hits}/未命中{cache_misses}页"
+                if window < max_in_flight:
+                    status += f" | 内存: {budget.usage():.0f}/{budget.limit_mb:.0f}MB，已限流"
+                if pages_done > 0:
+                    est_remaining = elapsed / pages_done * (total_pages - pages_done)
+                    status += f" | 剩余: {format_duration(est_remaining)}"
+                
+                progress_callback(percent, status, total_tables_found)
+        
+        # 等待写入阶段处理完剩余的批次
+        progress_callback(99, "正在完成写入...", total_tables_found)
+        write_queue.put(None)
+        writer.join()
+        
+        if cancel_flag.get("cancel", False):
+            progress_callback(0, stopped_message("操作已取消"), 0)
+            return False
+        
+        if state["error"]:
+            progress_callback(0, stopped_message(f"保存表格时出错: {state['error']}"), total_tables_found)
+            return False
+        
+        total_time = time.time() - start_time
+        if failed_batches:
+            # 出错的批次没有记入检查点，保留检查点以便继续转换时只重新提取这些批次
+            report_journal_failures(journal.close())
+            progress_callback(
+                100,
+                f"⚠️ {failed_batches} 个批次提取失败（详见批次日志），已保存 {state['saved_tables']} 个表格，"
+                f"用时: {format_duration(total_time)}（已保存检查点，可继续转换重新提取失败的批次）",
+                total_tables_found
+            )
+            return False
+        
+        # 所有批次都已写入，检查点不再需要
+        journal.discard()
+        
+        if state["failed_tables"]:
+            # 有表格没有写入输出文件，不能当作成功
+            progress_callback(
+                100,
+                f"⚠️ {state['failed_tables']} 个表格保存失败（详见批次日志），已保存 {state['saved_tables']} 个表格，"
+                f"用时: {format_duration(total_time)}",
+                total_tables_found
+            )
+            return False
+        
+        if state["saved_tables"] == 0:
+            progress_callback(100, "⚠️ 未找到任何表格", 0)
+            return False
+        
+        stitched_text = f"（合并了 {state['stitched_tables']} 个跨页续表）" if state["stitched_tables"] else ""
+        template_text = f"，版式模板: {template['name']}" if template is not None else ""
+        progress_callback(
+            100, 
+            f"✅ 完成! 已保存 {state['saved_tables']} 个表格{stitched_text}，用时: {format_duration(total_time)}"
+            f"{template_text}", 
+            total_tables_found
+        )
+        return True
+            
+    except Exception as e:
+        progress_callback(0, f"转换过程中出错: {str(e)}", 0)
+        return False
+    finally:
+        def release_batch_files(token=cancel_token, batch_splitter=splitter):
+            if token is not None:
+                remove_file(token)
+            if batch_splitter is not None:
+                batch_splitter.close()
+        
+        # 仍在运行的批次结束后才删除取消标记，否则它们会继续提取剩余的页
+        when_all_done(lingering, release_batch_files)
+        if journal is not None:
+            journal.close()
+        add_span("conversion", conversion_start, time.time(), pdf=os.path.basename(pdf_path))
+        restore(previous_sink)
+
+def check_java_installation():
+    """检查Java是否已安装"""
+    try:
+        import subprocess
+        result = subprocess.run(['java', '-version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        return result.returncode == 0
+    except:
+        return False
@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 提取结果缓存
+以 (文件内容哈希, 页码, 提取参数, tabula版本[, 提取器]) 为键，在磁盘上按页缓存提取出的表格，
+重复转换同一份PDF时命中的页不再经过tabula；缓存大小有上限，按最近使用时间淘汰
+"""
+
+import os
+import sys
+import json
+import pickle
+import hashlib
+import threading
+
+import tabula
+from tabula.backend import TABULA_JAVA_VERSION
+
+from extraction_pool import serialize_tables, deserialize_tables
+
+# 缓存格式版本，存储格式变化时递增以使旧缓存失效
+CACHE_FORMAT_VERSION = 3
+# 默认缓存大小上限（MB）
+DEFAULT_CACHE_SIZE_MB = 1024
+CACHE_FILE_SUFFIX = ".tables"
+
+def default_cache_dir():
+    """获取各平台的默认缓存目录"""
+    if sys.platform == 'win32':
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "pdf2excel", "cache")
+    elif sys.platform == 'darwin':
+        return os.path.join(os.path.expanduser("~"), "Library", "Caches", "pdf2excel")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pdf2excel")
+
+class ExtractionCache:
+    """按页缓存提取结果的磁盘缓存（LRU淘汰，多进程共享同一目录）"""
+
+    def __init__(self, cache_dir=None, max_size_mb=DEFAULT_CACHE_SIZE_MB):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_size = max_size_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        self._file_hashes = {}
+        self._size = None  # 当前缓存总大小，首次写入时扫描得到
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def file_hash(self, pdf_path):
+        """计算PDF文件内容的SHA-256，按 (路径, 大小, 修改时间) 记忆避免重复读取"""
+        stat = os.stat(pdf_path)
+        memo_key = (os.path.abspath(pdf_path), stat.st_size, stat.st_mtime)
+        digest = self._file_hashes.get(memo_key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(pdf_path, 'rb') as pdf_file:
+                for block in iter(lambda: pdf_file.read(1024 * 1024), b""):
+                    sha.update(block)
+            digest = sha.hexdigest()
+            self._file_hashes[memo_key] = digest
+        return digest
+
+    def _entry_path(self, file_hash, page, options, extractor=None):
+        key_fields = {
+            "format": CACHE_FORMAT_VERSION,
+            "file": file_hash,
+            "page": page,
+            "options": options,
+            "tabula": tabula.__version__,
+            "tabula_java": TABULA_JAVA_VERSION,
+        }
+        if extractor:
+            key_fields["extractor"] = extractor  # 非tabula的提取器（tabula的键保持不变，已有缓存继续有效）
+        key_source = json.dumps(key_fields, sort_keys=True, default=str)
+        key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key + CACHE_FILE_SUFFIX)
+
+    def get(self, file_hash, page, options, extractor=None):
+        """读取一页的缓存表格，未命中返回None"""
+        path = self._entry_path(file_hash, page, options, extractor)
+        try:
+            with open(path, 'rb') as cache_file:
+                tables = deserialize_tables(cache_file.read())
+            os.utime(path)  # 更新访问时间，用于LRU淘汰
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+            return None  # 不存在或已损坏
+        return tables
+
+    def put(self, file_hash, page, options, tables, extractor=None):
+        """写入一页的表格（原子替换，崩溃时不会留下半个文件）"""
+        path = self._entry_path(file_hash, page, options, extractor)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = serialize_tables(tables)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as cache_file:
+            cache_file.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan()[1]
+            else:
+                self._size += len(data)
+            over_limit = self._size > self.max_size
+        if over_limit:
+            self.evict()
+
+    def _scan(self):
+        """扫描缓存目录，返回 ([(修改时间, 大小, 路径)], 总大小)"""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(CACHE_FILE_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        return entries, total
+
+    def evict(self):
+        """按最近使用时间淘汰，直到缓存降到上限的80%"""
+        entries, total = self._scan()
+        target = self.max_size * 0.8
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass  # 其他进程可能已删除
+        with self._lock:
+            self._size = total
+
+    def clear(self):
+        """清空缓存"""
+        entries, _ = self._scan()
+        for _, _, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._size = 0
+
+    def size_mb(self):
+        """当前缓存大小（MB）"""
+        return self._scan()[1] / 1024 / 1024
+
+def extract_pages_cached(document, pages, cache=None, cancel_token=None):
+    """
+    逐页查缓存后提取，未命中的页一次提取并写回缓存
+
+    返回 (按页序排列的表格列表, 命中页数, 未命中页数)。
+    子进程模式无法区分表格所在页，此时不使用缓存；
+    cancel_token 见 TabulaDocument.extract，取消时抛出ExtractionCancelled
+    """
+    pages = list(pages)
+    if cache is None or not document.page_aware:
+        return document.extract(pages, cancel_token), 0, 0
+
+    file_hash = cache.file_hash(document.pdf_path)
+    extractor = getattr(document, "extractor", None)
+    page_tables = {}
+    missing = []
+    for page in pages:
+        tables = cache.get(file_hash, page, document.options, extractor)
+        if tables is None:
+            missing.append(page)
+        else:
+            page_tables[page] = tables
+
+    if missing:
+        extracted = {page: [] for page in missing}
+        for table in document.extract(missing, cancel_token):
+            extracted[table.attrs["page"]].append(table)
+        for page, tables in extracted.items():
+            cache.put(file_hash, page, document.options, tables, extractor)
+        page_tables.update(extracted)
+
+    result = []
+    for page in pages:
+        result.extend(page_tables[page])
+    return result, len(pages) - len(missing), len(missing)
+
+# 每个进程共享的缓存实例
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """获取当前进程共享的默认缓存"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExtractionCache()
+    return _cache
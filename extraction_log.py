@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 批次提取日志
+提取器在提取过程中的输出（tabula-py和pdfminer/pdfplumber的日志与警告、tabula-java子进程的标准错误、
+批次的出错信息）按线程收集到各批次自己的日志中，随提取结果返回，由界面或命令行按批次展示
+
+不再在提取期间替换全局的 sys.stdout / sys.stderr：并发的批次各自收集，互不干扰，
+界面和命令行自己的输出不会被吞掉，也不会因为恢复顺序错乱而停留在已关闭的空设备上；
+jvm模式下tabula-java的日志在启动JVM时已按tabula的silent方式关闭
+"""
+
+import sys
+import logging
+import warnings
+import threading
+import contextlib
+
+# 收集输出的第三方日志记录器（含其下级记录器）
+EXTRACTOR_LOGGERS = ("tabula", "pdfminer", "pdfplumber")
+# 每个批次最多保留的记录数，超出部分只计数
+MAX_BATCH_RECORDS = 100
+# 单条记录保留的最大字符数（java异常堆栈可能很长）
+MAX_MESSAGE_CHARS = 2000
+
+_local = threading.local()
+_install_lock = threading.Lock()
+_installed = False
+_original_showwarning = None
+
+class BatchLog:
+    """一个批次的提取日志，records 为字典列表（level、source、message），可直接序列化或跨进程传递"""
+
+    def __init__(self, label=None):
+        self.label = label
+        self.records = []
+        self.dropped = 0
+
+    def add(self, level, source, message):
+        message = str(message).strip()
+        if not message:
+            return
+        if len(self.records) >= MAX_BATCH_RECORDS:
+            self.dropped += 1
+            return
+        if len(message) > MAX_MESSAGE_CHARS:
+            message = message[:MAX_MESSAGE_CHARS] + "..."
+        self.records.append({"level": level, "source": source, "message": message})
+
+    def to_records(self):
+        """全部记录，超出上限时末尾附加一条省略说明"""
+        if not self.dropped:
+            return list(self.records)
+        return self.records + [{"level": "INFO", "source": "extraction_log",
+                                "message": f"另有 {self.dropped} 条输出已省略"}]
+
+class _BatchLogHandler(logging.Handler):
+    """把提取器日志交给当前线程的批次日志，当前线程没有在收集时按原样交给根日志记录器"""
+
+    def emit(self, record):
+        log = current_log()
+        if log is None:
+            logging.getLogger().handle(record)
+            return
+        try:
+            log.add(record.levelname, record.name, record.getMessage())
+        except Exception:
+            self.handleError(record)
+
+def _showwarning(message, category, filename, lineno, file=None, line=None):
+    log = current_log()
+    if log is None:
+        _original_showwarning(message, category, filename, lineno, file, line)
+    else:
+        log.add("WARNING", category.__name__, message)
+
+def _install():
+    """
+    一次性安装输出路由（进程内只执行一次，之后不再改动全局状态）
+
+    提取器的日志记录器改为经由本模块的处理器输出，warnings的显示函数按线程分流
+    """
+    global _installed, _original_showwarning
+    with _install_lock:
+        if _installed:
+            return
+        handler = _BatchLogHandler()
+        for name in EXTRACTOR_LOGGERS:
+            logger = logging.getLogger(name)
+            logger.addHandler(handler)
+            logger.propagate = False
+        _original_showwarning = warnings.showwarning
+        warnings.showwarning = _showwarning
+        _installed = True
+
+def current_log():
+    """当前线程正在收集的批次日志，没有时为None"""
+    return getattr(_local, "log", None)
+
+@contextlib.contextmanager
+def capture_extraction_output(label=None):
+    """
+    在with块中收集当前线程的提取器输出，返回BatchLog
+
+    只影响当前线程，其他线程（包括界面线程和并发的批次）的输出照常进行；可以嵌套
+    """
+    _install()
+    log = BatchLog(label)
+    previous = current_log()
+    _local.log = log
+    try:
+        yield log
+    finally:
+        _local.log = previous
+
+def record_output(level, source, message):
+    """记录一条提取器输出：当前线程正在收集时记入批次日志，否则输出到标准错误"""
+    log = current_log()
+    if log is not None:
+        log.add(level, source, message)
+    elif sys.stderr is not None:
+        print(f"[{level}] {source}: {message}", file=sys.stderr)
+
+def format_record(record):
+    """一条记录的单行文本"""
+    message = " ".join(record["message"].split())
+    return f"[{record['level']}] {record['source']}: {message}"
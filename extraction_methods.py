@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 逐页选择提取方式
+有框线的页先用lattice（按框线切分单元格），没有框线的页先用stream（按文本对齐推断列）；
+提取结果按廉价的启发式打分（各行填充的列数是否一致、空单元格比例），
+只有得分低的页才用另一种方式重新提取并保留得分高的结果，不必把整个文档用两种方式各跑一遍
+
+两个后端（tabula和pdfplumber）共用，打分基于tabula-java的JSON结构
+"""
+
+from collections import Counter
+
+# 提取方式
+METHOD_AUTO = "auto"        # 逐页按框线选择，得分低时改用另一种方式
+METHOD_GUESS = "guess"      # tabula默认的自动判断（原有方式）；pdfplumber后端等同于不打分的auto
+METHOD_LATTICE = "lattice"  # 总是按框线
+METHOD_STREAM = "stream"    # 总是按文本对齐
+METHODS = (METHOD_AUTO, METHOD_GUESS, METHOD_LATTICE, METHOD_STREAM)
+
+# 至少有这么多条框线（直线或矩形边）时先用lattice
+MIN_LATTICE_RULINGS = 4
+# 页面得分低于此值时用另一种方式重新提取
+MIN_PAGE_SCORE = 0.6
+
+def table_score(data):
+    """
+    一个表格的得分（0-1）：各行填充列数的一致程度 x 非空单元格比例
+
+    data 为tabula-java JSON中一个表格的 "data"；不足两行或两列的表格得0分
+    """
+    filled = [sum(1 for cell in row if cell["text"].strip()) for row in data]
+    columns = max((len(row) for row in data), default=0)
+    if len(filled) < 2 or columns < 2:
+        return 0.0
+    fill_ratio = sum(filled) / (len(filled) * columns)
+    # 允许个别列可空（如备注列），填充列数与众数相差不超过1的行都算一致
+    modal = Counter(filled).most_common(1)[0][0]
+    consistency = sum(1 for count in filled if abs(count - modal) <= 1) / len(filled)
+    return consistency * fill_ratio
+
+def page_score(raw_json):
+    """一页所有表格按单元格数加权的平均得分，没有表格时为None"""
+    weighted = 0.0
+    cells = 0
+    for table in raw_json:
+        size = sum(len(row) for row in table["data"])
+        weighted += table_score(table["data"]) * size
+        cells += size
+    return weighted / cells if cells else None
+
+def choose_page_tables(extract, ruling_count):
+    """
+    按框线数选择提取方式，得分低时用另一种方式重试
+
+    extract(method) 按指定方式提取当前页并返回tabula JSON结构；
+    返回 (raw_json, 使用的方式, 是否重试过)。
+    首选方式没有找到表格时，另一种方式的结果得分达到MIN_PAGE_SCORE才采用，避免把正文当成表格；
+    首选方式只找到0分的碎片（如框住正文的单个方框）而另一种方式没有找到表格时，认为本页没有表格；
+    页面没有任何框线时lattice不可能找到表格，不再重试
+    """
+    method = METHOD_LATTICE if ruling_count >= MIN_LATTICE_RULINGS else METHOD_STREAM
+    raw_json = extract(method)
+    score = page_score(raw_json)
+    if score is not None and score >= MIN_PAGE_SCORE:
+        return raw_json, method, False
+
+    other = METHOD_STREAM if method == METHOD_LATTICE else METHOD_LATTICE
+    if other == METHOD_LATTICE and ruling_count == 0:
+        return raw_json, method, False
+    other_json = extract(other)
+    other_score = page_score(other_json)
+    if other_score is None:
+        return ([] if score == 0.0 else raw_json), method, True
+    if other_score >= MIN_PAGE_SCORE if score is None else other_score > score:
+        return other_json, other, True
+    return raw_json, method, True
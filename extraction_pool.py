@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 多进程提取引擎
+每个工作进程持有自己的常驻JVM（pdfplumber后端不需要）和已打开的PDF文档，从共享任务队列中领取页码范围，
+提取结果以紧凑的序列化格式（Arrow IPC，未安装pyarrow时为pickle-5）返回主进程
+"""
+
+import os
+import io
+import sys
+import json
+import atexit
+import pickle
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import psutil
+
+from tabula_backend import get_backend, BACKEND_AUTO
+
+_pyarrow = None
+
+def _arrow():
+    """首次序列化时才导入pyarrow（可选依赖，未安装时返回None）"""
+    global _pyarrow
+    if _pyarrow is None:
+        try:
+            import pyarrow
+            _pyarrow = pyarrow
+        except ImportError:
+            _pyarrow = False
+    return _pyarrow or None
+
+# 提取引擎
+ENGINE_THREAD = "thread"    # 线程池（所有线程共享一个JVM）
+ENGINE_PROCESS = "process"  # 进程池（每个进程一个JVM和打开的PDF）
+ENGINES = (ENGINE_THREAD, ENGINE_PROCESS)
+
+# 每个工作进程预估占用的内存（JVM堆 + pandas），单位MB
+WORKER_MEMORY_MB = 512
+# 每个工作进程的JVM最大堆，防止多个JVM各自按物理内存1/4分配堆
+WORKER_JAVA_HEAP_MB = 1024
+# 每个工作进程保持打开的PDF文档数
+MAX_OPEN_DOCUMENTS = 2
+
+def choose_worker_count(engine=ENGINE_THREAD):
+    """根据CPU核心数和可用内存确定并行工作数"""
+    cpu_count = multiprocessing.cpu_count()
+    if engine != ENGINE_PROCESS:
+        return max(1, min(cpu_count - 1, 4))  # 保留至少一个核心给系统
+
+    # 进程池不受线程共享JVM的限制，可以用满空闲核心，但不能超出可用内存
+    available_mb = psutil.virtual_memory().available / 1024 / 1024
+    by_memory = int(available_mb * 0.7 // WORKER_MEMORY_MB)
+    return max(1, min(cpu_count - 1, by_memory))
+
+def serialize_tables(tables):
+    """将DataFrame列表序列化为紧凑的字节串，保留 attrs（如页码）"""
+    pa = _arrow()
+    items = []
+    for df in tables:
+        data = None
+        if pa is not None:
+            try:
+                sink = io.BytesIO()
+                arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+                with pa.ipc.new_stream(sink, arrow_table.schema) as writer:
+                    writer.write_table(arrow_table)
+                data = ("arrow", sink.getvalue())
+            except (pa.ArrowException, TypeError, ValueError):
+                data = None  # 混合类型等无法转换的列，退回pickle
+        if data is None:
+            data = ("pickle", pickle.dumps(df, protocol=5))
+        items.append((data, dict(df.attrs)))
+    return pickle.dumps(items, protocol=5)
+
+def deserialize_tables(payload):
+    """反序列化 serialize_tables 的结果"""
+    tables = []
+    for (kind, data), attrs in pickle.loads(payload):
+        if kind == "arrow":
+            with _arrow().ipc.open_stream(data) as reader:
+                df = reader.read_all().to_pandas()
+        else:
+            df = pickle.loads(data)
+        df.attrs.update(attrs)
+        tables.append(df)
+    return tables
+
+# ---- 工作进程 ----
+
+_worker_java_options = None
+_worker_cache = None
+_worker_documents = OrderedDict()
+# 工作进程启动时（启动JVM）的时间段，随本进程处理的第一个批次返回
+_worker_startup_spans = []
+
+def _redirect_worker_stdout():
+    """
+    工作进程的标准输出（文件描述符1）并入标准错误
+
+    工作进程继承主进程的文件描述符，而主进程的标准输出可能是命令行的JSON行通道；
+    批次的输出已收集在批次日志中，其余直接写到描述符的输出（如JVM的警告）只应出现在标准错误
+    """
+    try:
+        sys.stdout.flush()
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    except (AttributeError, OSError, ValueError):
+        pass  # 没有控制台的打包程序中标准流不可用
+
+def _init_worker(backend_mode, java_options, use_cache):
+    """工作进程初始化：预先启动本进程的提取后端（tabula后端启动常驻JVM）"""
+    from conversion_trace import collect_spans
+
+    global _worker_java_options, _worker_cache, _worker_startup_spans
+    _redirect_worker_stdout()
+    _worker_java_options = java_options
+    with collect_spans() as spans:
+        get_backend(backend_mode, java_options=java_options)
+    _worker_startup_spans = spans
+    if use_cache:
+        from extraction_cache import get_cache
+        _worker_cache = get_cache()
+    atexit.register(_close_worker_documents)
+
+def _close_worker_documents():
+    while _worker_documents:
+        _, document = _worker_documents.popitem()
+        try:
+            document.close()
+        except Exception:
+            pass
+
+def _get_worker_document(pdf_path, backend_mode, method=None, hints=None):
+    """
+    获取本进程中已打开的PDF文档，按修改时间区分同名文件
+
+    后端、提取方式和模板参数按批次参数选择，同一进程池可以同时处理设置不同的任务
+    """
+    key = (os.path.abspath(pdf_path), os.path.getmtime(pdf_path), backend_mode, method,
+           json.dumps(hints, sort_keys=True))
+    document = _worker_documents.get(key)
+    if document is None:
+        from conversion_trace import span
+
+        with span("open_document"):
+            backend = get_backend(backend_mode, java_options=_worker_java_options)
+            document = backend.open_document(pdf_path, method=method, **(hints or {}))
+        _worker_documents[key] = document
+        while len(_worker_documents) > MAX_OPEN_DOCUMENTS:
+            _, old_document = _worker_documents.popitem(last=False)
+            old_document.close()
+    else:
+        _worker_documents.move_to_end(key)
+    return document
+
+def extract_batch_in_worker(args):
+    """
+    在工作进程中提取一个页码范围，返回 (序列化的表格, 表格数, (缓存命中页数, 未命中页数), 日志记录, 时间段, 是否失败)
+
+    参数、日志记录、时间段和是否失败与 converter_engine.process_batch 相同；
+    记录时间段时，本进程的第一个批次另外带回进程启动时的时间段
+    """
+    from extraction_cache import extract_pages_cached
+    from extraction_log import capture_extraction_output
+    from conversion_trace import span, collect_spans
+    from memory_budget import rss_mb
+    from tabula_backend import ExtractionCancelled
+    from pdf_subsetting import open_batch_document
+    
+    pdf_path, start_page, end_page = args[:3]
+    backend_mode = args[3] if len(args) > 3 else BACKEND_AUTO
+    use_cache = args[4] if len(args) > 4 else True
+    pages = args[5] if len(args) > 5 and args[5] is not None else range(start_page, end_page + 1)
+    cancel_token = args[6] if len(args) > 6 else None
+    method = args[7] if len(args) > 7 else None
+    hints = args[8] if len(args) > 8 else None
+    subset_path = args[9] if len(args) > 9 else None
+    traced = args[10] if len(args) > 10 else False
+    if not pages:
+        return serialize_tables([]), 0, (0, 0), [], [], False
+    page_range = f"{start_page}-{end_page}"
+    # 批次关闭缓存时不读写缓存（进程池创建时没有开启缓存的，批次也无法使用缓存）
+    cache = _worker_cache if use_cache else None
+    with collect_spans(traced) as spans, span("batch", pages=page_range) as info:
+        if info is not None:
+            info["rss_before_mb"] = round(rss_mb(), 1)
+        with capture_extraction_output(page_range) as log:
+            failed = False
+            try:
+                if subset_path is None:
+                    document = _get_worker_document(pdf_path, backend_mode, method, hints)
+                    with span("extract", pages=len(pages)):
+                        tables, hits, misses = extract_pages_cached(document, pages, cache, cancel_token)
+                else:
+                    # 子文档只属于这一个批次，用完即关闭，不放入已打开文档的缓存
+                    pages = list(pages)
+                    with span("open_document", subset=True):
+                        backend = get_backend(backend_mode, java_options=_worker_java_options)
+                        document = open_batch_document(backend, pdf_path, pages, subset_path, method, hints)
+                    try:
+                        with span("extract", pages=len(pages)):
+                            tables, hits, misses = extract_pages_cached(document, pages, cache, cancel_token)
+                    finally:
+                        document.close()
+            except ExtractionCancelled:
+                raise  # 取消的批次不能当作空结果记入检查点
+            except Exception as e:
+                log.add("ERROR", "extraction_pool", f"处理页 {page_range} 出错: {str(e)}")
+                tables, hits, misses, failed = [], 0, 0, True
+        with span("serialize"):
+            payload = serialize_tables(tables)
+        if info is not None:
+            info.update(tables=len(tables), rss_after_mb=round(rss_mb(), 1))
+    if traced:
+        spans[:0] = _worker_startup_spans
+    _worker_startup_spans.clear()
+    return payload, len(tables), (hits, misses), log.to_records(), spans, failed
+
+def terminate_pool(executor):
+    """
+    强制结束进程池的工作进程（取消后在宽限时间内仍未退出时使用）
+
+    ProcessPoolExecutor没有公开的终止接口，这里直接访问其内部的进程表；
+    被结束的进程池随后会标记为broken，不能再提交任务
+    """
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        if process.is_alive():
+            process.terminate()
+
+def create_process_pool(workers, backend=BACKEND_AUTO, use_cache=False):
+    """创建提取进程池，每个进程预先启动backend指定的后端（tabula后端为JVM）"""
+    # JVM启动后不能安全fork，工作进程一律使用spawn方式创建
+    java_options = [f"-Xmx{WORKER_JAVA_HEAP_MB}m"]
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(backend, java_options, use_cache),
+    )
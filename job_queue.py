@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 多文件转换队列
+排队的PDF共享同一个提取执行器（全局并行预算），同时运行的转换数有上限，
+空出位置时优先启动页数最少的任务，短任务不会被排在前面的超大文件挡住；
+正在运行的转换各自只保持有限个在途批次，在共享执行器中交替执行
+"""
+
+import os
+import time
+import threading
+
+# 任务状态
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+# 同时进行的转换数上限
+MAX_ACTIVE_JOBS = 3
+
+class ConversionJob:
+    """队列中的一个转换任务"""
+
+    def __init__(self, job_id, pdf_path, output_path, skip_empty_pages=False, resume=False, stitch_tables=True,
+                 output_format=None, backend=None, use_templates=True, trace=False, workers=None):
+        self.job_id = job_id
+        self.pdf_path = pdf_path
+        self.output_path = output_path
+        self.skip_empty_pages = skip_empty_pages
+        self.resume = resume
+        self.stitch_tables = stitch_tables
+        self.output_format = output_format
+        self.backend = backend  # 提取后端，None时使用队列的设置
+        self.use_templates = use_templates
+        self.workers = workers  # 本任务同时在途的批次按此并行数计算，None时使用执行器的全部工作数
+        self.layouts = []  # 转换中收集的表格版式摘要，成功后可保存为版式模板
+        self.trace = None  # 记录各阶段用时时为ConversionTrace（见 conversion_trace）
+        if trace:
+            from conversion_trace import ConversionTrace
+            self.trace = ConversionTrace(pdf_path)
+        self.total_pages = None  # 加入队列后在调度线程中读取
+        self.status = JOB_QUEUED
+        self.percent = 0
+        self.tables_found = 0
+        self.message = "等待中"
+        self.start_time = None
+        self.end_time = None
+        self.cancel_flag = {"cancel": False}
+
+    @property
+    def name(self):
+        return os.path.basename(self.pdf_path)
+
+    @property
+    def pages_done(self):
+        return int((self.total_pages or 0) * self.percent / 100)
+
+    @property
+    def pages_per_second(self):
+        """按已完成页数计算的吞吐量"""
+        if self.start_time is None:
+            return 0.0
+        elapsed = (self.end_time or time.time()) - self.start_time
+        return self.pages_done / elapsed if elapsed > 0 else 0.0
+
+class ConversionQueue:
+    """
+    多文件转换队列
+
+    - on_progress(job, percent, status_text, tables_found): 任务进度回调（在工作线程中调用）
+    - on_finished(job): 任务结束回调（在工作线程中调用）
+    - on_log(job, start_page, end_page, records): 批次日志回调，只对有提取器输出或出错的批次调用
+      （在工作线程中调用，records见 converter_engine.process_batch）
+    执行器在队列开始处理时按当时的引擎和缓存设置创建，队列处理完后关闭；
+    keep_executor 为True时队列空闲后保留执行器（常驻服务不必每次重新启动工作进程和JVM），由 close() 关闭
+    """
+
+    def __init__(self, on_progress=None, on_finished=None, max_active=MAX_ACTIVE_JOBS, on_log=None,
+                 keep_executor=False):
+        self.on_progress = on_progress
+        self.on_finished = on_finished
+        self.on_log = on_log
+        self.max_active = max_active
+        self.keep_executor = keep_executor
+        self.engine = None
+        self.backend = None
+        self.use_cache = True
+        self.workers = None  # 执行器的工作数，None时按CPU和内存自动确定
+        self.jobs = []
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._scheduler = None
+        self._executor = None
+        self._workers = None
+
+    def configure(self, engine, use_cache, backend=None, workers=None):
+        """设置引擎、缓存和执行器的工作数（只在队列空闲且没有保留的执行器时生效）"""
+        with self._lock:
+            if not self.is_running_locked() and self._executor is None:
+                self.engine = engine
+                self.use_cache = use_cache
+                self.backend = backend
+                self.workers = workers
+
+    def add(self, pdf_path, output_path, skip_empty_pages=False, resume=False, stitch_tables=True, output_format=None,
+            backend=None, use_templates=True, trace=False, workers=None):
+        """
+        加入一个任务，返回ConversionJob（backend为本任务的提取后端，默认使用队列的设置；
+        trace为True时记录各阶段用时，见 ConversionJob.trace；workers见 ConversionJob.workers）
+        """
+        with self._lock:
+            job = ConversionJob(self._next_id, pdf_path, output_path, skip_empty_pages, resume, stitch_tables,
+                                output_format, backend, use_templates, trace, workers)
+            self._next_id += 1
+            self.jobs.append(job)
+            if self._scheduler is None:
+                self._scheduler = threading.Thread(target=self._run_scheduler, daemon=True)
+                self._scheduler.start()
+            self._wakeup.notify_all()
+        return job
+
+    def cancel(self, job=None):
+        """取消一个任务；job为None时取消全部未完成的任务"""
+        with self._lock:
+            targets = [job] if job is not None else list(self.jobs)
+            for target in targets:
+                if target.status == JOB_QUEUED:
+                    target.status = JOB_CANCELLED
+                    target.message = "已取消"
+                    target.end_time = time.time()
+                elif target.status == JOB_RUNNING:
+                    target.cancel_flag["cancel"] = True
+            self._wakeup.notify_all()
+
+    def remove_finished(self):
+        """从列表中移除已结束的任务"""
+        with self._lock:
+            self.jobs = [job for job in self.jobs if job.status not in FINISHED_STATES]
+
+    def remove(self, job):
+        """从列表中移除一个已结束的任务，返回是否移除"""
+        with self._lock:
+            if job.status not in FINISHED_STATES or job not in self.jobs:
+                return False
+            self.jobs.remove(job)
+            return True
+
+    def close(self):
+        """取消全部任务，等调度线程结束后关闭保留的执行器"""
+        self.cancel()
+        with self._lock:
+            scheduler = self._scheduler
+        if scheduler is not None:
+            scheduler.join()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def is_running_locked(self):
+        return any(job.status in (JOB_QUEUED, JOB_RUNNING) for job in self.jobs)
+
+    def is_running(self):
+        with self._lock:
+            return self.is_running_locked()
+
+    def totals(self):
+        """返回 (已完成页数, 总页数)，用于总进度"""
+        with self._lock:
+            jobs = [job for job in self.jobs if job.status != JOB_CANCELLED and job.total_pages]
+        return sum(job.pages_done for job in jobs), sum(job.total_pages for job in jobs)
+
+    # ---- 调度线程 ----
+
+    def _read_page_counts(self):
+        """
+        读取新任务的页数（页数用于挑选短任务和计算吞吐量）
+
+        解析PDF可能要数秒，不持有锁进行，只在挑选任务和写回结果时加锁，不阻塞界面线程查询队列
+        """
+        import PyPDF2
+
+        with self._lock:
+            pending = [job for job in self.jobs if job.total_pages is None and job.status == JOB_QUEUED]
+        counts = []
+        for job in pending:
+            try:
+                with open(job.pdf_path, 'rb') as pdf_file:
+                    counts.append((job, len(PyPDF2.PdfReader(pdf_file).pages), None))
+            except Exception as e:
+                counts.append((job, 0, f"无法读取PDF: {str(e)}"))
+
+        failed = []
+        with self._lock:
+            for job, total_pages, error in counts:
+                job.total_pages = total_pages
+                if error is not None and job.status == JOB_QUEUED:
+                    job.status = JOB_FAILED
+                    job.message = error
+                    job.end_time = time.time()
+                    failed.append(job)
+        if self.on_finished:
+            for job in failed:
+                self.on_finished(job)
+
+    def job_backend(self, job):
+        """任务使用的提取后端"""
+        from tabula_backend import BACKEND_AUTO
+        return job.backend or self.backend or BACKEND_AUTO
+
+    def _create_executor(self, job):
+        """创建执行器；进程池的工作进程预先启动第一个任务的后端，其他后端在首次用到时启动"""
+        from concurrent.futures import ThreadPoolExecutor
+        from extraction_pool import ENGINE_PROCESS, choose_worker_count, create_process_pool
+
+        self._workers = self.workers or choose_worker_count(self.engine)
+        if self.engine == ENGINE_PROCESS:
+            self._executor = create_process_pool(self._workers, self.job_backend(job), self.use_cache)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self._workers)
+
+    def _run_scheduler(self):
+        while True:
+            self._read_page_counts()
+            with self._lock:
+                running = [job for job in self.jobs if job.status == JOB_RUNNING]
+                queued = [job for job in self.jobs if job.status == JOB_QUEUED]
+                if not running and not queued:
+                    # 队列处理完，关闭执行器（等新任务加入后重新创建）；保留执行器时由close()关闭
+                    executor = None
+                    if not self.keep_executor:
+                        executor, self._executor = self._executor, None
+                    self._scheduler = None
+                    break
+                if any(queued_job.total_pages is None for queued_job in queued):
+                    continue  # 读取页数后新加入的任务，先读取页数再挑选
+                if queued and len(running) < self.max_active:
+                    # 最短任务优先
+                    job = min(queued, key=lambda queued_job: (queued_job.total_pages, queued_job.job_id))
+                    if self._executor is None:
+                        self._create_executor(job)
+                    job.status = JOB_RUNNING
+                    job.message = "开始转换"
+                    job.start_time = time.time()
+                    threading.Thread(target=self._run_job, args=(job, self._executor), daemon=True).start()
+                    continue
+                self._wakeup.wait(timeout=0.5)
+
+        if executor is not None:
+            executor.shutdown(wait=True)  # 所有任务都已结束，等待工作进程正常退出
+
+    def _run_job(self, job, executor):
+        from converter_engine import convert_pdf_to_excel
+
+        def progress(percent, status_text, tables_found):
+            job.percent = percent
+            job.message = status_text
+            job.tables_found = tables_found
+            if self.on_progress:
+                self.on_progress(job, percent, status_text, tables_found)
+
+        def batch_log(start_page, end_page, records):
+            if self.on_log:
+                self.on_log(job, start_page, end_page, records)
+
+        try:
+            ok = convert_pdf_to_excel(
+                job.pdf_path, job.output_path, progress, job.cancel_flag,
+                backend=self.job_backend(job), engine=self.engine, use_cache=self.use_cache,
+                skip_empty_pages=job.skip_empty_pages, executor=executor,
+                workers=min(job.workers or self._workers, self._workers),
+                resume=job.resume, stitch_tables=job.stitch_tables, output_format=job.output_format,
+                use_templates=job.use_templates, layouts=job.layouts, log_callback=batch_log, trace=job.trace
+            )
+        except Exception as e:
+            ok = False
+            job.message = f"转换过程中出错: {str(e)}"
+
+        with self._lock:
+            if job.cancel_flag["cancel"]:
+                job.status = JOB_CANCELLED
+            else:
+                job.status = JOB_DONE if ok else JOB_FAILED
+            job.end_time = time.time()
+            self._wakeup.notify_all()
+        if self.on_finished:
+            self.on_finished(job)
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 版式模板
+每天转换的银行、ERP报表版式固定，每页重新猜测表格区域既慢又不稳定。
+一次成功的转换可以保存为模板：表格区域（area）、列分隔位置（columns）和提取方式，
+以第一页的指纹（页面尺寸、有无框线、页首的标签文字）为键；
+之后转换的PDF与模板指纹足够相似时直接按模板提取，跳过表格检测
+
+模板保存在用户配置目录下的 templates.json 中
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import threading
+import statistics
+
+from page_analysis import scan_page, MIN_TABLE_RULINGS
+from extraction_methods import METHOD_AUTO, METHOD_STREAM
+
+# 模板文件格式版本
+TEMPLATE_FORMAT_VERSION = 1
+TEMPLATE_FILE_NAME = "templates.json"
+# 指纹中保留的页首标签词数（按内容流顺序，标题、表头通常在前面）
+FINGERPRINT_LABELS = 40
+# 页面尺寸允许的偏差（点）
+SIZE_TOLERANCE = 2.0
+# 标签词的Jaccard相似度达到此值才算匹配
+MIN_TEMPLATE_SIMILARITY = 0.7
+# 表格区域向外扩展的边距（点），容忍每天的细微位移
+AREA_MARGIN = 5.0
+
+# 标签词：不含数字的字母串（金额、日期、编号每天都变，不参与指纹）
+_LABEL_RE = re.compile(r"[^\W\d_]{2,}")
+
+def default_template_dir():
+    """获取各平台的默认配置目录"""
+    if sys.platform == 'win32':
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "pdf2excel")
+    elif sys.platform == 'darwin':
+        return os.path.join(os.path.expanduser("~"), "Library", "Application Support", "pdf2excel")
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, "pdf2excel")
+
+def page_fingerprint(page):
+    """
+    一页的版式指纹（可JSON序列化的字典）
+
+    - size: 页面宽高（点）
+    - ruled: 是否有框线
+    - labels: 按出现顺序的前FINGERPRINT_LABELS个不同的标签词
+    """
+    box = page.mediabox
+    try:
+        text = page.extract_text() or ""
+    except Exception:
+        text = ""
+    labels = []
+    for word in _LABEL_RE.findall(text):
+        word = word.lower()
+        if word not in labels:
+            labels.append(word)
+            if len(labels) >= FINGERPRINT_LABELS:
+                break
+    return {
+        "size": [round(float(box.width), 1), round(float(box.height), 1)],
+        "ruled": scan_page(page, 1).ruling_ops >= MIN_TABLE_RULINGS,
+        "labels": labels,
+    }
+
+def pdf_fingerprint(pdf_reader):
+    """PDF第一页的版式指纹，空文档返回None"""
+    if not pdf_reader.pages:
+        return None
+    return page_fingerprint(pdf_reader.pages[0])
+
+def fingerprint_similarity(first, second):
+    """两个指纹的相似度（0-1）：尺寸或有无框线不同时为0，否则为标签词的Jaccard相似度"""
+    if first is None or second is None or first["ruled"] != second["ruled"]:
+        return 0.0
+    if any(abs(a - b) > SIZE_TOLERANCE for a, b in zip(first["size"], second["size"])):
+        return 0.0
+    labels, other_labels = set(first["labels"]), set(second["labels"])
+    if not labels or not other_labels:
+        return 0.0  # 没有文字的页无法区分版式
+    return len(labels & other_labels) / len(labels | other_labels)
+
+def table_layout(df):
+    """
+    一个表格的版式摘要 (提取方式, 列数, 区域, 列分隔位置)，用于保存模板；
+    没有区域信息的表格（旧缓存中的结果）返回None
+    """
+    area = df.attrs.get("area")
+    if area is None:
+        return None
+    return (df.attrs.get("extraction_method"), len(df.columns), list(area), df.attrs.get("column_separators"))
+
+def hints_from_layouts(layouts, page_height):
+    """
+    从一次转换的表格版式摘要生成模板的提取参数，没有可用的版式时返回None
+
+    区域为所有表格区域的并集（上、左、右各留AREA_MARGIN边距），下边界延伸到页面底部——
+    行数每天不同，按样本截断会丢掉多出来的行；
+    所有表格的提取方式相同时模板固定该方式，否则仍逐页选择（auto）；
+    全部为stream且列数相同时另外给出各列分隔位置的中位数
+    """
+    layouts = [layout for layout in layouts if layout is not None]
+    if not layouts:
+        return None
+    methods = {layout[0] for layout in layouts}
+    method = methods.pop() if len(methods) == 1 else METHOD_AUTO
+    top = max(0.0, min(layout[2][0] for layout in layouts) - AREA_MARGIN)
+    left = max(0.0, min(layout[2][1] for layout in layouts) - AREA_MARGIN)
+    right = max(layout[2][3] for layout in layouts) + AREA_MARGIN
+    area = [round(top, 1), round(left, 1), round(page_height, 1), round(right, 1)]
+    hints = {"method": method or METHOD_AUTO, "area": area}
+
+    column_counts = {layout[1] for layout in layouts}
+    if hints["method"] == METHOD_STREAM and len(column_counts) == 1 and column_counts.pop() > 1:
+        columns = []
+        for idx in range(layouts[0][1] - 1):
+            positions = [layout[3][idx] for layout in layouts
+                         if layout[3] and idx < len(layout[3]) and layout[3][idx] is not None]
+            if not positions:
+                columns = []  # 有列无法确定时交给提取器在区域内自行划分
+                break
+            columns.append(round(statistics.median(positions), 1))
+        if columns and columns == sorted(columns):
+            hints["columns"] = columns
+    return hints
+
+class TemplateRegistry:
+    """版式模板的注册表（JSON文件，原子替换写入）"""
+
+    def __init__(self, template_dir=None):
+        self.path = os.path.join(template_dir or default_template_dir(), TEMPLATE_FILE_NAME)
+        self._lock = threading.Lock()
+        self._templates = None
+        self._loaded_mtime = None
+
+    def templates(self):
+        """全部模板（列表，每个模板为字典: name、fingerprint、hints、created）"""
+        with self._lock:
+            return list(self._load())
+
+    def _load(self):
+        """读取模板文件，文件被其他进程修改后重新读取"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if self._templates is None or mtime != self._loaded_mtime:
+            templates = []
+            if mtime is not None:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as template_file:
+                        data = json.load(template_file)
+                    if data.get("version") == TEMPLATE_FORMAT_VERSION:
+                        templates = data.get("templates", [])
+                except (OSError, ValueError) as e:
+                    print(f"读取版式模板失败: {str(e)}", file=sys.stderr)
+            self._templates = templates
+            self._loaded_mtime = mtime
+        return self._templates
+
+    def _write(self, templates):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as template_file:
+            json.dump({"version": TEMPLATE_FORMAT_VERSION, "templates": templates}, template_file,
+                      ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+        self._templates = templates
+        self._loaded_mtime = os.path.getmtime(self.path)
+
+    def match(self, fingerprint):
+        """返回与指纹最相似且达到MIN_TEMPLATE_SIMILARITY的模板，没有时返回None"""
+        best, best_similarity = None, MIN_TEMPLATE_SIMILARITY
+        for template in self.templates():
+            similarity = fingerprint_similarity(fingerprint, template["fingerprint"])
+            if similarity >= best_similarity:
+                best, best_similarity = template, similarity
+        return best
+
+    def save(self, name, fingerprint, hints):
+        """保存模板（同名模板被替换），返回保存的模板"""
+        template = {"name": name, "fingerprint": fingerprint, "hints": hints,
+                    "created": time.strftime("%Y-%m-%d %H:%M:%S")}
+        with self._lock:
+            templates = [existing for existing in self._load() if existing["name"] != name]
+            templates.append(template)
+            self._write(templates)
+        return template
+
+    def remove(self, name):
+        """删除模板，返回是否存在"""
+        with self._lock:
+            templates = self._load()
+            remaining = [template for template in templates if template["name"] != name]
+            if len(remaining) == len(templates):
+                return False
+            self._write(remaining)
+        return True
+
+    def save_from_run(self, name, pdf_path, layouts):
+        """
+        用一次成功转换的结果保存模板
+
+        layouts 为转换过程中收集的表格版式摘要（见 convert_pdf_to_excel 的 layouts 参数）；
+        无法生成模板时返回None
+        """
+        import PyPDF2
+
+        with open(pdf_path, 'rb') as pdf_file:
+            fingerprint = pdf_fingerprint(PyPDF2.PdfReader(pdf_file))
+        if fingerprint is None:
+            return None
+        hints = hints_from_layouts(layouts, fingerprint["size"][1])
+        if hints is None:
+            return None
+        return self.save(name, fingerprint, hints)
+
+# 每个进程共享的注册表实例
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_registry():
+    """获取当前进程共享的默认模板注册表"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = TemplateRegistry()
+    return _registry
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 内存预算
+按采样的常驻内存（RSS）控制流水线：接近上限时减少同时在途的批次，
+超过上限时才回收内存，平时不做任何强制回收
+"""
+
+import os
+import gc
+import sys
+import time
+import ctypes
+import threading
+
+import psutil
+
+# 默认内存上限占物理内存的比例
+DEFAULT_MEMORY_FRACTION = 0.5
+# 超过上限的这一比例后开始收紧在途窗口
+SOFT_LIMIT_RATIO = 0.8
+# 两次RSS采样的最小间隔（秒），间隔内直接返回上次的值
+SAMPLE_INTERVAL = 0.25
+# 两次回收内存的最小间隔（秒），避免超限时每个批次都回收
+RELEASE_COOLDOWN = 5.0
+
+def rss_mb(process=None):
+    """进程的常驻内存（MB）"""
+    return (process or psutil.Process()).memory_info().rss / 1024 / 1024
+
+def default_memory_limit():
+    """默认内存上限（MB）"""
+    return psutil.virtual_memory().total / 1024 / 1024 * DEFAULT_MEMORY_FRACTION
+
+def release_memory():
+    """回收Python对象并把空闲的堆内存还给操作系统"""
+    collected = gc.collect()
+    if hasattr(os, 'malloc_trim'):  # Linux特有
+        os.malloc_trim(0)
+    elif sys.platform == 'darwin':
+        libc = ctypes.CDLL('libc.dylib')
+        if hasattr(libc, 'malloc_zone_pressure_relief'):
+            libc.malloc_zone_pressure_relief(None, 0)
+    return collected
+
+class MemoryBudget:
+    """
+    一次转换的内存预算
+
+    - limit_mb: 内存上限（MB），默认为物理内存的一半
+    - include_children: 是否把子进程（进程池的工作进程）计入用量
+    """
+
+    def __init__(self, limit_mb=None, include_children=False):
+        self.limit_mb = limit_mb or default_memory_limit()
+        self.include_children = include_children
+        self.samples = 0
+        self.releases = 0
+        self.peak_mb = 0.0
+        self._process = psutil.Process()
+        self._usage_mb = 0.0
+        self._sampled_at = 0.0
+        self._released_at = 0.0
+        self._lock = threading.Lock()
+
+    def usage(self):
+        """当前内存用量（MB），按SAMPLE_INTERVAL限频采样"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._sampled_at < SAMPLE_INTERVAL:
+                return self._usage_mb
+            self._sampled_at = now
+        usage_mb = rss_mb(self._process)
+        if self.include_children:
+            for child in self._process.children(recursive=True):
+                try:
+                    usage_mb += rss_mb(child)
+                except psutil.Error:
+                    pass  # 子进程已退出
+        with self._lock:
+            self._usage_mb = usage_mb
+            self.samples += 1
+            self.peak_mb = max(self.peak_mb, usage_mb)
+        return usage_mb
+
+    def window(self, max_in_flight):
+        """
+        当前允许的在途批次数
+
+        低于软上限时为max_in_flight，软上限到上限之间线性收紧，超过上限时为1（保证流水线仍能前进）
+        """
+        soft_limit = self.limit_mb * SOFT_LIMIT_RATIO
+        usage_mb = self.usage()
+        if usage_mb <= soft_limit:
+            return max_in_flight
+        if usage_mb >= self.limit_mb:
+            return 1
+        headroom = (self.limit_mb - usage_mb) / (self.limit_mb - soft_limit)
+        return max(1, int(max_in_flight * headroom))
+
+    def over_limit(self):
+        return self.usage() > self.limit_mb
+
+    def maybe_release(self):
+        """超过上限且距上次回收已过冷却时间时回收内存，返回是否回收"""
+        if not self.over_limit():
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if now - self._released_at < RELEASE_COOLDOWN:
+                return False
+            self._released_at = now
+            self.releases += 1
+            self._sampled_at = 0.0  # 回收后重新采样
+        release_memory()
+        return True
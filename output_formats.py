@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 输出格式
+格式常量和按输出路径判断格式、查找/删除已有输出的函数；
+不导入pandas等重型依赖，图形界面启动时也可以使用。写入器见 table_writers
+"""
+
+import os
+import glob
+
+OUTPUT_XLSX = "xlsx"            # Excel，每个表格一个工作表
+OUTPUT_XLSX_LONG = "xlsx-long"  # Excel长表：所有单元格在一个工作表中，每行一个单元格，带来源表格和页码
+OUTPUT_CSV = "csv"              # 每个表格一个CSV文件（<输出文件名>_Table_N.csv）
+OUTPUT_CSV_ZIP = "csv-zip"      # 每个表格一个CSV文件，打包在一个zip中
+OUTPUT_PARQUET = "parquet"      # 长表格式的Parquet文件（需要pyarrow）
+OUTPUT_ARROW = "arrow"          # 长表格式的Arrow IPC文件（需要pyarrow）
+OUTPUT_FORMATS = (OUTPUT_XLSX, OUTPUT_XLSX_LONG, OUTPUT_CSV, OUTPUT_CSV_ZIP, OUTPUT_PARQUET, OUTPUT_ARROW)
+
+# 各格式的文件扩展名
+FORMAT_EXTENSIONS = {
+    OUTPUT_XLSX: ".xlsx",
+    OUTPUT_XLSX_LONG: ".xlsx",
+    OUTPUT_CSV: ".csv",
+    OUTPUT_CSV_ZIP: ".zip",
+    OUTPUT_PARQUET: ".parquet",
+    OUTPUT_ARROW: ".arrow",
+}
+
+# 按扩展名推断格式（.xlsx默认为每表一个工作表）
+_EXTENSION_FORMATS = {
+    ".xlsx": OUTPUT_XLSX,
+    ".csv": OUTPUT_CSV,
+    ".zip": OUTPUT_CSV_ZIP,
+    ".parquet": OUTPUT_PARQUET,
+    ".arrow": OUTPUT_ARROW,
+    ".feather": OUTPUT_ARROW,
+}
+
+def format_from_path(output_path):
+    """按输出文件扩展名推断格式，无法识别时为xlsx"""
+    return _EXTENSION_FORMATS.get(os.path.splitext(output_path)[1].lower(), OUTPUT_XLSX)
+
+def has_known_extension(output_path):
+    return os.path.splitext(output_path)[1].lower() in _EXTENSION_FORMATS
+
+def csv_table_path(output_path, sheet_name):
+    """CSV格式下一个表格的文件路径"""
+    return f"{os.path.splitext(output_path)[0]}_{sheet_name}.csv"
+
+def output_files(output_path, output_format=None):
+    """本次转换的输出路径对应的已有文件（CSV格式为各表格的文件）"""
+    output_format = output_format or format_from_path(output_path)
+    if output_format == OUTPUT_CSV:
+        return sorted(glob.glob(glob.escape(os.path.splitext(output_path)[0]) + "_Table_*.csv"))
+    return [output_path] if os.path.exists(output_path) else []
+
+def output_exists(output_path, output_format=None):
+    return bool(output_files(output_path, output_format))
+
+def remove_output(output_path, output_format=None):
+    """删除上次转换留下的输出文件"""
+    for path in output_files(output_path, output_format):
+        os.remove(path)
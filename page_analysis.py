@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 页面预扫描与调度
+用PyPDF2快速扫描每页的内容流（大小、文本操作符数、直线/矩形数、文本列对齐情况），
+估算每页的提取开销并按开销而不是固定页数划分工作单元；
+既没有框线也没有列对齐文本的页面判定为无表格，可以不交给tabula
+"""
+
+import re
+
+# 文本绘制操作符 Tj / TJ / ' / "
+_TEXT_OPERATOR_RE = re.compile(rb"(?:Tj|TJ|'|\")(?=\s)")
+# 直线和矩形操作符（前面紧跟数值操作数），表格的框线通常由它们绘制
+_RULING_OPERATOR_RE = re.compile(rb"[\d.]\s+(?:re|l)(?=\s)")
+# 文本定位相关操作符：BT、Tm、Td/TD、T*，以及绘制文本的操作符（按出现顺序模拟文本位置）
+_TEXT_POSITION_RE = re.compile(
+    rb"(?P<bt>BT)(?=\s)"
+    rb"|(?:-?[\d.]+\s+){4}(?P<tm_x>-?[\d.]+)\s+(?P<tm_y>-?[\d.]+)\s+Tm(?=\s)"
+    rb"|(?P<td_x>-?[\d.]+)\s+(?P<td_y>-?[\d.]+)\s+T[dD](?=\s)"
+    rb"|(?P<newline>T\*)(?=\s)"
+    rb"|(?P<show>Tj|TJ|'|\")(?=\s)"
+)
+
+# 开销估算参数：每页固定开销 + 文本/框线/内容大小带来的额外开销
+PAGE_BASE_COST = 1.0
+TEXT_OPS_PER_COST = 200
+RULINGS_PER_COST = 100
+CONTENT_KB_PER_COST = 50
+
+# 表格判定参数：文本起始位置的x坐标按此精度（点）分组
+ALIGNMENT_TOLERANCE = 2.0
+# 同一x坐标上至少有这么多行文本才算一列
+MIN_ALIGNED_ROWS = 3
+# 默认阈值：至少这么多条直线/矩形，或至少这么多个对齐的文本列，才认为可能有表格
+MIN_TABLE_RULINGS = 4
+MIN_TABLE_COLUMNS = 3
+
+class PageStats:
+    """单页的预扫描结果"""
+
+    __slots__ = ("page", "content_bytes", "text_ops", "ruling_ops", "aligned_columns")
+
+    def __init__(self, page, content_bytes=0, text_ops=0, ruling_ops=0, aligned_columns=0):
+        self.page = page
+        self.content_bytes = content_bytes
+        self.text_ops = text_ops
+        self.ruling_ops = ruling_ops
+        self.aligned_columns = aligned_columns
+
+    @property
+    def cost(self):
+        """估算的相对提取开销（空白页约为1）"""
+        return (PAGE_BASE_COST
+                + self.text_ops / TEXT_OPS_PER_COST
+                + self.ruling_ops / RULINGS_PER_COST
+                + self.content_bytes / 1024 / CONTENT_KB_PER_COST)
+
+    def might_contain_table(self, min_rulings=MIN_TABLE_RULINGS, min_columns=MIN_TABLE_COLUMNS):
+        """
+        页面是否可能包含表格
+
+        阈值越低越保守（漏掉表格的可能越小，能跳过的页越少）
+        """
+        return self.ruling_ops >= min_rulings or self.aligned_columns >= min_columns
+
+def page_content(page):
+    """获取页面解码后的内容流，无内容或无法解析时返回空字节串"""
+    try:
+        contents = page.get_contents()
+        return contents.get_data() if contents is not None else b""
+    except Exception:
+        return b""
+
+def count_aligned_columns(data):
+    """
+    统计内容流中对齐的文本列数
+
+    按操作符顺序跟踪文本行的起始位置（忽略cm变换和字宽），
+    x坐标相同（在容差内）且出现在至少 MIN_ALIGNED_ROWS 个不同行上的位置算作一列。
+    正文只有左边距（和缩进）一两列，表格每一列都会形成一列
+    """
+    rows_by_column = {}
+    x = y = line_x = line_y = 0.0
+    for match in _TEXT_POSITION_RE.finditer(data):
+        try:
+            if match.group("bt"):
+                x = y = line_x = line_y = 0.0
+            elif match.group("newline"):
+                y = line_y = line_y - 1  # 行距未知，只需区分不同的行
+                x = line_x
+            elif match.group("show"):
+                if match.group("show") in (b"'", b'"'):
+                    y = line_y = line_y - 1
+                    x = line_x
+                column = round(x / ALIGNMENT_TOLERANCE)
+                rows_by_column.setdefault(column, set()).add(round(y / ALIGNMENT_TOLERANCE))
+            elif match.group("tm_x") is not None:  # Tm 设置绝对位置
+                x = line_x = float(match.group("tm_x"))
+                y = line_y = float(match.group("tm_y"))
+            else:  # Td/TD 相对当前行起点移动
+                x = line_x = line_x + float(match.group("td_x"))
+                y = line_y = line_y + float(match.group("td_y"))
+        except ValueError:
+            continue  # 形如 "1.2.3" 的畸形数值
+    return sum(1 for rows in rows_by_column.values() if len(rows) >= MIN_ALIGNED_ROWS)
+
+def scan_page(page, page_number):
+    """扫描单页内容流"""
+    data = page_content(page)
+    return PageStats(
+        page_number,
+        content_bytes=len(data),
+        text_ops=len(_TEXT_OPERATOR_RE.findall(data)),
+        ruling_ops=len(_RULING_OPERATOR_RE.findall(data)),
+        aligned_columns=count_aligned_columns(data),
+    )
+
+def scan_pages(pdf_reader, cancel_flag=None):
+    """扫描所有页面，返回 PageStats 列表（页码从1开始）"""
+    stats = []
+    for index, page in enumerate(pdf_reader.pages):
+        if cancel_flag is not None and cancel_flag.get("cancel", False):
+            break
+        stats.append(scan_page(page, index + 1))
+    return stats
+
+def plan_work_units(page_stats, workers, max_pages=500, min_cost=5.0, skipped_pages=None):
+    """
+    按估算开销划分连续页码范围的工作单元，返回 [(起始页, 结束页)]
+
+    skipped_pages 中的页不会被提取，不计入开销
+
+    采用递减粒度划分：每个单元的目标开销为剩余总开销的 1/(2*workers)，
+    前面的单元较大以减少调度开销，末尾的单元越来越小，空闲的工作者可以分担剩余页面，
+    不会出现一个大批次拖住整个转换的情况
+    """
+    skipped_pages = skipped_pages or set()
+    costs = [0.0 if stat.page in skipped_pages else stat.cost for stat in page_stats]
+    remaining_cost = sum(costs)
+    units = []
+    index = 0
+    while index < len(page_stats):
+        target = max(min_cost, remaining_cost / (2 * max(1, workers)))
+        start_index = index
+        unit_cost = 0.0
+        while index < len(page_stats) and (unit_cost < target) and (index - start_index) < max_pages:
+            unit_cost += costs[index]
+            index += 1
+        remaining_cost -= unit_cost
+        units.append((page_stats[start_index].page, page_stats[index - 1].page))
+    return units
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 命令行版本
+无需图形界面，适合在服务器上批量转换；接受文件、通配符或目录，
+多个PDF在同一个全局并行预算内同时转换，进度以JSON行输出到标准输出
+
+示例:
+    python pdf2excel.py report.pdf
+    python pdf2excel.py "scans/*.pdf" -o out/ --jobs 2
+    python pdf2excel.py incoming/ --recursive --engine process --workers 8
+    python pdf2excel.py report.pdf --format parquet
+    python pdf2excel.py statement_0101.pdf --save-template 招商银行对账单   # 之后同版式的PDF按模板提取
+    python pdf2excel.py incoming/ --backend pdfplumber --engine process   # 不需要Java
+    python pdf2excel.py report.pdf --trace   # 各阶段用时写入 report.xlsx.trace.json（Chrome跟踪格式）
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from converter_engine import convert_pdf_to_excel
+from conversion_trace import ConversionTrace
+from tabula_backend import BACKEND_AUTO, BACKEND_MODES
+from extraction_methods import METHOD_AUTO, METHODS
+from extraction_pool import ENGINE_THREAD, ENGINE_PROCESS, ENGINES, choose_worker_count, create_process_pool
+from output_formats import OUTPUT_XLSX, OUTPUT_FORMATS, FORMAT_EXTENSIONS, output_exists
+
+class JsonLinesReporter:
+    """线程安全的JSON行输出"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def emit(self, event, **fields):
+        record = {"event": event, "time": round(time.time(), 3)}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+def find_pdfs(inputs, recursive=False):
+    """将文件、通配符和目录展开为PDF文件列表（去重并保持顺序）"""
+    found = []
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, "**", "*") if recursive else os.path.join(item, "*")
+            candidates = sorted(glob.glob(pattern, recursive=recursive))
+        elif glob.has_magic(item):
+            candidates = sorted(glob.glob(item, recursive=True))
+        else:
+            candidates = [item]
+        for path in candidates:
+            if os.path.isfile(path) and path.lower().endswith(".pdf"):
+                found.append(os.path.abspath(path))
+            elif path is item:
+                found.append(os.path.abspath(path))  # 显式给出的文件交给转换阶段报告错误
+    return list(dict.fromkeys(found))
+
+def output_path_for(pdf_path, output_dir=None, output_format=OUTPUT_XLSX):
+    """输出文件路径：默认与PDF同目录同名，扩展名按输出格式"""
+    name = os.path.splitext(os.path.basename(pdf_path))[0] + FORMAT_EXTENSIONS[output_format]
+    return os.path.join(output_dir or os.path.dirname(pdf_path), name)
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="pdf2excel",
+        description="将PDF中的表格转换为Excel（无图形界面，进度以JSON行输出）"
+    )
+    parser.add_argument("inputs", nargs="+", help="PDF文件、通配符或目录")
+    parser.add_argument("-o", "--output-dir", help="输出目录（默认与PDF相同）")
+    parser.add_argument("-f", "--format", choices=OUTPUT_FORMATS, default=OUTPUT_XLSX,
+                        help="输出格式: xlsx（每表一个工作表）、xlsx-long（单个长表工作表）、csv（每表一个文件）、"
+                             "csv-zip、parquet、arrow（长表，需要pyarrow），默认xlsx")
+    parser.add_argument("-r", "--recursive", action="store_true", help="递归查找目录中的PDF")
+    parser.add_argument("--engine", choices=ENGINES, default=ENGINE_THREAD, help="提取引擎（默认thread）")
+    parser.add_argument("--backend", choices=BACKEND_MODES, default=BACKEND_AUTO, help="提取后端（默认auto）: auto/jvm/subprocess为tabula（需要Java），"
+                             "pdfplumber为纯Python提取（不需要Java，适合配合--engine process多进程）")
+    parser.add_argument("--method", choices=METHODS, default=METHOD_AUTO,
+                        help="提取方式: auto（默认，逐页按框线选择lattice或stream，结果得分低的页用另一种方式重试）、"
+                             "guess（tabula原有的自动判断）、lattice、stream")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="所有文件共享的提取并行数（默认按CPU和内存自动确定）")
+    parser.add_argument("--jobs", type=int, default=None, help="同时转换的文件数（默认不超过并行数）")
+    parser.add_argument("--skip-existing", action="store_true", help="跳过已存在输出文件的PDF")
+    parser.add_argument("--skip-empty-pages", action="store_true", help="跳过预扫描判定为无表格的页")
+    parser.add_argument("--no-adaptive", action="store_true", help="使用固定页数批次，不做预扫描调度")
+    parser.add_argument("--resume", action="store_true",
+                        help="从上次未完成的检查点（<输出文件>.journal）继续，只提取剩余的页")
+    parser.add_argument("--no-stitch", action="store_true", help="不合并跨页的续表（每个表格片段单独一个工作表）")
+    parser.add_argument("--no-templates", action="store_true", help="不使用已保存的版式模板")
+    parser.add_argument("--no-split", action="store_true",
+                        help="不按批次拆分PDF（默认500页以上的文件把每个批次的页写成子文档，提取器只解析自己的页）")
+    parser.add_argument("--save-template", metavar="NAME",
+                        help="把第一个成功转换的文件的表格区域和列位置保存为版式模板，之后第一页版式相同的PDF直接按模板提取")
+    parser.add_argument("--memory-limit", type=float, default=None, metavar="MB",
+                        help="每个转换的内存上限（MB），接近上限时减少在途批次（默认物理内存的一半）")
+    parser.add_argument("--trace", action="store_true",
+                        help="记录各阶段用时（排队、提取、解析、写入和内存），写入<输出文件>.trace.json（Chrome跟踪格式，"
+                             "可在chrome://tracing或ui.perfetto.dev中打开），汇总以trace事件输出")
+    parser.add_argument("--no-cache", action="store_true", help="不使用提取结果缓存")
+    parser.add_argument("--clear-cache", action="store_true", help="转换前清空提取结果缓存")
+    return parser
+
+def save_template(name, jobs_list, results, layouts, reporter):
+    """用第一个成功转换的文件保存版式模板"""
+    from layout_templates import get_registry
+
+    for pdf_path, _ in jobs_list:
+        if results.get(pdf_path):
+            template = get_registry().save_from_run(name, pdf_path, layouts[pdf_path])
+            if template is None:
+                reporter.emit("error", message=f"无法从 {pdf_path} 生成版式模板（没有可用的表格区域）")
+            else:
+                reporter.emit("template_saved", name=name, file=pdf_path, hints=template["hints"])
+            return
+    reporter.emit("error", message="没有成功转换的文件，未保存版式模板")
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    reporter = JsonLinesReporter(sys.stdout)
+
+    if args.clear_cache:
+        from extraction_cache import get_cache
+        get_cache().clear()
+        reporter.emit("cache_cleared")
+
+    pdf_paths = find_pdfs(args.inputs, args.recursive)
+    if not pdf_paths:
+        reporter.emit("error", message="没有找到PDF文件")
+        return 2
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    jobs_list = [(pdf_path, output_path_for(pdf_path, args.output_dir, args.format)) for pdf_path in pdf_paths]
+    if args.skip_existing:
+        # 留有检查点的输出文件是未完成的转换，不跳过
+        def finished(output_path):
+            return output_exists(output_path, args.format) and not os.path.exists(f"{output_path}.journal")
+        for pdf_path, output_path in jobs_list:
+            if finished(output_path):
+                reporter.emit("skipped", file=pdf_path, output=output_path, reason="输出文件已存在")
+        jobs_list = [job for job in jobs_list if not finished(job[1])]
+
+    # 全局并行预算：所有文件共享一个执行器，同时转换的文件平分在途窗口
+    workers = max(1, args.workers or choose_worker_count(args.engine))
+    jobs = max(1, min(args.jobs or workers, workers, len(jobs_list) or 1))
+    use_cache = not args.no_cache
+    if args.engine == ENGINE_PROCESS:
+        executor = create_process_pool(workers, args.backend, use_cache)
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+    reporter.emit("start", files=len(jobs_list), workers=workers, jobs=jobs, engine=args.engine)
+
+    cancel_flag = {"cancel": False}
+    results = {}
+    layouts = {pdf_path: [] for pdf_path, _ in jobs_list} if args.save_template else {}
+
+    def convert_one(job):
+        pdf_path, output_path = job
+        reporter.emit("file_start", file=pdf_path, output=output_path)
+        last_status = {"message": ""}
+
+        def progress(percent, status_text, tables_found):
+            last_status["message"] = status_text
+            reporter.emit("progress", file=pdf_path, percent=percent, status=status_text, tables=tables_found)
+
+        def batch_log(start_page, end_page, records):
+            reporter.emit("batch_log", file=pdf_path, pages=[start_page, end_page], records=records)
+
+        trace = ConversionTrace(pdf_path) if args.trace else None
+        start_time = time.time()
+        ok = convert_pdf_to_excel(
+            pdf_path, output_path, progress, cancel_flag,
+            backend=args.backend, engine=args.engine, use_cache=use_cache,
+            adaptive=not args.no_adaptive, skip_empty_pages=args.skip_empty_pages,
+            executor=executor, workers=max(1, workers // jobs), resume=args.resume,
+            memory_limit_mb=args.memory_limit, stitch_tables=not args.no_stitch, output_format=args.format,
+            method=args.method, use_templates=not args.no_templates, layouts=layouts.get(pdf_path),
+            log_callback=batch_log, trace=trace, split_batches=False if args.no_split else None
+        )
+        results[pdf_path] = ok
+        if trace is not None:
+            trace_path = trace.export_chrome_trace(f"{output_path}.trace.json")
+            stages = [{key: round(value, 4) if isinstance(value, float) else value for key, value in stage.items()}
+                      for stage in trace.summary()]
+            reporter.emit("trace", file=pdf_path, path=trace_path, seconds=round(trace.wall_seconds(), 3),
+                          stages=stages)
+        reporter.emit("file_done", file=pdf_path, output=output_path, ok=ok,
+                      seconds=round(time.time() - start_time, 2), message=last_status["message"])
+
+    start_time = time.time()
+    with executor, ThreadPoolExecutor(max_workers=jobs) as file_pool:
+        try:
+            for future in [file_pool.submit(convert_one, job) for job in jobs_list]:
+                future.result()
+        except KeyboardInterrupt:
+            # 通知所有转换停止，退出with时等待它们收尾
+            cancel_flag["cancel"] = True
+            reporter.emit("cancelled")
+            return 130
+
+    if args.save_template:
+        save_template(args.save_template, jobs_list, results, layouts, reporter)
+
+    failed = [pdf_path for pdf_path, ok in results.items() if not ok]
+    reporter.emit("summary", files=len(jobs_list), succeeded=len(jobs_list) - len(failed),
+                  failed=failed, seconds=round(time.time() - start_time, 2))
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 按批次拆分PDF
+大文件的每个批次原本都把整个PDF交给提取器：tabula每次打开都要加载全文件的交叉引用和页面树
+（subprocess模式每次调用还要重新启动java解析全文件），pdfplumber首次取页时要建立全部页面对象，
+这部分开销与总页数成正比，而与批次页数无关
+
+这里在主进程中用PyPDF2只读取一次源文件，提交批次前把该批次的页写成一个小的子文档，
+提取器只打开和解析自己的页；SubsetDocument把子文档中的页码映射回源文件的页码，
+缓存键、检查点、版式模板和表格的页码都仍然按源文件计算
+"""
+
+import os
+import shutil
+import tempfile
+
+import PyPDF2
+
+# 总页数不少于此值时自动按批次拆分（小文件打开很快，拆分没有收益）
+SPLIT_MIN_PAGES = 500
+
+class BatchSplitter:
+    """
+    把源PDF中指定的页写成子文档（只在提交批次的线程中使用，不是线程安全的）
+
+    子文档写在临时目录中，批次完成后用 discard() 删除，close() 删除整个目录
+    """
+
+    def __init__(self, pdf_path, work_dir=None):
+        self.pdf_path = pdf_path
+        self.work_dir = tempfile.mkdtemp(prefix="pdf2excel-split-", dir=work_dir)
+        self._file = open(pdf_path, 'rb')
+        try:
+            self._reader = PyPDF2.PdfReader(self._file)
+            if self._reader.is_encrypted:
+                raise ValueError("加密的PDF不拆分")
+        except Exception:
+            self.close()
+            raise
+        self._count = 0
+
+    def write_subset(self, pages):
+        """把源文件的页码列表（从1开始）按顺序写成子文档，返回子文档路径"""
+        writer = PyPDF2.PdfWriter()
+        for page in pages:
+            writer.add_page(self._reader.pages[page - 1])
+        self._count += 1
+        path = os.path.join(self.work_dir, f"batch_{self._count:06d}_{pages[0]}-{pages[-1]}.pdf")
+        with open(path, 'wb') as subset_file:
+            writer.write(subset_file)
+        return path
+
+    def discard(self, path):
+        """删除已完成批次的子文档"""
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+def create_splitter(pdf_path, total_pages, batch_count, split_batches=None):
+    """
+    按设置创建BatchSplitter，不拆分时返回None
+
+    split_batches 为None时自动判断（总页数不少于SPLIT_MIN_PAGES且多于一个批次），
+    True/False强制开启或关闭；源文件无法拆分（加密、结构损坏）时返回None，按原来的方式提取整个文件
+    """
+    if split_batches is None:
+        split_batches = total_pages >= SPLIT_MIN_PAGES and batch_count > 1
+    if not split_batches:
+        return None
+    try:
+        return BatchSplitter(pdf_path)
+    except Exception:
+        return None
+
+class SubsetDocument:
+    """
+    打开的子文档，对外表现为源文件的文档
+
+    pdf_path为源文件路径（缓存按源文件内容哈希），extract() 接收和返回源文件的页码；
+    其余属性（options、extractor、page_aware、method_counts）与被包装的文档相同
+    """
+
+    def __init__(self, document, source_path, source_pages):
+        self.document = document
+        self.pdf_path = source_path
+        self._local_pages = {page: idx for idx, page in enumerate(source_pages, start=1)}
+        self._source_pages = list(source_pages)
+
+    def __getattr__(self, name):
+        return getattr(self.document, name)
+
+    def extract(self, pages, cancel_token=None):
+        pages = list(pages)
+        tables = self.document.extract([self._local_pages[page] for page in pages], cancel_token)
+        for table in tables:
+            local_page = table.attrs.get("page")
+            if local_page is not None:
+                table.attrs["page"] = self._source_pages[local_page - 1]
+        return tables
+
+    def close(self):
+        self.document.close()
+
+def open_batch_document(backend, pdf_path, pages, subset_path=None, method=None, hints=None):
+    """
+    打开一个批次要提取的文档：给出subset_path时打开子文档（其中的页依次为pages），否则打开源文件
+
+    backend 为 tabula_backend.get_backend() 返回的后端
+    """
+    if subset_path is None:
+        return backend.open_document(pdf_path, method=method, **(hints or {}))
+    document = backend.open_document(subset_path, method=method, **(hints or {}))
+    return SubsetDocument(document, pdf_path, pages)
@@ -2,43 +2,21 @@ import PySimpleGUI as sg
 import os
 import sys
 import threading
-import tabula
-import pandas as pd
-import PyPDF2
 import time
 import math
 from pathlib import Path
+# tabula_backend在首次提取时才导入pandas/tabula；pandas和PyPDF2在转换线程中导入，窗口先显示
+from tabula_backend import get_backend
+from extraction_log import capture_extraction_output
 
 # 确保Java路径问题不会影响程序运行
 os.environ["PATH"] = os.environ["PATH"] + ";" + os.path.join(os.path.dirname(sys.executable), "java")
 
-def suppress_stdout_stderr(func):
-    """装饰器：用于完全抑制函数执行过程中的stdout和stderr输出"""
-    def wrapper(*args, **kwargs):
-        # 保存原始的文件描述符
-        try:
-            # Windows和Unix兼容的标准输出/错误重定向
-            original_stdout = sys.stdout
-            original_stderr = sys.stderr
-            
-            # 重定向到空设备
-            with open(os.devnull, 'w') as devnull:
-                sys.stdout = devnull
-                sys.stderr = devnull
-                
-                # 执行原函数
-                result = func(*args, **kwargs)
-                return result
-        finally:
-            # 恢复原始的stdout和stderr
-            sys.stdout = original_stdout
-            sys.stderr = original_stderr
-    return wrapper
-
-@suppress_stdout_stderr
 def extract_tables_silent(pdf_path, page_range):
-    """抑制所有输出的表格提取函数"""
-    return tabula.read_pdf(pdf_path, pages=page_range, multiple_tables=True)
+    """抑制所有输出的表格提取函数（只收集本线程的提取器输出，不替换全局的标准输出）"""
+    with capture_extraction_output(page_range):
+        # 复用会话共享的后端（常驻JVM），不再为每个批次启动Java进程
+        return get_backend().read_pdf(pdf_path, page_range)
 
 def convert_pdf_to_excel(pdf_path, output_path, progress_callback, cancel_flag):
     """
@@ -50,6 +28,9 @@ def convert_pdf_to_excel(pdf_path, output_path, progress_callback, cancel_flag):
     - progress_callback: 进度回调函数, 接收 (percent, status_text, tables_found)
     - cancel_flag: 取消标志字典 {"cancel": False}
     """
+    import pandas as pd
+    import PyPDF2
+    
     try:
         # 初始化进度
         progress_callback(0, "正在分析PDF文件...", 0)
@@ -186,9 +167,12 @@ def main():
     # 设置颜色主题（避免使用theme函数）
     sg.change_look_and_feel('LightBlue')  # 使用change_look_and_feel替代theme
     
-    # 检查Java
-    if not check_java_installation():
-        sg.popup_error('错误: 未检测到Java环境!\n\n此应用需要Java才能运行。\n请安装Java后再运行本程序。\n\n可以从 https://www.java.com 下载安装Java。', title='Java未安装')
+    # 窗口显示后在后台检查Java并预先导入pandas/PyPDF2，不阻塞启动
+    java_status = {"installed": None}
+    def warmup():
+        java_status["installed"] = check_java_installation()
+        import pandas, PyPDF2
+    warmup_thread = threading.Thread(target=warmup, daemon=True)
     
     # 优化：添加应用图标（如果有）
     app_icon = None
@@ -224,6 +208,8 @@ def main():
     # 创建窗口
     window = sg.Window('PDF表格转Excel工具', layout, finalize=True, resizable=True, icon=app_icon, size=(700, 550))
     
+    warmup_thread.start()
+    
     # 优化：记住上次使用的目录
     last_dir = os.path.expanduser("~")
     
@@ -235,6 +221,11 @@ def main():
     while True:
         event, values = window.read(timeout=100)
         
+        # 后台Java检查完成后提示（只提示一次）
+        if java_status["installed"] is False:
+            java_status["installed"] = None
+            sg.popup_error('错误: 未检测到Java环境!\n\n此应用需要Java才能运行。\n请安装Java后再运行本程序。\n\n可以从 https://www.java.com 下载安装Java。', title='Java未安装')
+        
         # 窗口关闭
         if event == sg.WIN_CLOSED or event == '退出':
             break
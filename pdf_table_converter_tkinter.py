@@ -1,441 +1,49 @@
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, filedialog, messagebox, simpledialog
 import os
 import sys
 import threading
-import tabula
-import pandas as pd
-import PyPDF2
-import time
-import math
-import io
-import multiprocessing
 import platform
-import gc
-import psutil
-import concurrent.futures
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
-from pathlib import Path
-import ctypes
+# 只导入轻量模块，pandas/tabula等在窗口显示后于后台加载（见 PDFTableConverterApp.start_warmup）
+from extraction_pool import ENGINE_THREAD, ENGINE_PROCESS
+from tabula_backend import BACKEND_AUTO, BACKEND_PDFPLUMBER
+from plumber_backend import pdfplumber_available
+from progress_channel import ProgressChannel, FRAME_INTERVAL_MS, STATUS_LOG_LINES
+from job_queue import ConversionQueue, JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_CANCELLED
+from output_formats import (OUTPUT_XLSX, OUTPUT_XLSX_LONG, OUTPUT_CSV, OUTPUT_CSV_ZIP, OUTPUT_PARQUET, OUTPUT_ARROW,
+                            FORMAT_EXTENSIONS, format_from_path, has_known_extension, output_exists)
 
-# 内存管理器
-class MemoryManager:
-    """内存使用监控和管理"""
-    
-    @staticmethod
-    def get_memory_usage():
-        """获取当前进程内存使用量（MB）"""
-        process = psutil.Process(os.getpid())
-        memory_info = process.memory_info()
-        return memory_info.rss / 1024 / 1024  # 转换为MB
-    
-    @staticmethod
-    def free_memory():
-        """强制垃圾回收，释放内存"""
-        # 调用多次垃圾回收
-        gc.collect(0)  # 收集第0代（最年轻的对象）
-        gc.collect(1)  # 收集第1代
-        gc.collect(2)  # 收集第2代（最老的对象）
-        
-        # 尝试释放未使用的内存返回给OS
-        if hasattr(os, 'malloc_trim'):  # Linux特有
-            os.malloc_trim(0)
-        elif sys.platform == 'darwin':  # macOS
-            libc = ctypes.CDLL('libc.dylib')
-            if hasattr(libc, 'malloc_zone_pressure_relief'):
-                # 释放100MB内存
-                libc.malloc_zone_pressure_relief(None, 100)
-        
-        # 强制Python释放未使用的内存池
-        import multiprocessing
-        p = multiprocessing.Process(target=lambda: None)
-        p.start()
-        p.join()
-        
-        return gc.get_count()[0]  # 返回回收的对象数量
-    
-    @staticmethod
-    def print_memory_status():
-        """输出当前内存状态"""
-        mem_usage = MemoryManager.get_memory_usage()
-        print(f"当前内存使用: {mem_usage:.2f} MB")
-        
-    @staticmethod
-    def check_and_free_memory(threshold=1000):
-        """
-        检查内存使用，如果超过阈值则尝试释放
-        threshold: 内存使用阈值，单位MB
-        """
-        mem_usage = MemoryManager.get_memory_usage()
-        if mem_usage > threshold:
-            print(f"内存使用超过阈值 ({mem_usage:.2f} MB > {threshold} MB)，尝试释放内存...")
-            collected = MemoryManager.free_memory()
-            new_usage = MemoryManager.get_memory_usage()
-            print(f"已释放对象数: {collected}, 当前内存使用: {new_usage:.2f} MB")
-            return True
-        return False
-
-# 确保Java路径问题不会影响程序运行
-if sys.platform == 'win32':
-    os.environ["PATH"] = os.environ["PATH"] + ";" + os.path.join(os.path.dirname(sys.executable), "java")
-else:
-    os.environ["PATH"] = os.environ["PATH"] + ":" + os.path.join(os.path.dirname(sys.executable), "java")
-
-def suppress_stdout_stderr(func):
-    """装饰器：用于完全抑制函数执行过程中的stdout和stderr输出"""
-    def wrapper(*args, **kwargs):
-        # 保存原始的文件描述符
-        try:
-            # Windows和Unix兼容的标准输出/错误重定向
-            original_stdout = sys.stdout
-            original_stderr = sys.stderr
-            
-            # 重定向到空设备
-            with open(os.devnull, 'w') as devnull:
-                sys.stdout = devnull
-                sys.stderr = devnull
-                
-                # 执行原函数
-                result = func(*args, **kwargs)
-                return result
-        finally:
-            # 恢复原始的stdout和stderr
-            sys.stdout = original_stdout
-            sys.stderr = original_stderr
-    return wrapper
-
-@suppress_stdout_stderr
-def extract_tables_silent(pdf_path, page_range):
-    """静默提取表格，不输出任何信息"""
-    try:
-        # 在这里添加文件句柄管理
-        with open(pdf_path, 'rb') as pdf_file:
-            # 使用打开的文件对象而不是路径
-            tables = tabula.read_pdf(pdf_file, pages=page_range, multiple_tables=True, silent=True)
-            # 立即释放文件
-            pdf_file.close()
-        return tables
-    except Exception as e:
-        print(f"表格提取错误: {str(e)}")
-        # 确保返回空列表而不是None
-        return []
-
-def process_batch(args):
-    """处理单个PDF批次的函数，用于并行处理"""
-    pdf_path, start_page, end_page = args
-    page_range = f"{start_page}-{end_page}"
-    try:
-        tables = extract_tables_silent(pdf_path, page_range)
-        result = (tables, len(tables) if tables else 0)
-        # 释放内存
-        MemoryManager.check_and_free_memory(threshold=500)
-        return result
-    except Exception as e:
-        print(f"处理页 {page_range} 出错: {str(e)}")
-        return [], 0
+# 保存对话框的文件类型，选择的类型决定输出格式
+SAVE_FILE_TYPES = [
+    ("Excel文件", OUTPUT_XLSX),
+    ("Excel长表（单个工作表）", OUTPUT_XLSX_LONG),
+    ("CSV文件（每个表格一个文件）", OUTPUT_CSV),
+    ("CSV压缩包", OUTPUT_CSV_ZIP),
+    ("Parquet长表", OUTPUT_PARQUET),
+    ("Arrow长表", OUTPUT_ARROW),
+]
 
-def optimize_dataframe(df):
-    """优化DataFrame内存使用"""
-    # 对象类型列转换为类别类型
-    for col in df.select_dtypes(include=['object']).columns:
-        if df[col].nunique() < len(df[col]) * 0.5:  # 如果唯一值少于50%
-            df[col] = df[col].astype('category')
-    
-    # 将浮点数列转换为最合适的数值类型
-    for col in df.select_dtypes(include=['float']).columns:
-        df[col] = pd.to_numeric(df[col], downcast='float')
-    
-    # 将整数列转换为最合适的整数类型
-    for col in df.select_dtypes(include=['int']).columns:
-        df[col] = pd.to_numeric(df[col], downcast='integer')
-    
-    return df
-
-def save_tables_chunk(args):
-    """并行保存表格分块到Excel"""
-    tables_chunk, start_idx, output_file = args
-    try:
-        # 内存使用监控
-        start_mem = MemoryManager.get_memory_usage()
-        
-        # 使用内存中的Excel writer，移除options参数
-        with pd.ExcelWriter(output_file, engine='openpyxl', mode='a' if os.path.exists(output_file) else 'w') as writer:
-            for i, df in enumerate(tables_chunk):
-                idx = start_idx + i
-                sheet_name = f"Table_{idx+1}"
-                # 表格名称长度限制
-                if len(sheet_name) > 31:  # Excel工作表名称最大31字符
-                    sheet_name = f"T{idx+1}"
-                
-                # 检查空表格
-                if df.empty:
-                    continue
-                
-                # 内存优化
-                try:
-                    # 优化DataFrame内存
-                    df = optimize_dataframe(df)
-                    
-                    # 设置Excel选项，减少内存使用
-                    df.to_excel(writer, sheet_name=sheet_name, index=False, engine='openpyxl')
-                    
-                    # 显式删除DataFrame以释放内存
-                    del df
-                    
-                    # 每5个表格检查一次内存
-                    if (i + 1) % 5 == 0:
-                        MemoryManager.check_and_free_memory(threshold=500)
-                        
-                except Exception as e:
-                    print(f"保存表格 {idx+1} 时出错: {str(e)}")
-        
-        # 显式垃圾回收
-        end_mem = MemoryManager.get_memory_usage()
-        print(f"保存批次内存使用: {start_mem:.2f} MB -> {end_mem:.2f} MB, 差异: {end_mem-start_mem:.2f} MB")
-        MemoryManager.free_memory()
-        
-        return True, len(tables_chunk)
-    except Exception as e:
-        print(f"保存批次出错: {str(e)}")
-        return False, 0
-
-def convert_pdf_to_excel(pdf_path, output_path, progress_callback, cancel_flag):
-    """
-    将PDF中的表格转换为Excel
-    
-    参数:
-    - pdf_path: PDF文件路径
-    - output_path: 输出Excel文件路径
-    - progress_callback: 进度回调函数, 接收 (percent, status_text, tables_found)
-    - cancel_flag: 取消标志字典 {"cancel": False}
-    """
-    try:
-        # 初始化进度
-        progress_callback(0, "正在分析PDF文件...", 0)
-        
-        # 获取PDF总页数
-        with open(pdf_path, 'rb') as pdf_file:
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            total_pages = len(pdf_reader.pages)
-        
-        progress_callback(1, f"PDF共有 {total_pages} 页，开始提取表格...", 0)
-        
-        # 优化：根据系统可用核心数和PDF大小确定批处理大小和并行程度
-        cpu_count = multiprocessing.cpu_count()
-        workers = max(1, min(cpu_count - 1, 4))  # 保留至少一个核心给系统
-        
-        # 批处理大小，根据PDF大小动态调整
-        if total_pages > 10000:
-            batch_size = 500  # 超大PDF
-        elif total_pages > 1000:
-            batch_size = 100  # 大型PDF
-        elif total_pages > 100:
-            batch_size = 50   # 中型PDF
-        else:
-            batch_size = 20   # 小型PDF
-        
-        total_batches = math.ceil(total_pages / batch_size)
-        
-        # 创建批处理任务列表
-        batches = []
-        for batch in range(total_batches):
-            if cancel_flag.get("cancel", False):
-                progress_callback(0, "操作已取消", 0)
-                return False
-                
-            start_page = batch * batch_size + 1
-            end_page = min((batch + 1) * batch_size, total_pages)
-            batches.append((pdf_path, start_page, end_page))
-        
-        all_tables = []
-        start_time = time.time()
-        total_tables_found = 0
-        completed_batches = 0
-        
-        # 使用线程池同时处理多个批次
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            # 提交所有批次任务
-            future_to_batch = {executor.submit(process_batch, batch): i for i, batch in enumerate(batches)}
-            
-            # 处理完成的任务结果
-            for future in concurrent.futures.as_completed(future_to_batch):
-                if cancel_flag.get("cancel", False):
-                    executor.shutdown(wait=False)
-                    progress_callback(0, "操作已取消", 0)
-                    return False
-                
-                batch_index = future_to_batch[future]
-                start_page = batches[batch_index][1]
-                end_page = batches[batch_index][2]
-                
-                try:
-                    tables, tables_count = future.result()
-                    if tables:
-                        all_tables.extend(tables)
-                        total_tables_found += tables_count
-                except Exception as e:
-                    progress_callback(
-                        int(completed_batches * 80 / total_batches),
-                        f"处理页 {start_page}-{end_page} 时出错: {str(e)}",
-                        total_tables_found
-                    )
-                
-                completed_batches += 1
-                
-                # 计算进度百分比 (总体完成的80%用于提取，20%用于保存)
-                percent = int(completed_batches * 80 / total_batches)
-                
-                # 计算已用时间和预计剩余时间
-                elapsed = time.time() - start_time
-                if completed_batches > 0:
-                    avg_time = elapsed / completed_batches
-                    est_remaining = avg_time * (total_batches - completed_batches)
-                    est_remaining_min = est_remaining / 60
-                    
-                    # 更精确的时间估计
-                    if est_remaining_min > 60:
-                        time_str = f"{est_remaining_min/60:.1f}小时"
-                    else:
-                        time_str = f"{est_remaining_min:.1f}分钟"
-                    
-                    status = f"已处理: {completed_batches}/{total_batches}批次 ({start_page}-{end_page}/{total_pages}页) | 找到: {total_tables_found}表格 | 剩余: {time_str}"
-                else:
-                    status = f"已处理: {completed_batches}/{total_batches}批次 ({start_page}-{end_page}/{total_pages}页) | 找到: {total_tables_found}表格"
-                
-                progress_callback(percent, status, total_tables_found)
-                
-                # 每完成5个批次检查一次内存
-                if completed_batches % 5 == 0:
-                    MemoryManager.check_and_free_memory(threshold=800)
-        
-        # 保存到Excel - 采用并行分块保存方式
-        if all_tables and not cancel_flag.get("cancel", False):
-            progress_callback(80, f"正在保存 {total_tables_found} 个表格到Excel...", total_tables_found)
-            
-            # 创建空的输出文件
-            if os.path.exists(output_path):
-                os.remove(output_path)
-            
-            # 分块保存，每块最多100个表格（对于大量表格的情况，减小块大小以避免内存问题）
-            chunk_size = min(100, max(50, 10000 // total_tables_found + 1)) if total_tables_found > 0 else 100
-            num_chunks = math.ceil(len(all_tables) / chunk_size)
-            save_start_time = time.time()
-            saved_tables = 0
-            
-            # 准备保存任务
-            save_tasks = []
-            for i in range(num_chunks):
-                start_idx = i * chunk_size
-                end_idx = min((i + 1) * chunk_size, len(all_tables))
-                chunk = all_tables[start_idx:end_idx]
-                save_tasks.append((chunk, start_idx, output_path))
-            
-            # 清空all_tables并触发垃圾回收以释放内存
-            all_tables = None
-            MemoryManager.free_memory()
-            
-            # 使用线程池并行保存，但限制并行度以控制内存使用
-            max_save_workers = min(2, num_chunks)
-            with ThreadPoolExecutor(max_workers=max_save_workers) as save_executor:
-                # 一次提交少量任务，避免内存溢出
-                batch_size = 5
-                for batch_start in range(0, len(save_tasks), batch_size):
-                    batch_end = min(batch_start + batch_size, len(save_tasks))
-                    batch_tasks = save_tasks[batch_start:batch_end]
-                    
-                    future_to_save = {save_executor.submit(save_tables_chunk, task): i+batch_start for i, task in enumerate(batch_tasks)}
-                    
-                    for future in concurrent.futures.as_completed(future_to_save):
-                        if cancel_flag.get("cancel", False):
-                            save_executor.shutdown(wait=False)
-                            progress_callback(0, "操作已取消", 0)
-                            return False
-                        
-                        task_index = future_to_save[future]
-                        try:
-                            success, num_saved = future.result()
-                            if success:
-                                saved_tables += num_saved
-                                
-                                # 计算保存进度 (从80%到100%)
-                                save_percent = 80 + int((task_index + 1) * 20 / len(save_tasks))
-                                
-                                # 预估剩余时间
-                                save_elapsed = time.time() - save_start_time
-                                if task_index > 0:
-                                    avg_save_time = save_elapsed / (task_index + 1)
-                                    save_remaining = avg_save_time * (len(save_tasks) - task_index - 1)
-                                    save_remaining_min = save_remaining / 60
-                                    
-                                    if save_remaining_min > 60:
-                                        save_time_str = f"{save_remaining_min/60:.1f}小时"
-                                    else:
-                                        save_time_str = f"{save_remaining_min:.1f}分钟"
-                                    
-                                    progress_callback(
-                                        save_percent,
-                                        f"保存进度: {task_index+1}/{len(save_tasks)}批次 | 已保存: {saved_tables}/{total_tables_found}表格 | 剩余: {save_time_str}",
-                                        total_tables_found
-                                    )
-                                else:
-                                    progress_callback(
-                                        save_percent,
-                                        f"保存进度: {task_index+1}/{len(save_tasks)}批次 | 已保存: {saved_tables}/{total_tables_found}表格",
-                                        total_tables_found
-                                    )
-                        except Exception as e:
-                            progress_callback(
-                                80 + int(task_index * 20 / len(save_tasks)),
-                                f"保存批次 {task_index+1} 时出错: {str(e)}",
-                                total_tables_found
-                            )
-                    
-                    # 每批次完成后触发内存清理
-                    MemoryManager.free_memory()
-            
-            # 清理内存
-            MemoryManager.free_memory()
-            
-            total_time = time.time() - start_time
-            # 格式化总时间
-            if total_time > 3600:
-                time_str = f"{total_time/3600:.2f}小时"
-            elif total_time > 60:
-                time_str = f"{total_time/60:.2f}分钟"
-            else:
-                time_str = f"{total_time:.1f}秒"
-                
-            progress_callback(
-                100, 
-                f"✅ 完成! 已保存 {saved_tables} 个表格，用时: {time_str}", 
-                total_tables_found
-            )
-            return True
-        elif cancel_flag.get("cancel", False):
-            progress_callback(0, "操作已取消", 0)
-            return False
-        else:
-            progress_callback(100, "⚠️ 未找到任何表格", 0)
-            return False
-            
-    except Exception as e:
-        progress_callback(0, f"转换过程中出错: {str(e)}", 0)
-        return False
+def format_for_selection(output_path, type_label):
+    """保存对话框选择的类型与扩展名一致时按类型（区分两种xlsx），否则按扩展名判断输出格式"""
+    output_format = dict(SAVE_FILE_TYPES).get(type_label)
+    if output_format and output_path.lower().endswith(FORMAT_EXTENSIONS[output_format]):
+        return output_format
+    return format_from_path(output_path)
 
-def check_java_installation():
-    """检查Java是否已安装"""
-    try:
-        import subprocess
-        result = subprocess.run(['java', '-version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        return result.returncode == 0
-    except:
-        return False
+# 任务状态的显示文字
+JOB_STATUS_TEXT = {
+    JOB_QUEUED: "排队中",
+    JOB_RUNNING: "转换中",
+    JOB_DONE: "已完成",
+    JOB_FAILED: "失败",
+    JOB_CANCELLED: "已取消",
+}
 
 class PDFTableConverterApp:
     def __init__(self, root):
         self.root = root
         self.root.title("PDF表格转Excel工具")
-        self.root.geometry("750x600")
+        self.root.geometry("800x760")
         
         # 使用系统默认字体，解决文字显示问题
         system = platform.system()
@@ -505,11 +113,12 @@ class PDFTableConverterApp:
         self.excel_frame = tk.Frame(self.file_frame, bg=self.frame_bg)
         self.excel_frame.pack(fill="x", pady=5)
         
-        self.excel_label = tk.Label(self.excel_frame, text="输出Excel文件:", font=self.default_font,
+        self.excel_label = tk.Label(self.excel_frame, text="输出文件:", font=self.default_font,
                                   bg=self.frame_bg, fg=self.text_color, width=15)
         self.excel_label.pack(side=tk.LEFT)
         
         self.excel_path_var = tk.StringVar()
+        self.save_type_var = tk.StringVar(value=SAVE_FILE_TYPES[0][0])
         self.excel_entry = tk.Entry(self.excel_frame, textvariable=self.excel_path_var, 
                                   font=self.default_font, width=50)
         self.excel_entry.pack(side=tk.LEFT, fill="x", expand=True, padx=5)
@@ -520,6 +129,149 @@ class PDFTableConverterApp:
                                    relief=tk.RAISED, bd=1)
         self.save_button.pack(side=tk.LEFT)
         
+        # 提取引擎选择
+        self.engine_frame = tk.Frame(self.file_frame, bg=self.frame_bg)
+        self.engine_frame.pack(fill="x", pady=5)
+        
+        self.engine_label = tk.Label(self.engine_frame, text="提取引擎:", font=self.default_font,
+                                   bg=self.frame_bg, fg=self.text_color, width=15)
+        self.engine_label.pack(side=tk.LEFT)
+        
+        self.engine_var = tk.StringVar(value=ENGINE_THREAD)
+        for text, value in (("线程池", ENGINE_THREAD), ("进程池 (多核/大文件)", ENGINE_PROCESS)):
+            tk.Radiobutton(self.engine_frame, text=text, value=value, variable=self.engine_var,
+                           font=self.default_font, bg=self.frame_bg, fg=self.text_color,
+                           activebackground=self.frame_bg).pack(side=tk.LEFT, padx=5)
+        
+        # 记录各阶段用时（默认关闭），转换后在“性能统计”中查看和导出
+        self.trace_var = tk.BooleanVar(value=False)
+        self.trace_check = tk.Checkbutton(self.engine_frame, text="记录性能统计", variable=self.trace_var,
+                                        font=self.default_font, bg=self.frame_bg, fg=self.text_color,
+                                        activebackground=self.frame_bg)
+        self.trace_check.pack(side=tk.LEFT, padx=(20, 5))
+        
+        # 状态区只保留最近的行，开启后所有输出（包括合并掉的中间进度）另外写入日志文件
+        self.full_log_var = tk.BooleanVar(value=False)
+        self.full_log_check = tk.Checkbutton(self.engine_frame, text="保存完整日志", variable=self.full_log_var,
+                                           command=self.toggle_full_log, font=self.default_font,
+                                           bg=self.frame_bg, fg=self.text_color, activebackground=self.frame_bg)
+        self.full_log_check.pack(side=tk.LEFT, padx=5)
+        
+        # 提取后端选择（每个任务按加入队列时的选择）
+        self.backend_frame = tk.Frame(self.file_frame, bg=self.frame_bg)
+        self.backend_frame.pack(fill="x", pady=5)
+        
+        self.backend_label = tk.Label(self.backend_frame, text="提取后端:", font=self.default_font,
+                                    bg=self.frame_bg, fg=self.text_color, width=15)
+        self.backend_label.pack(side=tk.LEFT)
+        
+        self.backend_var = tk.StringVar(value=BACKEND_AUTO)
+        for text, value in (("tabula (需要Java)", BACKEND_AUTO), ("pdfplumber (无需Java)", BACKEND_PDFPLUMBER)):
+            button = tk.Radiobutton(self.backend_frame, text=text, value=value, variable=self.backend_var,
+                                    font=self.default_font, bg=self.frame_bg, fg=self.text_color,
+                                    activebackground=self.frame_bg)
+            if value == BACKEND_PDFPLUMBER and not pdfplumber_available():
+                button["state"] = "disabled"
+            button.pack(side=tk.LEFT, padx=5)
+        
+        # 转换选项
+        self.options_frame = tk.Frame(self.file_frame, bg=self.frame_bg)
+        self.options_frame.pack(fill="x", pady=5)
+        
+        self.options_label = tk.Label(self.options_frame, text="选项:", font=self.default_font,
+                                    bg=self.frame_bg, fg=self.text_color, width=15)
+        self.options_label.pack(side=tk.LEFT)
+        
+        # 提取缓存开关
+        self.use_cache_var = tk.BooleanVar(value=True)
+        self.cache_check = tk.Checkbutton(self.options_frame, text="使用提取缓存", variable=self.use_cache_var,
+                                        font=self.default_font, bg=self.frame_bg, fg=self.text_color,
+                                        activebackground=self.frame_bg)
+        self.cache_check.pack(side=tk.LEFT, padx=5)
+        
+        self.clear_cache_button = tk.Button(self.options_frame, text="清除缓存", font=self.default_font,
+                                          command=self.clear_cache, bg="#9E9E9E", fg="white",
+                                          activebackground="#757575", activeforeground="white",
+                                          relief=tk.RAISED, bd=1)
+        self.clear_cache_button.pack(side=tk.LEFT)
+        
+        # 跳过无表格页开关（预扫描判定，可能漏掉没有框线且列对齐不明显的表格，默认关闭）
+        self.skip_empty_var = tk.BooleanVar(value=False)
+        self.skip_empty_check = tk.Checkbutton(self.options_frame, text="跳过无表格页", variable=self.skip_empty_var,
+                                             font=self.default_font, bg=self.frame_bg, fg=self.text_color,
+                                             activebackground=self.frame_bg)
+        self.skip_empty_check.pack(side=tk.LEFT, padx=(20, 5))
+        
+        # 从检查点继续（上次转换中断时输出文件旁留有 .journal 目录）
+        self.resume_var = tk.BooleanVar(value=True)
+        self.resume_check = tk.Checkbutton(self.options_frame, text="继续未完成的转换", variable=self.resume_var,
+                                         font=self.default_font, bg=self.frame_bg, fg=self.text_color,
+                                         activebackground=self.frame_bg)
+        self.resume_check.pack(side=tk.LEFT, padx=(20, 5))
+        
+        # 跨页续表合并到同一个工作表
+        self.stitch_var = tk.BooleanVar(value=True)
+        self.stitch_check = tk.Checkbutton(self.options_frame, text="合并跨页表格", variable=self.stitch_var,
+                                         font=self.default_font, bg=self.frame_bg, fg=self.text_color,
+                                         activebackground=self.frame_bg)
+        self.stitch_check.pack(side=tk.LEFT, padx=(20, 5))
+        
+        # 第一页与已保存的版式模板匹配时按模板的区域和列提取
+        self.template_var = tk.BooleanVar(value=True)
+        self.template_check = tk.Checkbutton(self.options_frame, text="使用版式模板", variable=self.template_var,
+                                           font=self.default_font, bg=self.frame_bg, fg=self.text_color,
+                                           activebackground=self.frame_bg)
+        self.template_check.pack(side=tk.LEFT, padx=(20, 5))
+        
+        # 转换队列框架：每个任务一行，显示状态、进度和吞吐量
+        self.queue_frame = tk.LabelFrame(self.main_frame, text="转换队列", font=self.default_font,
+                                       bg=self.frame_bg, fg=self.text_color, padx=15, pady=10)
+        self.queue_frame.pack(fill="both", expand=True, pady=10)
+        
+        columns = ("status", "progress", "tables", "speed")
+        self.job_tree = ttk.Treeview(self.queue_frame, columns=columns, height=5, selectmode="extended")
+        self.job_tree.heading("#0", text="文件")
+        self.job_tree.heading("status", text="状态")
+        self.job_tree.heading("progress", text="进度")
+        self.job_tree.heading("tables", text="表格")
+        self.job_tree.heading("speed", text="页/秒")
+        self.job_tree.column("#0", width=320)
+        for column, width in (("status", 80), ("progress", 80), ("tables", 60), ("speed", 70)):
+            self.job_tree.column(column, width=width, anchor="center")
+        self.job_scrollbar = ttk.Scrollbar(self.queue_frame, orient="vertical", command=self.job_tree.yview)
+        self.job_tree.configure(yscrollcommand=self.job_scrollbar.set)
+        self.job_tree.pack(side=tk.LEFT, fill="both", expand=True)
+        self.job_scrollbar.pack(side=tk.LEFT, fill="y")
+        
+        self.queue_button_frame = tk.Frame(self.queue_frame, bg=self.frame_bg)
+        self.queue_button_frame.pack(side=tk.LEFT, fill="y", padx=(10, 0))
+        
+        self.cancel_job_button = tk.Button(self.queue_button_frame, text="取消所选", font=self.default_font,
+                                         command=self.cancel_selected_jobs, bg="#9E9E9E", fg="white",
+                                         activebackground="#757575", activeforeground="white",
+                                         relief=tk.RAISED, bd=1, width=10)
+        self.cancel_job_button.pack(pady=(0, 5))
+        
+        self.clear_jobs_button = tk.Button(self.queue_button_frame, text="清除已完成", font=self.default_font,
+                                         command=self.clear_finished_jobs, bg="#9E9E9E", fg="white",
+                                         activebackground="#757575", activeforeground="white",
+                                         relief=tk.RAISED, bd=1, width=10)
+        self.clear_jobs_button.pack(pady=(0, 5))
+        
+        # 把转换成功的任务保存为版式模板，之后同版式的PDF按模板提取
+        self.save_template_button = tk.Button(self.queue_button_frame, text="保存为模板", font=self.default_font,
+                                            command=self.save_template, bg="#9E9E9E", fg="white",
+                                            activebackground="#757575", activeforeground="white",
+                                            relief=tk.RAISED, bd=1, width=10)
+        self.save_template_button.pack(pady=(0, 5))
+        
+        # 记录了性能统计的任务：按阶段的用时汇总，可导出Chrome跟踪文件
+        self.stats_button = tk.Button(self.queue_button_frame, text="性能统计", font=self.default_font,
+                                    command=self.show_stats, bg="#9E9E9E", fg="white",
+                                    activebackground="#757575", activeforeground="white",
+                                    relief=tk.RAISED, bd=1, width=10)
+        self.stats_button.pack()
+        
         # 处理状态框架
         self.status_frame = tk.LabelFrame(self.main_frame, text="处理状态", font=self.default_font,
                                         bg=self.frame_bg, fg=self.text_color, padx=15, pady=15)
@@ -554,7 +306,7 @@ class PDFTableConverterApp:
         self.tables_label.pack(side=tk.RIGHT)
         
         # 状态文本框
-        self.status_text = tk.Text(self.status_frame, height=8, wrap=tk.WORD, 
+        self.status_text = tk.Text(self.status_frame, height=5, wrap=tk.WORD, 
                                  font=self.default_font, state="disabled", 
                                  bg="#FFFFFF", bd=1, relief=tk.SOLID)
         self.status_text.pack(fill="both", expand=True, pady=10)
@@ -567,7 +319,7 @@ class PDFTableConverterApp:
         self.spacer1 = tk.Frame(self.button_frame, bg=self.bg_color)
         self.spacer1.pack(side=tk.LEFT, fill="x", expand=True)
         
-        self.convert_button = tk.Button(self.button_frame, text="开始转换", font=(self.default_font[0], 10, 'bold'),
+        self.convert_button = tk.Button(self.button_frame, text="加入队列", font=(self.default_font[0], 10, 'bold'),
                                       command=self.start_conversion, state="disabled", width=15,
                                       bg="#4CAF50", fg="white", activebackground="#3D8B40", 
                                       activeforeground="white", relief=tk.RAISED, bd=2, highlightthickness=0,
@@ -594,28 +346,86 @@ class PDFTableConverterApp:
         self.pdf_path_var.trace_add("write", self.update_button_states)
         self.excel_path_var.trace_add("write", self.update_button_states)
         
-        # 状态变量
-        self.conversion_thread = None
-        self.cancel_flag = {"cancel": False}
+        # 转换线程只把进度推入通道，界面按固定帧率取出刷新
+        self.progress_channel = ProgressChannel()
+        self.root.after(FRAME_INTERVAL_MS, self.pump_progress)
+        
+        # 状态变量：所有任务共享一个转换队列（和其中的提取执行器）
+        self.job_queue = ConversionQueue(on_progress=self.update_progress, on_log=self.batch_log)
+        self.refreshing = False
+        self.last_output_path = None
         self.last_dir = os.path.expanduser("~")
         
-        # 检查Java
-        if not check_java_installation():
+        # 窗口显示后在后台检查Java并加载转换引擎，不阻塞启动
+        self.warmup_thread = None
+        self.java_installed = None
+        self.root.after_idle(self.start_warmup)
+    
+    def start_warmup(self):
+        """在后台线程中检查Java并预先导入转换引擎"""
+        def warmup():
+            from converter_engine import check_java_installation
+            self.java_installed = check_java_installation()
+        
+        self.warmup_thread = threading.Thread(target=warmup, daemon=True)
+        self.warmup_thread.start()
+        self.root.after(100, self.check_warmup)
+    
+    def check_warmup(self):
+        if self.warmup_thread.is_alive():
+            self.root.after(100, self.check_warmup)
+        elif self.java_installed is False and pdfplumber_available():
+            # 没有Java时改用不需要Java的后端
+            self.backend_var.set(BACKEND_PDFPLUMBER)
+            self.update_status_text("未检测到Java环境，已切换到pdfplumber提取后端")
+        elif self.java_installed is False:
             messagebox.showerror("Java未安装", 
                                "错误: 未检测到Java环境!\n\n此应用需要Java才能运行。\n请安装Java后再运行本程序。\n\n可以从 https://www.java.com 下载安装Java。")
     
+    def wait_for_warmup(self):
+        """需要转换引擎时等待后台加载完成"""
+        if self.warmup_thread is None:
+            self.start_warmup()
+        if self.warmup_thread.is_alive():
+            self.update_status_text("正在加载转换引擎...")
+            self.root.update_idletasks()
+            self.warmup_thread.join()
+    
     def update_progress_bar(self, percent):
         """更新进度条显示"""
         self.progress_bar.place(relwidth=percent/100)
     
     def browse_pdf(self):
-        file_path = filedialog.askopenfilename(
-            title="选择PDF文件",
+        file_paths = filedialog.askopenfilenames(
+            title="选择PDF文件（可多选）",
             initialdir=self.last_dir,
             filetypes=[("PDF文件", "*.pdf"), ("所有文件", "*.*")]
         )
         
-        if file_path:
+        if len(file_paths) > 1:
+            # 多选时直接加入队列，输出到各自所在目录的同名Excel文件
+            self.last_dir = os.path.dirname(file_paths[0])
+            targets = [(file_path, os.path.splitext(file_path)[0] + '.xlsx') for file_path in file_paths]
+            # 已在队列中的输出文件不重复加入
+            pending = {job.output_path for job in self.job_queue.jobs if job.status in (JOB_QUEUED, JOB_RUNNING)}
+            targets = [(file_path, output_path) for file_path, output_path in targets if output_path not in pending]
+            # 与单个文件相同，检查输出文件是否已存在（留有检查点时继续转换，不提示覆盖）
+            existing = [output_path for _, output_path in targets
+                        if output_exists(output_path, OUTPUT_XLSX)
+                        and not (self.resume_var.get() and os.path.exists(f"{output_path}.journal"))]
+            if existing:
+                names = "\n".join(os.path.basename(output_path) for output_path in existing[:10])
+                if len(existing) > 10:
+                    names += f"\n……等 {len(existing)} 个文件"
+                if not messagebox.askyesno("文件已存在", f"以下文件已存在，是否覆盖?\n{names}\n\n选择“否”将跳过这些文件"):
+                    targets = [(file_path, output_path) for file_path, output_path in targets
+                               if output_path not in existing]
+            for file_path, output_path in targets:
+                self.enqueue(file_path, output_path)
+            return
+        
+        if file_paths:
+            file_path = file_paths[0]
             self.pdf_path_var.set(file_path)
             self.last_dir = os.path.dirname(file_path)
             
@@ -628,10 +438,12 @@ class PDFTableConverterApp:
     
     def save_excel(self):
         file_path = filedialog.asksaveasfilename(
-            title="保存Excel文件",
+            title="保存输出文件",
             initialdir=self.last_dir,
             defaultextension=".xlsx",
-            filetypes=[("Excel文件", "*.xlsx"), ("所有文件", "*.*")]
+            filetypes=[(label, f"*{FORMAT_EXTENSIONS[output_format]}") for label, output_format in SAVE_FILE_TYPES]
+                      + [("所有文件", "*.*")],
+            typevariable=self.save_type_var
         )
         
         if file_path:
@@ -645,20 +457,98 @@ class PDFTableConverterApp:
             self.convert_button["state"] = "disabled"
     
     def update_status_text(self, text):
+        """主线程中追加一行状态，立即显示"""
+        self.progress_channel.log([text])
+        self.show_status_lines(*self.progress_channel.drain())
+    
+    def show_status_lines(self, lines, dropped=0):
+        """把取出的行追加到状态区，超过 STATUS_LOG_LINES 行时删除最旧的行"""
+        if not lines and not dropped:
+            return
+        if dropped:
+            where = f"，完整日志见 {self.progress_channel.log_path}" if self.progress_channel.log_path else ""
+            lines = [f"（输出过快，省略了 {dropped} 行{where}）"] + lines
         self.status_text.configure(state="normal")
-        self.status_text.insert(tk.END, text + "\n")
+        self.status_text.insert(tk.END, "\n".join(lines) + "\n")
+        line_count = int(self.status_text.index("end-1c").split(".")[0]) - 1
+        if line_count > STATUS_LOG_LINES:
+            self.status_text.delete("1.0", f"{line_count - STATUS_LOG_LINES + 1}.0")
         self.status_text.see(tk.END)
         self.status_text.configure(state="disabled")
     
-    def update_progress(self, percent, status_text, tables_found):
-        # 使用after方法确保在主线程中更新UI
-        self.root.after(0, lambda: self._update_progress_impl(percent, status_text, tables_found))
+    def pump_progress(self):
+        """每帧取出通道中的进度和日志，队列运行时同时刷新任务列表"""
+        self.show_status_lines(*self.progress_channel.drain())
+        if self.refreshing:
+            self.refresh_jobs()
+        self.root.after(FRAME_INTERVAL_MS, self.pump_progress)
     
-    def _update_progress_impl(self, percent, status_text, tables_found):
+    def toggle_full_log(self):
+        if self.full_log_var.get():
+            try:
+                path = self.progress_channel.open_log()
+            except OSError as e:
+                self.full_log_var.set(False)
+                messagebox.showerror("错误", f"无法创建日志文件: {str(e)}")
+                return
+            self.update_status_text(f"完整日志写入: {path}")
+        else:
+            self.progress_channel.close_log()
+            self.update_status_text("已停止保存完整日志")
+    
+    def update_progress(self, job, percent, status_text, tables_found):
+        # 转换线程中调用：同一任务在一帧内的多次进度只显示最新的一条
+        self.progress_channel.set_status(job.job_id, f"[{job.name}] {status_text}")
+    
+    def batch_log(self, job, start_page, end_page, records):
+        """批次的提取器输出和出错信息显示在状态区"""
+        from extraction_log import format_record
+        self.progress_channel.log([f"[{job.name}] 页 {start_page}-{end_page} {format_record(record)}"
+                                   for record in records])
+    
+    def refresh_jobs(self):
+        """刷新任务列表和总进度（队列运行时由 pump_progress 每帧调用）"""
+        for job in list(self.job_queue.jobs):
+            item_id = str(job.job_id)
+            values = (JOB_STATUS_TEXT[job.status], f"{job.percent}%", job.tables_found,
+                      f"{job.pages_per_second:.1f}" if job.start_time else "-")
+            if self.job_tree.exists(item_id):
+                self.job_tree.item(item_id, values=values)
+            else:
+                self.job_tree.insert("", tk.END, iid=item_id, text=job.name, values=values)
+            if job.status == JOB_DONE:
+                self.last_output_path = job.output_path
+        
+        pages_done, total_pages = self.job_queue.totals()
+        percent = int(pages_done * 100 / total_pages) if total_pages else 0
         self.update_progress_bar(percent)
         self.percent_var.set(f"{percent}%")
-        self.update_status_text(status_text)
-        self.tables_var.set(f"找到表格: {tables_found}")
+        self.tables_var.set(f"找到表格: {sum(job.tables_found for job in self.job_queue.jobs)}")
+        
+        if self.job_queue.is_running():
+            return
+        
+        # 队列全部完成
+        self.refreshing = False
+        self.cancel_button["state"] = "disabled"
+        jobs = self.job_queue.jobs
+        succeeded = sum(1 for job in jobs if job.status == JOB_DONE)
+        failed = sum(1 for job in jobs if job.status == JOB_FAILED)
+        if succeeded and self.last_output_path:
+            if messagebox.askyesno("转换完成", f"队列已完成：成功 {succeeded} 个，失败 {failed} 个。\n是否打开输出文件所在目录?"):
+                self.open_output_dir(self.last_output_path)
+    
+    def enqueue(self, pdf_path, output_path, output_format=None):
+        """加入转换队列（队列空闲时按当前设置选择引擎和缓存）"""
+        self.wait_for_warmup()
+        self.job_queue.configure(self.engine_var.get(), self.use_cache_var.get())
+        job = self.job_queue.add(pdf_path, output_path, skip_empty_pages=self.skip_empty_var.get(),
+                                 resume=self.resume_var.get(), stitch_tables=self.stitch_var.get(),
+                                 output_format=output_format, backend=self.backend_var.get(),
+                                 use_templates=self.template_var.get(), trace=self.trace_var.get())
+        self.update_status_text(f"[{job.name}] 已加入队列")
+        self.cancel_button["state"] = "normal"
+        self.refreshing = True
     
     def start_conversion(self):
         pdf_path = self.pdf_path_var.get()
@@ -669,10 +559,11 @@ class PDFTableConverterApp:
             messagebox.showerror("错误", f"PDF文件不存在: {pdf_path}")
             return
         
-        # 确保输出路径有.xlsx扩展名
-        if not output_path.lower().endswith('.xlsx'):
+        # 没有可识别的扩展名时按Excel输出
+        if not has_known_extension(output_path):
             output_path += '.xlsx'
             self.excel_path_var.set(output_path)
+        output_format = format_for_selection(output_path, self.save_type_var.get())
         
         # 检查输出目录是否存在
         output_dir = os.path.dirname(output_path)
@@ -683,57 +574,125 @@ class PDFTableConverterApp:
                 messagebox.showerror("错误", f"无法创建输出目录: {str(e)}")
                 return
         
-        # 检查输出文件是否已存在
-        if os.path.exists(output_path):
+        # 检查输出文件是否已存在（留有检查点时继续转换，不提示覆盖）
+        resumable = self.resume_var.get() and os.path.exists(f"{output_path}.journal")
+        if output_exists(output_path, output_format) and not resumable:
             if not messagebox.askyesno("文件已存在", 
                                      f"文件 {os.path.basename(output_path)} 已存在，是否覆盖?"):
                 return
         
-        # 重置状态
-        self.status_text.configure(state="normal")
-        self.status_text.delete(1.0, tk.END)
-        self.status_text.configure(state="disabled")
-        self.update_progress_bar(0)
-        self.percent_var.set("0%")
-        self.tables_var.set("找到表格: 0")
-        
-        # 重置取消标志
-        self.cancel_flag["cancel"] = False
-        
-        # 更新按钮状态
-        self.convert_button["state"] = "disabled"
-        self.cancel_button["state"] = "normal"
-        
-        # 在后台线程中处理转换
-        self.conversion_thread = threading.Thread(
-            target=convert_pdf_to_excel,
-            args=(pdf_path, output_path, self.update_progress, self.cancel_flag),
-            daemon=True
-        )
-        self.conversion_thread.start()
+        # 同一输出文件已在队列中时不重复加入
+        if any(job.output_path == output_path and job.status in (JOB_QUEUED, JOB_RUNNING)
+               for job in self.job_queue.jobs):
+            messagebox.showwarning("提示", f"{os.path.basename(output_path)} 已在转换队列中")
+            return
         
-        # 定期检查线程是否完成
-        self.root.after(100, self.check_conversion_thread)
+        # 加入队列，由队列在共享的提取执行器上调度
+        self.enqueue(pdf_path, output_path, output_format)
+        self.pdf_path_var.set("")
+        self.excel_path_var.set("")
     
-    def check_conversion_thread(self):
-        if self.conversion_thread and not self.conversion_thread.is_alive():
-            # 恢复按钮状态
-            self.convert_button["state"] = "normal" if (self.pdf_path_var.get() and self.excel_path_var.get()) else "disabled"
-            self.cancel_button["state"] = "disabled"
-            
-            # 检查是否成功完成转换
-            if os.path.exists(self.excel_path_var.get()) and not self.cancel_flag["cancel"]:
-                if messagebox.askyesno("转换完成", "转换完成！是否打开输出文件所在目录?"):
-                    # 打开文件所在目录
-                    self.open_output_dir()
-            
-            self.conversion_thread = None
-        elif self.conversion_thread:
-            # 继续检查
-            self.root.after(100, self.check_conversion_thread)
+    def cancel_selected_jobs(self):
+        selected = set(self.job_tree.selection())
+        for job in list(self.job_queue.jobs):
+            if str(job.job_id) in selected:
+                self.job_queue.cancel(job)
     
-    def open_output_dir(self):
-        output_dir = os.path.dirname(self.excel_path_var.get())
+    def save_template(self):
+        """用所选（或最后一个）转换成功的任务保存版式模板"""
+        selected = set(self.job_tree.selection())
+        done = [job for job in self.job_queue.jobs if job.status == JOB_DONE]
+        candidates = [job for job in done if str(job.job_id) in selected] or done[-1:]
+        if not candidates:
+            messagebox.showwarning("提示", "请先选择一个转换成功的任务")
+            return
+        job = candidates[0]
+        name = simpledialog.askstring("保存版式模板", f"模板名称（来自 {job.name}）:",
+                                      initialvalue=os.path.splitext(job.name)[0], parent=self.root)
+        if not name:
+            return
+        try:
+            from layout_templates import get_registry
+            template = get_registry().save_from_run(name.strip(), job.pdf_path, job.layouts)
+        except Exception as e:
+            messagebox.showerror("错误", f"保存版式模板失败: {str(e)}")
+            return
+        if template is None:
+            messagebox.showwarning("提示", "该任务没有可用的表格区域，无法保存模板")
+            return
+        self.update_status_text(f"已保存版式模板: {template['name']}，第一页版式相同的PDF将按模板提取")
+    
+    def show_stats(self):
+        """显示所选（或最后一个）记录了性能统计的任务的各阶段用时"""
+        selected = set(self.job_tree.selection())
+        traced = [job for job in self.job_queue.jobs if job.trace is not None and job.status != JOB_QUEUED]
+        candidates = [job for job in traced if str(job.job_id) in selected] or traced[-1:]
+        if not candidates:
+            messagebox.showwarning("提示", "没有记录了性能统计的任务，请勾选“记录性能统计”后加入队列")
+            return
+        job = candidates[0]
+        
+        window = tk.Toplevel(self.root)
+        window.title(f"性能统计 - {job.name}")
+        window.geometry("640x420")
+        window.configure(bg=self.frame_bg)
+        
+        columns = ("count", "total", "mean", "max", "share")
+        stats_tree = ttk.Treeview(window, columns=columns, height=12)
+        stats_tree.heading("#0", text="阶段")
+        for column, text in zip(columns, ("次数", "总用时(秒)", "平均(毫秒)", "最长(毫秒)", "占比")):
+            stats_tree.heading(column, text=text)
+            stats_tree.column(column, width=90, anchor="e")
+        stats_tree.column("#0", width=150)
+        stats_tree.pack(fill="both", expand=True, padx=10, pady=(10, 5))
+        
+        wall_var = tk.StringVar()
+        tk.Label(window, textvariable=wall_var, font=self.default_font, bg=self.frame_bg, fg=self.text_color,
+                 justify=tk.LEFT).pack(anchor="w", padx=10)
+        
+        def refresh():
+            stats_tree.delete(*stats_tree.get_children())
+            wall = job.trace.wall_seconds()
+            for stage in job.trace.summary():
+                share = f"{stage['total'] / wall:.0%}" if wall else "-"
+                stats_tree.insert("", tk.END, text=stage["stage"], values=(
+                    stage["count"], f"{stage['total']:.3f}", f"{stage['mean'] * 1000:.1f}",
+                    f"{stage['max'] * 1000:.1f}", share))
+            status = "（转换进行中）" if job.status == JOB_RUNNING else ""
+            wall_var.set(f"总时间: {wall:.2f}秒{status}\n并行的批次各自计时，阶段的占比之和可超过100%")
+        
+        def export():
+            path = filedialog.asksaveasfilename(
+                title="导出跟踪文件", parent=window, initialdir=os.path.dirname(job.output_path),
+                initialfile=os.path.basename(job.output_path) + ".trace.json", defaultextension=".json",
+                filetypes=[("Chrome跟踪文件", "*.json"), ("所有文件", "*.*")]
+            )
+            if not path:
+                return
+            try:
+                job.trace.export_chrome_trace(path)
+            except OSError as e:
+                messagebox.showerror("错误", f"导出跟踪文件失败: {str(e)}", parent=window)
+                return
+            self.update_status_text(f"[{job.name}] 已导出跟踪文件: {path}（可在chrome://tracing或ui.perfetto.dev中打开）")
+        
+        button_frame = tk.Frame(window, bg=self.frame_bg)
+        button_frame.pack(fill="x", padx=10, pady=10)
+        for text, command in (("刷新", refresh), ("导出跟踪...", export), ("关闭", window.destroy)):
+            tk.Button(button_frame, text=text, font=self.default_font, command=command, bg="#9E9E9E", fg="white",
+                      activebackground="#757575", activeforeground="white", relief=tk.RAISED, bd=1,
+                      width=10).pack(side=tk.LEFT, padx=(0, 5))
+        refresh()
+    
+    def clear_finished_jobs(self):
+        self.job_queue.remove_finished()
+        remaining = {str(job.job_id) for job in self.job_queue.jobs}
+        for item_id in self.job_tree.get_children():
+            if item_id not in remaining:
+                self.job_tree.delete(item_id)
+    
+    def open_output_dir(self, output_path):
+        output_dir = os.path.dirname(output_path)
         try:
             if sys.platform == 'win32':
                 os.startfile(output_dir)
@@ -746,25 +705,35 @@ class PDFTableConverterApp:
         except Exception as e:
             messagebox.showerror("错误", f"无法打开目录: {str(e)}")
     
+    def clear_cache(self):
+        if self.job_queue.is_running():
+            messagebox.showwarning("提示", "转换进行中，请完成后再清除缓存")
+            return
+        try:
+            from extraction_cache import get_cache
+            cache = get_cache()
+            size_mb = cache.size_mb()
+            cache.clear()
+            self.update_status_text(f"已清除提取缓存 ({size_mb:.1f} MB)")
+        except Exception as e:
+            messagebox.showerror("错误", f"清除缓存失败: {str(e)}")
+    
     def cancel_conversion(self):
-        if self.conversion_thread and self.conversion_thread.is_alive():
-            self.update_status_text("正在取消操作，请稍候...")
-            self.cancel_flag["cancel"] = True
+        if self.job_queue.is_running():
+            self.update_status_text("正在取消全部任务，请稍候...")
+            self.job_queue.cancel()
     
     def exit_app(self):
-        # 如果有转换线程正在运行，询问是否确定退出
-        if self.conversion_thread and self.conversion_thread.is_alive():
+        # 如果有转换正在运行，询问是否确定退出
+        if self.job_queue.is_running():
             if not messagebox.askyesno("确认退出", "转换正在进行中，确定要退出吗？"):
                 return
-            self.cancel_flag["cancel"] = True
+            self.job_queue.cancel()
         
+        self.progress_channel.close_log()
         self.root.destroy()
 
 def main():
-    # 确保导入concurrent.futures
-    global concurrent
-    import concurrent.futures
-    
     # 设置Tk应用
     root = tk.Tk()
     # 设置DPI感知
@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - pdfplumber提取后端
+纯Python的表格提取（pdfplumber/pdfminer），不需要Java和JVM，可以在任意多个进程中运行；
+接口与TabulaBackend相同（read_pdf、open_document、逐页extract），结果同样转换为tabula的JSON结构，
+表头命名和拼接所需的版式信息与tabula后端一致
+
+有框线的页按框线切分单元格（lattice），没有框线的页按文本对齐推断列（stream），
+并去掉穿过单词或列间隙不足一个字宽的列边界，避免把正文段落当成表格；
+auto方式下得分低的页再用另一种方式提取（见 extraction_methods）
+
+pdfplumber在首次使用时才导入
+"""
+
+import os
+import statistics
+import threading
+import importlib.util
+from collections import Counter
+
+from conversion_trace import span
+from tabula_backend import BACKEND_PDFPLUMBER, ExtractionCancelled, cancel_requested, tables_from_json
+from extraction_methods import METHOD_AUTO, METHOD_GUESS, METHOD_LATTICE, METHOD_STREAM, choose_page_tables
+
+# 有框线的页：单元格由直线和矩形边围成
+LINES_SETTINGS = {"vertical_strategy": "lines", "horizontal_strategy": "lines"}
+# 没有框线的页：列边界由文本左右边缘的对齐推断
+TEXT_SETTINGS = {"vertical_strategy": "text", "horizontal_strategy": "text"}
+# 列边界两侧的文本间隙至少为这么多个字宽（正文中单词之间只隔一个空格，约半个字宽）
+MIN_GUTTER_CHARS = 1.0
+# 判断单词是否穿过列边界时允许的误差（点）
+BOUNDARY_TOLERANCE = 1.0
+# 与列边界冲突的文本行超过此比例时去掉该边界（至少容许一行），表格上方横跨各列的标题不影响表格的列
+MAX_CONFLICT_LINE_SHARE = 0.1
+
+def pdfplumber_available():
+    """检查pdfplumber是否已安装"""
+    return importlib.util.find_spec("pdfplumber") is not None
+
+def parse_pages(pages, page_count):
+    """把tabula风格的页码参数（"all"、"1-3,5"、整数或整数列表）转换为页码列表"""
+    if pages is None or pages == "all":
+        return list(range(1, page_count + 1))
+    if isinstance(pages, int):
+        return [pages]
+    if not isinstance(pages, str):
+        return [int(page) for page in pages]
+    result = []
+    for part in pages.split(","):
+        part = part.strip()
+        if "-" in part:
+            start, end = part.split("-", 1)
+            end = page_count if end.strip() == "all" else int(end)
+            result.extend(range(int(start), end + 1))
+        elif part:
+            result.append(int(part))
+    return result
+
+def _line_conflicts(x, words, min_gutter):
+    """一行文本是否与x处的列边界冲突：有单词穿过边界，或在x处开始的单词与左侧单词的间隙不足min_gutter"""
+    if any(word["x0"] + BOUNDARY_TOLERANCE < x < word["x1"] - BOUNDARY_TOLERANCE for word in words):
+        return True
+    if not any(abs(word["x0"] - x) <= BOUNDARY_TOLERANCE for word in words):
+        return False
+    left = [word["x1"] for word in words if word["x1"] <= x + BOUNDARY_TOLERANCE]
+    return bool(left) and x - max(left) < min_gutter
+
+def text_columns(page, words):
+    """
+    无框线页的列边界x坐标和表格所在的上下范围，返回 (边界列表, (上, 下))，没有文本时范围为None
+
+    取pdfplumber按文本对齐找出的竖直边界，去掉与较多文本行冲突（穿过单词，或左侧间隙不足MIN_GUTTER_CHARS个字宽）的边界；
+    两端对齐的正文中，行首单词也会对齐成“列”，但几乎每一行都有单词穿过这些位置，或只隔一个空格。
+    表格范围为第一个到最后一个与保留的边界都不冲突的文本行，表格上方的标题和下方的说明不计入表格
+    """
+    if not words:
+        return [], None
+    char_width = statistics.median((word["x1"] - word["x0"]) / len(word["text"]) for word in words)
+    min_gutter = char_width * MIN_GUTTER_CHARS
+    lines = {}
+    for word in words:
+        lines.setdefault(round(word["top"]), []).append(word)
+    allowed = max(1, int(len(lines) * MAX_CONFLICT_LINE_SHARE))
+
+    finder = page.debug_tablefinder(TEXT_SETTINGS)
+    candidates = sorted({round(edge["x0"], 1) for edge in finder.edges if edge["orientation"] == "v"})
+    boundaries = []
+    for x in candidates:
+        conflicts = sum(1 for line_words in lines.values() if _line_conflicts(x, line_words, min_gutter))
+        if conflicts <= allowed:
+            boundaries.append(x)
+
+    table_lines = [line_words for _, line_words in sorted(lines.items())
+                   if not any(_line_conflicts(x, line_words, min_gutter) for x in boundaries)]
+    if not table_lines:
+        return boundaries, None
+    return boundaries, (min(word["top"] for word in table_lines[0]), max(word["bottom"] for word in table_lines[-1]))
+
+def find_page_tables(page, method, columns=None):
+    """
+    按lattice或stream方式查找一页中的表格，返回pdfplumber的Table列表
+
+    stream方式下给出columns（列分隔x坐标，来自版式模板）时直接按这些位置分列，不再推断
+    """
+    if method == METHOD_LATTICE:
+        return page.find_tables(LINES_SETTINGS)
+    if columns:
+        boundaries = [page.bbox[0]] + [x for x in columns if page.bbox[0] < x < page.bbox[2]] + [page.bbox[2]]
+    else:
+        boundaries, extent = text_columns(page, page.extract_words())
+        if extent is not None and len(boundaries) >= 3:
+            x0, _, x1, _ = page.bbox
+            page = page.crop((x0, extent[0] - BOUNDARY_TOLERANCE, x1, extent[1] + BOUNDARY_TOLERANCE))
+    if len(boundaries) < 3:
+        return []  # 至少两列才算表格
+    return page.find_tables({
+        "vertical_strategy": "explicit",
+        "explicit_vertical_lines": boundaries,
+        "horizontal_strategy": "text",
+    })
+
+def table_json(table, method=None):
+    """
+    把pdfplumber的Table转换为tabula-java的JSON结构（{"data": [[{"text", "left", "width"}]], "extraction_method"}）
+
+    按文本推断行时行间的空白会形成空行，这里丢掉全空的行
+    """
+    data = []
+    for row, texts in zip(table.rows, table.extract()):
+        if not any(texts):
+            continue
+        cells = []
+        for bbox, text in zip(row.cells, texts):
+            if bbox is None:  # 被合并单元格覆盖的位置
+                cells.append({"text": "", "left": 0.0, "width": 0.0})
+            else:
+                cells.append({"text": text or "", "left": float(bbox[0]), "width": float(bbox[2] - bbox[0])})
+        data.append(cells)
+    x0, top, x1, bottom = table.bbox
+    return {"data": data, "extraction_method": method,
+            "top": float(top), "left": float(x0), "width": float(x1 - x0), "height": float(bottom - top)}
+
+def page_json(page, method, columns=None):
+    """按lattice或stream方式提取一页，返回tabula JSON结构"""
+    return [table_json(table, method) for table in find_page_tables(page, method, columns)]
+
+def crop_to_area(page, area):
+    """按 [上, 左, 下, 右]（点，与tabula的area相同）裁剪页面，超出页面的部分截掉"""
+    top, left, bottom, right = area
+    x0, y0, x1, y1 = page.bbox
+    return page.crop((max(left, x0), max(top, y0), min(right, x1), min(bottom, y1)))
+
+class PlumberBackend:
+    """
+    pdfplumber提取后端，接口与TabulaBackend一致
+
+    没有需要启动的常驻进程，start() 只检查pdfplumber是否可用
+    """
+
+    def __init__(self, mode=BACKEND_PDFPLUMBER, java_options=None):
+        self.requested_mode = mode
+        self.mode = None
+
+    def start(self):
+        """检查pdfplumber是否可用，返回后端模式"""
+        if self.mode is None:
+            if not pdfplumber_available():
+                raise RuntimeError("未安装pdfplumber，请执行 pip install pdfplumber")
+            self.mode = BACKEND_PDFPLUMBER
+        return self.mode
+
+    def read_pdf(self, pdf_path, pages, cancel_token=None, **options):
+        """提取指定页的表格，返回DataFrame列表（每个表格的页码记录在attrs["page"]中）"""
+        document = self.open_document(pdf_path, **options)
+        try:
+            return document.extract(parse_pages(pages, document.page_count), cancel_token)
+        finally:
+            document.close()
+
+    def open_document(self, pdf_path, **options):
+        """打开PDF文档供多次提取使用"""
+        self.start()
+        return PlumberDocument(self, pdf_path, **options)
+
+class PlumberDocument:
+    """
+    保持打开状态的PDF文档，逐页提取，结果带页码
+
+    - options: password（PDF密码）、table_settings（pdfplumber表格设置，覆盖提取方式）、
+      method（提取方式，见 extraction_methods；guess按有无框线选择，不打分重试）、
+      area和columns（与tabula的参数含义相同，来自版式模板：只在区域内提取，stream方式按给定位置分列）
+    """
+
+    page_aware = True
+
+    def __init__(self, backend, pdf_path, **options):
+        import pdfplumber
+
+        self.backend = backend
+        self.pdf_path = os.fspath(pdf_path)
+        self.method = options.pop("method", None) or METHOD_GUESS
+        self.options = options
+        # 缓存键中区分提取器和提取方式，与tabula的结果互不混用
+        self.extractor = f"pdfplumber {pdfplumber.__version__} {self.method}"
+        self.method_counts = Counter()
+        self._pdf = pdfplumber.open(self.pdf_path, password=options.get("password"))
+        self._lock = threading.Lock()
+
+    @property
+    def page_count(self):
+        return len(self._pdf.pages)
+
+    def extract(self, pages, cancel_token=None):
+        """
+        提取指定页码列表中的表格，返回DataFrame列表
+
+        每页开始前检查cancel_token，取消后抛出ExtractionCancelled
+        """
+        table_settings = self.options.get("table_settings")
+        tables = []
+        # pdfminer的解析状态不是线程安全的，同一文档的提取串行执行
+        with self._lock:
+            for page_number in pages:
+                if cancel_requested(cancel_token):
+                    raise ExtractionCancelled()
+                with span("parse_page", page=page_number):
+                    page = self._pdf.pages[page_number - 1]
+                    try:
+                        raw_json = self._extract_page(page, table_settings)
+                    finally:
+                        page.close()  # 释放本页解析出的字符和线条，内存不随页数增长
+                with span("build_dataframes"):
+                    for table in tables_from_json(raw_json):
+                        table.attrs["page"] = page_number
+                        tables.append(table)
+        return tables
+
+    def _extract_page(self, page, table_settings):
+        if self.options.get("area"):
+            page = crop_to_area(page, self.options["area"])
+        if table_settings is not None:
+            return [table_json(table) for table in page.find_tables(table_settings)]
+        if self.method == METHOD_AUTO:
+            raw_json, method, retried = choose_page_tables(lambda method: page_json(page, method), len(page.edges))
+            self.method_counts["retried"] += retried
+        else:
+            method = self.method
+            if method == METHOD_GUESS:
+                method = METHOD_LATTICE if page.edges else METHOD_STREAM
+            raw_json = page_json(page, method, self.options.get("columns"))
+        self.method_counts[method] += 1
+        return raw_json
+
+    def close(self):
+        with self._lock:
+            if self._pdf is not None:
+                self._pdf.close()
+                self._pdf = None
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 界面的进度通道
+转换线程把进度和日志推入通道，界面线程按固定帧率取出后统一刷新：
+同一任务在一帧之内的多次进度只保留最新的一条，不再为每次回调各排一个 root.after 事件；
+待显示的日志行有上限（界面来不及取时丢弃最旧的行，只计数），
+开启完整日志时每一行（包括被合并的中间进度）都按原样写入磁盘文件
+
+本模块不依赖tkinter，状态区的行数上限由界面按 STATUS_LOG_LINES 裁剪
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import deque
+
+# 界面取出通道的间隔（毫秒），约10帧/秒
+FRAME_INTERVAL_MS = 100
+# 状态区最多保留的行数，超出时删除最旧的行
+STATUS_LOG_LINES = 1000
+
+def default_log_dir():
+    """获取各平台保存完整日志的默认目录（与提取缓存同一位置下的logs）"""
+    if sys.platform == 'win32':
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "pdf2excel", "logs")
+    elif sys.platform == 'darwin':
+        return os.path.join(os.path.expanduser("~"), "Library", "Logs", "pdf2excel")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pdf2excel", "logs")
+
+class ProgressChannel:
+    """
+    转换线程与界面线程之间的进度通道（线程安全）
+
+    set_status(key, text): 任务的最新状态行，同一key在取出前只保留最后一次
+    log(lines): 追加日志行，待显示的行最多保留 capacity 行
+    drain(): 界面线程调用，返回 (日志行, 丢弃的行数)；状态行排在日志行之后
+    """
+
+    def __init__(self, capacity=STATUS_LOG_LINES):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._lines = deque(maxlen=capacity)
+        self._statuses = {}
+        self._dropped = 0
+        self._log_file = None
+        self.log_path = None
+
+    def set_status(self, key, text):
+        with self._lock:
+            self._write_full_log([text])
+            self._statuses.pop(key, None)  # 重新插入，按最近更新的顺序显示
+            self._statuses[key] = text
+
+    def log(self, lines):
+        with self._lock:
+            self._write_full_log(lines)
+            self._dropped += max(0, len(self._lines) + len(lines) - self.capacity)
+            self._lines.extend(lines)
+
+    def drain(self):
+        with self._lock:
+            lines = list(self._lines) + list(self._statuses.values())
+            dropped = self._dropped
+            self._lines.clear()
+            self._statuses.clear()
+            self._dropped = 0
+            if self._log_file is not None:
+                try:
+                    self._log_file.flush()
+                except OSError as e:
+                    self._close_log_locked()
+                    lines.append(f"完整日志写入失败，已停止: {str(e)}")
+        return lines, dropped
+
+    # ---- 完整日志 ----
+
+    def open_log(self, log_dir=None):
+        """开始把所有行写入磁盘（每次打开一个带时间戳的新文件），返回文件路径"""
+        log_dir = log_dir or default_log_dir()
+        os.makedirs(log_dir, exist_ok=True)
+        path = os.path.join(log_dir, time.strftime("pdf2excel-%Y%m%d-%H%M%S.log"))
+        with self._lock:
+            self._close_log_locked()
+            self._log_file = open(path, 'a', encoding='utf-8')
+            self.log_path = path
+        return path
+
+    def close_log(self):
+        with self._lock:
+            self._close_log_locked()
+
+    def _close_log_locked(self):
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+            self.log_path = None
+
+    def _write_full_log(self, lines):
+        if self._log_file is None:
+            return
+        stamp = time.strftime("%H:%M:%S")
+        try:
+            for line in lines:
+                self._log_file.write(f"{stamp} {line}\n")
+        except OSError as e:
+            # 磁盘写满等错误不影响转换，停止写入完整日志
+            self._close_log_locked()
+            self._lines.append(f"完整日志写入失败，已停止: {str(e)}")
@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 转换服务的负载测试
+以固定并发向本机的转换服务（见 conversion_service）提交PDF，长轮询到任务结束后下载结果，
+统计每个任务的端到端延迟（提交到下载完成）分位数、吞吐量、被拒绝（503）和失败的请求
+
+不给出PDF时用 synthetic_pdf 生成固定种子的合成文件；--spawn 在子进程中启动一个服务，测试结束后关闭
+
+示例:
+    python service_load_test.py --spawn --requests 20 --concurrency 4
+    python service_load_test.py --url http://127.0.0.1:8765 --requests 50 --concurrency 8 report.pdf
+    python service_load_test.py --spawn --service-args "--engine process --workers 2" -o load.json
+"""
+
+import os
+import sys
+import json
+import time
+import shlex
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import statistics
+import urllib.error
+import urllib.request
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+
+from synthetic_pdf import PAGE_RULED, PAGE_UNRULED, PAGE_LEDGER, write_pdf
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+# 没有给出PDF时生成的合成文件（页数, 页面类型）
+SYNTHETIC_DOCUMENTS = ((5, (PAGE_RULED,)), (10, (PAGE_UNRULED, PAGE_RULED)), (20, (PAGE_LEDGER,)))
+# 被拒绝（503）后按Retry-After重试的最多次数
+MAX_SUBMIT_RETRIES = 10
+POLL_TIMEOUT = 30
+REQUEST_TIMEOUT = 120
+
+def _request(method, url, data=None, headers=None, timeout=REQUEST_TIMEOUT):
+    """发送请求，返回 (状态码, 响应头, 响应体)；HTTP错误也作为普通响应返回"""
+    request = urllib.request.Request(url, data=data, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+def run_one(base_url, pdf_path, options, headers, stats):
+    """提交一个PDF并等到结果下载完成，返回 {ok, seconds, status, rejected, bytes, message}"""
+    with open(pdf_path, 'rb') as pdf_file:
+        body = pdf_file.read()
+    query = "&".join(f"{key}={quote(str(value))}" for key, value in options.items())
+    submit_url = f"{base_url}/jobs?filename={quote(os.path.basename(pdf_path))}" + (f"&{query}" if query else "")
+    start_time = time.perf_counter()
+    rejected = 0
+    while True:
+        status, response_headers, payload = _request("POST", submit_url, body,
+                                                     dict(headers, **{"Content-Type": "application/pdf"}))
+        if status != 503 or rejected >= MAX_SUBMIT_RETRIES:
+            break
+        rejected += 1
+        with stats["lock"]:
+            stats["rejected"] += 1
+        time.sleep(float(response_headers.get("Retry-After") or 1))
+    if status != 202:
+        return {"ok": False, "seconds": None, "status": None, "rejected": rejected,
+                "message": f"提交失败 HTTP {status}: {payload[:200].decode('utf-8', errors='replace')}"}
+
+    job = json.loads(payload)
+    job_url = f"{base_url}/jobs/{job['id']}"
+    while job["status"] in ("queued", "running"):
+        status, _, payload = _request("GET", f"{job_url}?wait={job['version']}&timeout={POLL_TIMEOUT}",
+                                      headers=headers, timeout=POLL_TIMEOUT + 10)
+        if status != 200:
+            return {"ok": False, "seconds": None, "status": None, "rejected": rejected,
+                    "message": f"查询失败 HTTP {status}"}
+        job = json.loads(payload)
+
+    size = 0
+    if job["status"] == "done":
+        status, _, payload = _request("GET", f"{job_url}/result", headers=headers)
+        if status != 200:
+            return {"ok": False, "seconds": None, "status": job["status"], "rejected": rejected,
+                    "message": f"下载失败 HTTP {status}"}
+        size = len(payload)
+    seconds = time.perf_counter() - start_time
+    _request("DELETE", job_url, headers=headers)
+    return {"ok": job["status"] == "done", "seconds": seconds, "status": job["status"], "rejected": rejected,
+            "bytes": size, "tables": job["tables"], "message": job["message"]}
+
+def percentile(values, fraction):
+    """最近秩法的分位数"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+def run_load_test(base_url, pdf_paths, requests_count, concurrency, options=None, token=None, progress=print):
+    """
+    以concurrency个并发客户端提交requests_count个任务（PDF按顺序循环使用）
+
+    返回结果字典（可直接写入JSON）
+    """
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    stats = {"rejected": 0, "lock": threading.Lock()}
+    results = []
+
+    def client(idx):
+        pdf_path = pdf_paths[idx % len(pdf_paths)]
+        try:
+            result = run_one(base_url, pdf_path, options or {}, headers, stats)
+        except Exception as e:
+            result = {"ok": False, "seconds": None, "status": None, "rejected": 0, "message": str(e)}
+        result["file"] = os.path.basename(pdf_path)
+        with stats["lock"]:
+            results.append(result)
+            done = len(results)
+        latency = f"{result['seconds']:.2f}秒" if result["ok"] else f"失败: {result['message']}"
+        progress(f"[{done}/{requests_count}] {result['file']}: {latency}")
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        list(clients.map(client, range(requests_count)))
+    elapsed = time.perf_counter() - start_time
+
+    latencies = [result["seconds"] for result in results if result["ok"]]
+    return {
+        "url": base_url,
+        "requests": requests_count,
+        "concurrency": concurrency,
+        "options": options or {},
+        "seconds": round(elapsed, 3),
+        "succeeded": len(latencies),
+        "failed": len(results) - len(latencies),
+        "rejected": stats["rejected"],
+        "throughput_per_minute": round(len(latencies) / elapsed * 60, 2) if elapsed > 0 else None,
+        "latency": {
+            "min": min(latencies) if latencies else None,
+            "mean": statistics.mean(latencies) if latencies else None,
+            "p50": percentile(latencies, 0.50),
+            "p90": percentile(latencies, 0.90),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies) if latencies else None,
+        },
+        "errors": sorted({result["message"] for result in results if not result["ok"]}),
+    }
+
+def print_report(report):
+    print(f"\n{report['requests']}个请求，并发{report['concurrency']}，用时{report['seconds']:.1f}秒")
+    print(f"成功 {report['succeeded']}，失败 {report['failed']}，被拒绝（503）{report['rejected']}次，"
+          f"吞吐量 {report['throughput_per_minute'] or 0:.1f} 个/分钟")
+    latency = report["latency"]
+    if latency["p50"] is not None:
+        print("延迟（秒）: " + "  ".join(f"{name} {latency[name]:.2f}"
+                                        for name in ("min", "mean", "p50", "p90", "p99", "max")))
+    for message in report["errors"]:
+        print(f"  错误: {message}")
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def spawn_service(service_args, token=None, timeout=120):
+    """在子进程中启动转换服务，等到 /health 可以访问，返回 (子进程, 地址)"""
+    port = _free_port()
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "conversion_service.py"),
+               "--port", str(port), "--quiet"] + service_args
+    if token:
+        command += ["--token", token]
+    child = subprocess.Popen(command, stdin=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if child.poll() is not None:
+            raise RuntimeError(f"转换服务启动失败（退出码 {child.returncode}）")
+        try:
+            if _request("GET", f"{base_url}/health", headers=headers, timeout=2)[0] == 200:
+                return child, base_url
+        except OSError:
+            pass
+        time.sleep(0.2)
+    child.terminate()
+    raise RuntimeError("等待转换服务启动超时")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="转换服务的负载测试")
+    parser.add_argument("pdfs", nargs="*", help="提交的PDF（按顺序循环使用，默认生成合成PDF）")
+    parser.add_argument("--url", default=DEFAULT_URL, help=f"服务地址（默认{DEFAULT_URL}）")
+    parser.add_argument("--spawn", action="store_true", help="在子进程中启动一个服务进行测试，结束后关闭")
+    parser.add_argument("--service-args", default="", help="--spawn 时传给conversion_service.py的参数")
+    parser.add_argument("-n", "--requests", type=int, default=20, help="提交的任务数（默认20）")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="并发客户端数（默认4）")
+    parser.add_argument("--format", default=None, help="输出格式（默认使用服务的默认值xlsx）")
+    parser.add_argument("--backend", default=None, help="提取后端（默认使用服务的设置）")
+    parser.add_argument("--job-workers", type=int, default=None, help="每个任务的并行数")
+    parser.add_argument("--token", default=os.environ.get("PDF2EXCEL_SERVICE_TOKEN"), help="访问令牌")
+    parser.add_argument("-o", "--output", default=None, help="把结果写入JSON文件")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    options = {key: value for key, value in (("format", args.format), ("backend", args.backend),
+                                             ("workers", args.job_workers)) if value is not None}
+    with tempfile.TemporaryDirectory() as work_dir:
+        pdf_paths = [os.path.abspath(path) for path in args.pdfs]
+        if not pdf_paths:
+            for page_count, kinds in SYNTHETIC_DOCUMENTS:
+                path = os.path.join(work_dir, f"synthetic_{page_count}.pdf")
+                write_pdf(path, page_count, kinds)
+                pdf_paths.append(path)
+
+        child = None
+        base_url = args.url.rstrip("/")
+        if args.spawn:
+            child, base_url = spawn_service(shlex.split(args.service_args), args.token)
+        try:
+            report = run_load_test(base_url, pdf_paths, args.requests, max(1, args.concurrency), options, args.token)
+        finally:
+            if child is not None:
+                child.terminate()
+                child.wait()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(report, output_file, ensure_ascii=False, indent=2)
+        print(f"结果已写入 {args.output}")
+    return 0 if report["failed"] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 合成PDF语料生成器
+按固定的随机种子生成基准测试用的PDF，同样的参数每次生成的文件逐字节相同，
+不同机器、不同时间的测试结果可以直接比较；只使用标准库（zlib压缩内容流），不需要reportlab等依赖
+
+页面类型:
+- ruled: 有完整框线的表格（lattice）
+- unruled: 同样的表格但没有任何框线，只靠文本列对齐（stream）
+- prose: 只有正文段落，没有表格
+- ledger: 跨页的流水账，每页重复表头、只有横线，余额逐页连续（用于测试跨页拼接）
+
+示例:
+    python synthetic_pdf.py corpus/                 # 生成默认语料
+    python synthetic_pdf.py corpus/ --max-pages 1000 # 跳过超过1000页的文档
+"""
+
+import os
+import sys
+import zlib
+import random
+import hashlib
+import argparse
+
+# 页面类型
+PAGE_RULED = "ruled"
+PAGE_UNRULED = "unruled"
+PAGE_PROSE = "prose"
+PAGE_LEDGER = "ledger"
+PAGE_KINDS = (PAGE_RULED, PAGE_UNRULED, PAGE_PROSE, PAGE_LEDGER)
+
+# 默认语料：(文档名, 页数, 页面类型的循环顺序)
+DEFAULT_CORPUS = (
+    ("ruled_10", 10, (PAGE_RULED,)),
+    ("mixed_100", 100, (PAGE_RULED, PAGE_UNRULED, PAGE_PROSE)),
+    ("ledger_1000", 1000, (PAGE_LEDGER,)),
+    ("mixed_10000", 10000, (PAGE_RULED, PAGE_UNRULED, PAGE_PROSE, PAGE_LEDGER)),
+)
+DEFAULT_SEED = 20240101
+
+# A4页面（点）
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 50
+FONT_SIZE = 8
+ROW_HEIGHT = 16
+
+# 报表表格的列：(表头, 列宽)
+TABLE_COLUMNS = (("Date", 62), ("Account", 58), ("Description", 160), ("Debit", 75), ("Credit", 75), ("Ref", 65))
+LEDGER_COLUMNS = (("Date", 62), ("Voucher", 58), ("Memo", 185), ("Amount", 90), ("Balance", 100))
+
+_WORDS = ("account", "balance", "invoice", "payment", "transfer", "supplier", "customer", "deposit", "interest",
+          "charge", "monthly", "service", "office", "travel", "salary", "refund", "adjustment", "quarterly",
+          "the", "of", "and", "for", "with", "to", "from", "under", "report", "period", "ledger", "entry")
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def _text(x, y, text, size=FONT_SIZE, font="F1"):
+    return f"BT /{font} {size} Tf {x:.1f} {y:.1f} Td ({_escape(text)}) Tj ET"
+
+def _char_width(char):
+    """Helvetica的近似字宽（em）：数字0.556，逗号句点0.278，负号0.333，大写字母约0.667，小写字母约0.5"""
+    if char.isdigit():
+        return 0.556
+    if char in ",.":
+        return 0.278
+    if char == "-":
+        return 0.333
+    return 0.667 if char.isupper() else 0.5
+
+def _right_text(right, y, text, size=FONT_SIZE):
+    width = sum(_char_width(char) for char in text) * size
+    return _text(right - width, y, text, size)
+
+def _line(x1, y1, x2, y2):
+    return f"{x1:.1f} {y1:.1f} m {x2:.1f} {y2:.1f} l S"
+
+def _amount(rng, low=10, high=99999):
+    return f"{rng.uniform(low, high):,.2f}"
+
+def _description(rng, words):
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize()
+
+def _date(rng):
+    return f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+def _title(page_number, title):
+    return _text(MARGIN, PAGE_HEIGHT - MARGIN, f"{title} - page {page_number}", size=12, font="F2")
+
+def table_page(rng, page_number, ruled=True):
+    """一页报表表格（ruled有完整框线，unruled没有任何线条），返回内容流的各行"""
+    ops = [_title(page_number, "Synthetic statement"), "0.5 w"]
+    row_count = rng.randint(25, 40)
+    top = PAGE_HEIGHT - MARGIN - 30
+    lefts = [MARGIN]
+    for _, width in TABLE_COLUMNS:
+        lefts.append(lefts[-1] + width)
+    rows = [[name for name, _ in TABLE_COLUMNS]]
+    for _ in range(row_count):
+        debit = rng.random() < 0.5
+        rows.append([_date(rng), f"{rng.randint(1000, 9999)}", _description(rng, rng.randint(2, 4)),
+                     _amount(rng) if debit else "", "" if debit else _amount(rng), f"R{rng.randint(10000, 99999)}"])
+    for idx, row in enumerate(rows):
+        baseline = top - (idx + 1) * ROW_HEIGHT + 5
+        for col, value in enumerate(row):
+            if not value:
+                continue
+            if col in (3, 4):  # 金额列（含表头）右对齐
+                ops.append(_right_text(lefts[col + 1] - 4, baseline, value))
+            else:
+                ops.append(_text(lefts[col] + 4, baseline, value))
+    if ruled:
+        bottom = top - len(rows) * ROW_HEIGHT
+        for idx in range(len(rows) + 1):
+            ops.append(_line(lefts[0], top - idx * ROW_HEIGHT, lefts[-1], top - idx * ROW_HEIGHT))
+        for x in lefts:
+            ops.append(_line(x, top, x, bottom))
+    return ops
+
+def prose_page(rng, page_number):
+    """一页正文段落"""
+    ops = [_title(page_number, "Synthetic notes")]
+    y = PAGE_HEIGHT - MARGIN - 30
+    while y > MARGIN + 40:
+        for _ in range(rng.randint(4, 9)):
+            ops.append(_text(MARGIN, y, " ".join(rng.choice(_WORDS) for _ in range(16))))
+            y -= 12
+        y -= 12
+    return ops
+
+def ledger_page(rng, page_number, state):
+    """流水账的一页：每页重复表头，只有表头上下和表格底部的横线；state["balance"] 跨页延续"""
+    ops = [_title(page_number, "Synthetic general ledger"), "0.5 w"]
+    top = PAGE_HEIGHT - MARGIN - 30
+    lefts = [MARGIN]
+    for _, width in LEDGER_COLUMNS:
+        lefts.append(lefts[-1] + width)
+    rows = [[name for name, _ in LEDGER_COLUMNS]]
+    for _ in range(42):
+        amount = round(rng.uniform(-5000, 5000), 2)
+        state["balance"] += amount
+        state["voucher"] += 1
+        rows.append([_date(rng), f"V{state['voucher']:06d}", _description(rng, 3),
+                     f"{amount:,.2f}", f"{state['balance']:,.2f}"])
+    for idx, row in enumerate(rows):
+        baseline = top - (idx + 1) * ROW_HEIGHT + 5
+        for col, value in enumerate(row):
+            if col >= 3:
+                ops.append(_right_text(lefts[col + 1] - 4, baseline, value))
+            else:
+                ops.append(_text(lefts[col] + 4, baseline, value))
+    for y in (top, top - ROW_HEIGHT, top - len(rows) * ROW_HEIGHT):
+        ops.append(_line(lefts[0], y, lefts[-1], y))
+    return ops
+
+def _page_ops(kind, rng, page_number, ledger_state):
+    if kind == PAGE_RULED:
+        return table_page(rng, page_number, ruled=True)
+    if kind == PAGE_UNRULED:
+        return table_page(rng, page_number, ruled=False)
+    if kind == PAGE_PROSE:
+        return prose_page(rng, page_number)
+    if kind == PAGE_LEDGER:
+        return ledger_page(rng, page_number, ledger_state)
+    raise ValueError(f"未知的页面类型: {kind}")
+
+def write_pdf(output_path, page_count, kinds, seed=DEFAULT_SEED):
+    """
+    生成page_count页的PDF，页面类型按kinds循环；返回文件的SHA-256
+
+    不写入创建时间等元数据，同样的参数生成的文件逐字节相同
+    """
+    rng = random.Random(f"{seed}:{page_count}:{','.join(kinds)}")
+    ledger_state = {"balance": 10000.0, "voucher": 0}
+    # 对象编号：1 目录，2 页面树，3/4 字体，之后每页两个对象（页面、内容流）
+    first_page_object = 5
+    page_refs = " ".join(f"{first_page_object + 2 * idx} 0 R" for idx in range(page_count))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{page_refs}] /Count {page_count} >>".encode("ascii"),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+
+    digest = hashlib.sha256()
+    offsets = []
+    with open(output_path, 'wb') as pdf_file:
+        def write(data):
+            pdf_file.write(data)
+            digest.update(data)
+
+        position = 0
+        header = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+        write(header)
+        position += len(header)
+
+        def write_object(number, body):
+            nonlocal position
+            offsets.append(position)
+            data = f"{number} 0 obj\n".encode("ascii") + body + b"\nendobj\n"
+            write(data)
+            position += len(data)
+
+        for number, body in enumerate(objects, start=1):
+            write_object(number, body)
+        for idx in range(page_count):
+            kind = kinds[idx % len(kinds)]
+            content = zlib.compress("\n".join(_page_ops(kind, rng, idx + 1, ledger_state)).encode("latin-1"), 6)
+            page_object = first_page_object + 2 * idx
+            write_object(page_object, (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {page_object + 1} 0 R >>"
+            ).encode("ascii"))
+            write_object(page_object + 1, f"<< /Length {len(content)} /Filter /FlateDecode >>\nstream\n".encode("ascii")
+                         + content + b"\nendstream")
+
+        xref = [f"xref\n0 {len(offsets) + 1}\n", "0000000000 65535 f \n"]
+        xref.extend(f"{offset:010d} 00000 n \n" for offset in offsets)
+        xref.append(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{position}\n%%EOF\n")
+        write("".join(xref).encode("ascii"))
+    return digest.hexdigest()
+
+def generate_corpus(corpus_dir, corpus=DEFAULT_CORPUS, max_pages=None, seed=DEFAULT_SEED):
+    """
+    生成语料到corpus_dir（已有的同名文件被替换），max_pages 给出时跳过页数更多的文档
+
+    返回 {文档名: {"path", "pages", "kinds", "sha256"}}
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    manifest = {}
+    for name, page_count, kinds in corpus:
+        if max_pages is not None and page_count > max_pages:
+            continue
+        path = os.path.join(corpus_dir, f"{name}.pdf")
+        tmp_path = f"{path}.tmp"
+        sha256 = write_pdf(tmp_path, page_count, kinds, seed)
+        os.replace(tmp_path, path)
+        manifest[name] = {"path": path, "pages": page_count, "kinds": list(kinds), "sha256": sha256}
+    return manifest
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成基准测试用的合成PDF语料")
+    parser.add_argument("corpus_dir", help="输出目录")
+    parser.add_argument("--max-pages", type=int, default=None, help="跳过页数超过此值的文档")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help=f"随机种子（默认{DEFAULT_SEED}）")
+    args = parser.parse_args(argv)
+    for name, info in generate_corpus(args.corpus_dir, max_pages=args.max_pages, seed=args.seed).items():
+        print(f"{name}: {info['pages']}页 {info['sha256'][:12]} {info['path']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
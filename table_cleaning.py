@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 表格清洗
+tabula返回的单元格几乎都是字符串，这里按列从样本推断类型，
+把千分位数字、百分比、金额、括号负数等批量转换为数值（Excel中按数字处理），
+只对重复值多的文本列使用类别类型
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# 推断列类型时抽样的非空单元格数
+SAMPLE_SIZE = 100
+# 行数少于此值的列不转换为类别类型（节省的内存不抵类别表的开销）
+MIN_CATEGORY_ROWS = 50
+# 唯一值占比低于此值时转换为类别类型
+MAX_CATEGORY_RATIO = 0.5
+# 单元格中可以出现的货币符号
+CURRENCY_CHARS = "$¥€£￥"
+# float64和Excel都只能精确保存15位有效数字，更长的数字串（身份证号、银行账号）保留为文本
+MAX_SIGNIFICANT_DIGITS = 15
+
+# 整数部分为0、无前导零的整数或带千分位的整数（0123这类编号保留为文本，否则Excel会丢掉前导零）
+_NUMBER_RE = r"[-+]?(?:(?:0|[1-9]\d{0,2}(?:,\d{3})+|[1-9]\d*)(?:\.\d+)?|\.\d+)"
+# 完整单元格：可选的会计括号、货币符号和百分号
+_CELL_RE = rf"\(?\s*[{re.escape(CURRENCY_CHARS)}]?\s*{_NUMBER_RE}\s*%?\s*\)?"
+# 校验通过后去掉这些字符即可直接转换为浮点数
+_STRIP_RE = rf"[(),%\s{re.escape(CURRENCY_CHARS)}]"
+
+def parse_numeric(values):
+    """
+    把一列字符串解析为数值Series（向量化）
+
+    values 为不含缺失值的字符串Series。任一单元格不是数字、或有效数字超过 MAX_SIGNIFICANT_DIGITS 位时返回None；
+    同一列中百分比与普通数字混用时也返回None。
+    百分比列除以100，并返回 (数值Series, 是否百分比列)
+    """
+    text = values.astype(str).str.strip()
+    if not text.str.fullmatch(_CELL_RE).all():
+        return None
+    negative = text.str.startswith("(")  # 会计格式的负数 (1,234.00)
+    if not negative.equals(text.str.endswith(")")):
+        return None  # 括号不成对
+    percent = text.str.contains("%", regex=False)
+    if percent.any() and not percent.all():
+        return None
+
+    stripped = text.str.replace(_STRIP_RE, "", regex=True)
+    # 转换为浮点数会舍入超长的数字串，整列保留为文本
+    digits = stripped.str.lstrip("+-").str.replace(".", "", regex=False).str.lstrip("0").str.len()
+    if (digits > MAX_SIGNIFICANT_DIGITS).any():
+        return None
+
+    # 已按格式校验，astype比to_numeric快得多
+    numbers = stripped.astype("float64")
+    numbers = numbers.where(~negative, -numbers)
+    is_percent = bool(percent.all())
+    if is_percent:
+        numbers = numbers / 100
+    return numbers, is_percent
+
+def sample_values(values, size=SAMPLE_SIZE):
+    """在整列上等间隔抽样（结果确定，可复现）"""
+    if len(values) <= size:
+        return values
+    return values.iloc[::len(values) // size]
+
+def downcast_numeric(numbers):
+    """无损地缩小数值类型：整数按范围缩小，浮点数只在float32能精确表示时缩小"""
+    if pd.api.types.is_integer_dtype(numbers):
+        return pd.to_numeric(numbers, downcast="integer")
+    if numbers.notna().all() and np.all(np.mod(numbers.to_numpy(), 1) == 0):
+        return pd.to_numeric(numbers.astype("int64"), downcast="integer")
+    narrowed = numbers.astype("float32")
+    if np.array_equal(narrowed.to_numpy(dtype="float64"), numbers.to_numpy(), equal_nan=True):
+        return narrowed
+    return numbers
+
+def convert_text_column(column):
+    """
+    转换一个文本列，返回 (新列, 是否百分比列)；无法或不值得转换时返回 (None, False)
+
+    先用样本判断，样本不像数字的列不再解析整列
+    """
+    mask = column.notna()
+    complete = bool(mask.all())
+    present = column if complete else column[mask]
+    if present.empty:
+        return None, False
+    if parse_numeric(sample_values(present)) is None:
+        parsed = None
+    else:
+        parsed = parse_numeric(present)
+    if parsed is not None:
+        numbers, is_percent = parsed
+        if complete:
+            return downcast_numeric(numbers), is_percent
+        converted = pd.Series(np.nan, index=column.index, dtype="float64")
+        converted[mask] = numbers.to_numpy(dtype="float64")
+        return downcast_numeric(converted), is_percent
+
+    # 类别类型只在行数足够且重复值多时才更省内存；先用样本估计，唯一值多的列不做全列计数
+    if len(column) < MIN_CATEGORY_ROWS:
+        return None, False
+    sample = sample_values(present)
+    if sample.nunique() >= len(sample) * MAX_CATEGORY_RATIO:
+        return None, False
+    if present.nunique() < len(column) * MAX_CATEGORY_RATIO:
+        return column.astype("category"), False
+    return None, False
+
+def coerce_row(cells, df):
+    """
+    按df各列清洗后的类型转换一行单元格（续表被tabula当成表头的首行数据）
+
+    数值列中能解析的单元格转换为数值，其余保持原样
+    """
+    percent_columns = set(df.attrs.get("percent_columns", ()))
+    row = []
+    for cell, col, dtype in zip(cells, df.columns, df.dtypes):
+        if cell is not None and pd.api.types.is_numeric_dtype(dtype):
+            parsed = parse_numeric(pd.Series([cell]))
+            # 百分比列只接受百分比，避免普通数字按百分比格式显示
+            if parsed is not None and parsed[1] == (col in percent_columns):
+                cell = parsed[0].iloc[0].item()
+                if pd.api.types.is_integer_dtype(dtype) and float(cell).is_integer():
+                    cell = int(cell)
+        row.append(cell)
+    return row
+
+def is_text_dtype(dtype):
+    """object列或pandas字符串列（pandas 3默认的字符串类型）"""
+    return dtype == object or isinstance(dtype, pd.StringDtype)
+
+def optimize_dataframe(df):
+    """
+    清洗并优化DataFrame：数字文本转换为数值，重复值多的文本列转换为类别类型，数值列无损缩小类型
+
+    百分比列的列名记录在 df.attrs["percent_columns"]，写入Excel时使用百分比格式
+    """
+    percent_columns = []
+    for position, col in enumerate(df.columns):
+        column = df.iloc[:, position]
+        if is_text_dtype(column.dtype):
+            converted, is_percent = convert_text_column(column)
+            if is_percent:
+                percent_columns.append(col)
+        elif pd.api.types.is_float_dtype(column) or pd.api.types.is_integer_dtype(column):
+            converted = downcast_numeric(column)
+        else:
+            continue
+        if converted is not None:
+            # 按位置赋值，重复列名也不会互相覆盖
+            df.isetitem(position, converted)
+    if percent_columns:
+        df.attrs["percent_columns"] = percent_columns
+    return df
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 跨页表格拼接
+按页序逐个判断表格是否是上一页最后一个表格的续表：
+列数相同且表头相同（每页重复表头），或列的x坐标一致（续页没有表头，tabula把首行数据当成了表头）。
+只记住上一个表格的版式，不缓存任何表格数据，拼接在写入时流式完成
+"""
+
+# 续表的判断结果
+STITCH_NEW = None                   # 新表格
+STITCH_REPEATED_HEADER = "header"   # 续表，重复的表头丢弃
+STITCH_HEADERLESS = "headerless"    # 续表，首行是数据，写入时作为数据行保留
+
+# 列x坐标允许的偏差（点）；同一版式下有框线和无框线的页识别出的列起点相差约6点
+COLUMN_TOLERANCE = 10.0
+
+class TableStitcher:
+    """按写入顺序判断跨页续表"""
+
+    def __init__(self, tolerance=COLUMN_TOLERANCE):
+        self.tolerance = tolerance
+        self._last = None  # 上一个表格的 (页码, 表头, 列x坐标)
+
+    def _same_layout(self, lefts, last_lefts):
+        if not lefts or not last_lefts or len(lefts) != len(last_lefts):
+            return False
+        compared = [(left, last_left) for left, last_left in zip(lefts, last_lefts)
+                    if left is not None and last_left is not None]
+        return bool(compared) and all(abs(left - last_left) <= self.tolerance for left, last_left in compared)
+
+    def classify(self, df):
+        """
+        判断df是否接续上一个表格，返回 STITCH_NEW、STITCH_REPEATED_HEADER 或 STITCH_HEADERLESS
+
+        只有紧接着出现在下一页的第一个表格才可能是续表；没有页码信息的表格（subprocess模式的多页提取）从不拼接，
+        也不能作为续表的上一段
+        """
+        page = df.attrs.get("page")
+        header = tuple(df.columns)
+        lefts = df.attrs.get("column_lefts")
+        last = self._last
+        result = STITCH_NEW
+        if (page is not None and last is not None and last[0] is not None and page == last[0] + 1
+                and len(header) == len(last[1])):
+            if header == last[1]:
+                result = STITCH_REPEATED_HEADER
+            elif self._same_layout(lefts, last[2]):
+                result = STITCH_HEADERLESS
+
+        if result is STITCH_NEW:
+            self._last = (page, header, lefts)
+        else:
+            # 续表沿用第一段的表头，后续片段与之比较
+            self._last = (page, last[1], lefts or last[2])
+        return result
@@ -0,0 +1,362 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - 表格输出
+整个转换过程中由一个写入器独占输出文件，逐个工作表流式写出，
+写入时间与表格数量成线性关系，内存占用不随工作簿增长。
+所有写入器提供相同的接口：write_table(df, 表名) 开始新表格，append_table(df, header_row) 接续当前表格，close()
+"""
+
+import io
+import csv
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from output_formats import (OUTPUT_XLSX_LONG, OUTPUT_CSV, OUTPUT_CSV_ZIP, OUTPUT_PARQUET, OUTPUT_ARROW,
+                            format_from_path, csv_table_path)
+
+try:
+    import xlsxwriter
+except ImportError:  # 未安装xlsxwriter时使用openpyxl的write_only模式
+    xlsxwriter = None
+
+# Excel工作表名称最大31字符
+MAX_SHEET_NAME_LENGTH = 31
+# Excel工作表的最大行数
+MAX_SHEET_ROWS = 1048576
+# 百分比列（见 table_cleaning.optimize_dataframe）的数字格式
+PERCENT_FORMAT = "0.00%"
+
+# 长表的列：来源表格序号、页码、表格内行号（从1开始，不含表头）、列名、单元格值
+LONG_COLUMNS = ["table", "page", "row", "column", "value"]
+
+def table_rows(df):
+    """将DataFrame转换为逐行的Python值列表，缺失值转换为None（空单元格）"""
+    values = df.to_numpy(dtype=object)
+    values[pd.isna(values)] = None
+    return values.tolist()
+
+def row_frame(row, df):
+    """把一行单元格（续表被当成表头的首行）包装成与df同列的单行DataFrame"""
+    frame = pd.DataFrame([row], columns=df.columns)
+    frame.attrs.update(df.attrs)
+    return frame
+
+def long_cells(df, first_row=1):
+    """
+    把表格展开为长表的单元格（向量化），空单元格不输出
+
+    返回 (行号数组, 列名数组, 数值数组, 文本数组, 百分比标记数组)：数值列的单元格在数值数组中，
+    文本数组对应位置为None；文本列反之，数值数组对应位置为NaN
+    """
+    row_count, column_count = df.shape
+    values = df.to_numpy(dtype=object).ravel()
+    present = ~pd.isna(values)
+    numeric = np.array([pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+                        for dtype in df.dtypes], dtype=bool)
+    percent_columns = set(df.attrs.get("percent_columns", ()))
+    percent = np.array([col in percent_columns for col in df.columns], dtype=bool)
+
+    rows = np.repeat(np.arange(first_row, first_row + row_count), column_count)[present]
+    columns = np.tile(np.array([str(col) for col in df.columns], dtype=object), row_count)[present]
+    numeric_cells = np.tile(numeric, row_count)[present]
+    values = values[present]
+    numbers = np.full(len(values), np.nan)
+    numbers[numeric_cells] = values[numeric_cells].astype(float)
+    texts = np.where(numeric_cells, None, values)
+    texts[~numeric_cells] = [str(value) for value in texts[~numeric_cells]]
+    return rows, columns, numbers, texts, np.tile(percent, row_count)[present]
+
+class ExcelTableWriter:
+    """
+    流式Excel写入器
+
+    优先使用xlsxwriter的constant_memory模式，否则使用openpyxl的write_only模式；
+    两种方式都只写一次文件，不会重新读取已写入的工作表
+    """
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.sheet_count = 0
+        self._worksheet = None
+        self._next_row = 0  # 当前工作表下一个空行（从0开始）
+        if xlsxwriter is not None:
+            self.engine = "xlsxwriter"
+            self._workbook = xlsxwriter.Workbook(
+                output_path, {"constant_memory": True, "nan_inf_to_errors": True}
+            )
+            self._percent_format = self._workbook.add_format({"num_format": PERCENT_FORMAT})
+        else:
+            from openpyxl import Workbook
+            self.engine = "openpyxl"
+            self._workbook = Workbook(write_only=True)
+
+    def write_table(self, df, sheet_name):
+        """将一个表格写入新的工作表（含表头）"""
+        sheet_name = sheet_name[:MAX_SHEET_NAME_LENGTH]
+        if self.engine == "xlsxwriter":
+            self._worksheet = self._workbook.add_worksheet(sheet_name)
+        else:
+            self._worksheet = self._workbook.create_sheet(sheet_name)
+        self._next_row = 0
+        self._write_rows([[str(col) for col in df.columns]])
+        self._write_rows(table_rows(df), self._percent_positions(df))
+        self.sheet_count += 1
+
+    def append_table(self, df, header_row=None):
+        """
+        把表格的数据行接在当前工作表末尾（用于跨页续表），header_row 不为None时先作为数据行写入
+
+        当前工作表放不下时不写入并返回False，由调用方另起工作表
+        """
+        row_count = len(df) + (header_row is not None)
+        if self._worksheet is None or self._next_row + row_count > MAX_SHEET_ROWS:
+            return False
+        if header_row is not None:
+            self._write_rows([header_row])
+        self._write_rows(table_rows(df), self._percent_positions(df))
+        return True
+
+    @staticmethod
+    def _percent_positions(df):
+        percent_columns = set(df.attrs.get("percent_columns", ()))
+        return [idx for idx, col in enumerate(df.columns) if col in percent_columns]
+
+    def _write_rows(self, rows, percent_positions=(), percent_rows=None):
+        """
+        在当前工作表的下一个空行开始写入
+
+        percent_positions 中的列使用百分比格式；给出 percent_rows（每行一个布尔值）时只用于标记为True的行
+        """
+        worksheet = self._worksheet
+        if self.engine == "xlsxwriter":
+            for offset, row in enumerate(rows):
+                row_idx = self._next_row + offset
+                worksheet.write_row(row_idx, 0, row)
+                if percent_rows is not None and not percent_rows[offset]:
+                    continue
+                for col_idx in percent_positions:
+                    worksheet.write(row_idx, col_idx, row[col_idx], self._percent_format)
+        else:
+            from openpyxl.cell import WriteOnlyCell
+            from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+            for offset, row in enumerate(rows):
+                # openpyxl不接受XML控制字符
+                values = [
+                    ILLEGAL_CHARACTERS_RE.sub("", value) if isinstance(value, str) else value
+                    for value in row
+                ]
+                if percent_rows is not None and not percent_rows[offset]:
+                    worksheet.append(values)
+                    continue
+                for col_idx in percent_positions:
+                    cell = WriteOnlyCell(worksheet, values[col_idx])
+                    cell.number_format = PERCENT_FORMAT
+                    values[col_idx] = cell
+                worksheet.append(values)
+        self._next_row += len(rows)
+
+    def close(self):
+        """完成写入并关闭文件"""
+        if self._workbook is None:
+            return
+        if self.engine == "xlsxwriter":
+            self._workbook.close()
+        else:
+            self._workbook.save(self.output_path)
+        self._workbook = None
+        self._worksheet = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class LongExcelTableWriter(ExcelTableWriter):
+    """
+    Excel长表写入器：所有表格的单元格写入同一个工作表，每行一个单元格（见 LONG_COLUMNS）
+
+    工作表写满后接着写入 Long_2、Long_3…
+    """
+
+    def __init__(self, output_path):
+        super().__init__(output_path)
+        self._table_index = 0
+        self._table_rows = 0  # 当前表格已写入的数据行数（续表接着编号）
+        self._long_sheets = 0
+
+    def write_table(self, df, sheet_name):
+        self._table_index += 1
+        self._table_rows = 0
+        self._write_long(df)
+        self.sheet_count += 1
+
+    def append_table(self, df, header_row=None):
+        if self._table_index == 0:
+            return False
+        if header_row is not None:
+            self._write_long(row_frame(header_row, df))
+        self._write_long(df)
+        return True
+
+    def _write_long(self, df):
+        rows, columns, numbers, texts, percent = long_cells(df, self._table_rows + 1)
+        self._table_rows += len(df)
+        page = df.attrs.get("page")
+        values = np.where(np.isnan(numbers), texts, numbers)
+        records = [[self._table_index, page, int(row), column, value]
+                   for row, column, value in zip(rows.tolist(), columns.tolist(), values.tolist())]
+        percent_rows = percent.tolist()
+        value_position = [LONG_COLUMNS.index("value")]
+        start = 0
+        while start < len(records):
+            if self._worksheet is None or self._next_row >= MAX_SHEET_ROWS:
+                self._long_sheets += 1
+                name = "Long" if self._long_sheets == 1 else f"Long_{self._long_sheets}"
+                if self.engine == "xlsxwriter":
+                    self._worksheet = self._workbook.add_worksheet(name)
+                else:
+                    self._worksheet = self._workbook.create_sheet(name)
+                self._next_row = 0
+                self._write_rows([LONG_COLUMNS])
+            end = start + MAX_SHEET_ROWS - self._next_row
+            self._write_rows(records[start:end], value_position, percent_rows[start:end])
+            start = end
+
+class CsvTableWriter:
+    """
+    CSV写入器：每个表格一个UTF-8（带BOM，Excel可直接打开）CSV文件
+
+    zipped为False时文件为 <输出文件名>_<表名>.csv，为True时以 <表名>.csv 写入输出的zip中；
+    两种方式都边写边输出，不在内存中保留已写入的表格
+    """
+
+    def __init__(self, output_path, zipped=False):
+        self.output_path = output_path
+        self.sheet_count = 0
+        self._stream = None
+        self._zip = zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) if zipped else None
+
+    def write_table(self, df, sheet_name):
+        self._close_stream()
+        if self._zip is not None:
+            entry = self._zip.open(f"{sheet_name}.csv", "w", force_zip64=True)
+            self._stream = io.TextIOWrapper(entry, encoding="utf-8-sig", newline="")
+        else:
+            self._stream = open(csv_table_path(self.output_path, sheet_name), "w", encoding="utf-8-sig", newline="")
+        df.to_csv(self._stream, index=False)
+        self.sheet_count += 1
+
+    def append_table(self, df, header_row=None):
+        if self._stream is None:
+            return False
+        if header_row is not None:
+            csv.writer(self._stream).writerow(["" if cell is None else cell for cell in header_row])
+        df.to_csv(self._stream, index=False, header=False)
+        return True
+
+    def _close_stream(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def close(self):
+        self._close_stream()
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class ArrowLongTableWriter:
+    """
+    Parquet / Arrow IPC长表写入器（需要pyarrow）
+
+    列为 table、page、row、column、value（文本单元格）和 number（数值单元格，百分比为小数），
+    每个表格写成一个行组/记录批次
+    """
+
+    def __init__(self, output_path, output_format=OUTPUT_PARQUET):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise RuntimeError("输出Parquet/Arrow格式需要安装pyarrow")
+        self.output_path = output_path
+        self.sheet_count = 0
+        self._pa = pa
+        self._table_index = 0
+        self._table_rows = 0
+        self._schema = pa.schema([
+            ("table", pa.int32()), ("page", pa.int32()), ("row", pa.int32()),
+            ("column", pa.string()), ("value", pa.string()), ("number", pa.float64()),
+        ])
+        if output_format == OUTPUT_PARQUET:
+            import pyarrow.parquet as pq
+            self._sink = None
+            self._writer = pq.ParquetWriter(output_path, self._schema)
+        else:
+            self._sink = pa.OSFile(output_path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, self._schema)
+
+    def write_table(self, df, sheet_name):
+        self._table_index += 1
+        self._table_rows = 0
+        self._write_long(df)
+        self.sheet_count += 1
+
+    def append_table(self, df, header_row=None):
+        if self._table_index == 0:
+            return False
+        if header_row is not None:
+            self._write_long(row_frame(header_row, df))
+        self._write_long(df)
+        return True
+
+    def _write_long(self, df):
+        pa = self._pa
+        rows, columns, numbers, texts, _ = long_cells(df, self._table_rows + 1)
+        self._table_rows += len(df)
+        count = len(rows)
+        page = df.attrs.get("page")
+        batch = pa.record_batch([
+            pa.array(np.full(count, self._table_index, dtype=np.int32)),
+            pa.array([page] * count, type=pa.int32()),
+            pa.array(rows.astype(np.int32)),
+            pa.array(columns, type=pa.string()),
+            pa.array(texts, type=pa.string()),
+            pa.array(numbers, mask=np.isnan(numbers)),
+        ], schema=self._schema)
+        self._writer.write_batch(batch)
+
+    def close(self):
+        if self._writer is None:
+            return
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def create_writer(output_path, output_format=None):
+    """按输出格式（默认按扩展名推断）创建写入器"""
+    output_format = output_format or format_from_path(output_path)
+    if output_format == OUTPUT_XLSX_LONG:
+        return LongExcelTableWriter(output_path)
+    if output_format in (OUTPUT_CSV, OUTPUT_CSV_ZIP):
+        return CsvTableWriter(output_path, zipped=output_format == OUTPUT_CSV_ZIP)
+    if output_format in (OUTPUT_PARQUET, OUTPUT_ARROW):
+        return ArrowLongTableWriter(output_path, output_format)
+    return ExcelTableWriter(output_path)
@@ -0,0 +1,430 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+PDF表格转Excel工具 - tabula提取后端
+在一个常驻JVM（jpype）中调用tabula-java，所有批次复用同一个JVM；
+jpype或JVM不可用时回退到原有的每次调用启动一个java子进程的方式；
+不需要Java的pdfplumber后端见 plumber_backend，同样通过 get_backend 获取
+
+pandas和tabula在首次提取时才导入，导入本模块（例如界面启动时读取后端常量）很快
+"""
+
+import os
+import sys
+import json
+import threading
+import subprocess
+import importlib.util
+from collections import Counter, defaultdict
+
+from conversion_trace import span
+from extraction_methods import METHOD_AUTO, METHOD_GUESS, METHOD_LATTICE, METHOD_STREAM, choose_page_tables
+
+# 后端模式
+BACKEND_AUTO = "auto"              # 优先常驻JVM，不可用时回退到子进程
+BACKEND_JVM = "jvm"                # 常驻JVM（jpype）
+BACKEND_SUBPROCESS = "subprocess"  # 每次调用启动一个java子进程
+BACKEND_PDFPLUMBER = "pdfplumber"  # 纯Python提取（pdfplumber），不需要Java
+TABULA_MODES = (BACKEND_AUTO, BACKEND_JVM, BACKEND_SUBPROCESS)
+BACKEND_MODES = TABULA_MODES + (BACKEND_PDFPLUMBER,)
+
+# 子进程模式下检查取消标记的间隔（秒）
+CANCEL_POLL_INTERVAL = 0.2
+
+class ExtractionCancelled(Exception):
+    """提取因取消而中止"""
+
+def cancel_requested(cancel_token):
+    """
+    是否已请求取消
+
+    cancel_token 是一个标记文件的路径，文件存在即表示取消；
+    用文件而不是内存中的标志，工作进程中也能看到主进程发出的取消
+    """
+    return cancel_token is not None and os.path.exists(cancel_token)
+
+def jpype_available():
+    """检查jpype是否已安装"""
+    return importlib.util.find_spec("jpype") is not None
+
+def build_java_options(java_options=None):
+    """构建JVM启动参数（与tabula-py默认参数保持一致）"""
+    options = list(java_options or [])
+    if sys.platform == "darwin" and not any("java.awt.headless" in opt for opt in options):
+        # 防止macOS上每次调用都抢占焦点
+        options.append("-Djava.awt.headless=true")
+    if not any("file.encoding" in opt for opt in options):
+        options.append("-Dfile.encoding=UTF8")
+    if "-Xrs" not in options:
+        # 常驻JVM不接管SIGTERM/SIGINT：否则JVM收到信号后直接退出进程，Python的清理代码不会运行
+        options.append("-Xrs")
+    return options
+
+def column_lefts(data, column_count):
+    """每列非空单元格的最左x坐标（点），整列为空时为None；用于判断跨页的表格片段是否同一版式"""
+    lefts = []
+    for idx in range(column_count):
+        positions = [row[idx]["left"] for row in data if idx < len(row) and row[idx]["text"] and row[idx]["width"] > 0]
+        lefts.append(round(min(positions), 1) if positions else None)
+    return lefts
+
+def column_separators(data, column_count):
+    """
+    相邻两列之间的分隔x坐标（左列文本最右端与右列文本最左端的中点），无法确定时为None；
+    与tabula的columns参数含义相同，用于版式模板
+    """
+    bounds = []
+    for idx in range(column_count):
+        cells = [row[idx] for row in data if idx < len(row) and row[idx]["text"] and row[idx]["width"] > 0]
+        bounds.append((min(cell["left"] for cell in cells), max(cell["left"] + cell["width"] for cell in cells))
+                      if cells else None)
+    separators = []
+    for previous, current in zip(bounds, bounds[1:]):
+        separators.append(round((previous[1] + current[0]) / 2, 1) if previous and current else None)
+    return separators
+
+def tables_from_json(raw_json):
+    """
+    将tabula-java的JSON输出转换为DataFrame列表，首行作为表头（与tabula.read_pdf一致）
+
+    attrs中保留拼接跨页表格所需的版式信息：header_cells 为去重前的原始首行，column_lefts 见 column_lefts；
+    extraction_method 为表格的提取方式（lattice或stream）；
+    area（表格区域 [上, 左, 下, 右]）和 column_separators（见 column_separators）用于保存版式模板
+    """
+    import numpy as np
+    import pandas as pd
+
+    tables = []
+    for table in raw_json:
+        if len(table["data"]) == 0:
+            continue
+
+        rows = [[np.nan if not cell["text"] else cell["text"] for cell in row] for row in table["data"]]
+        columns = rows.pop(0)
+        header_cells = [None if col is np.nan else col for col in columns]
+
+        # 空表头命名为 "Unnamed: N"，重复表头添加 ".N" 后缀
+        unnamed_idx = 0
+        for idx, col in enumerate(columns):
+            if col is np.nan:
+                columns[idx] = f"Unnamed: {unnamed_idx}"
+                unnamed_idx += 1
+        counts = defaultdict(int)
+        for idx, col in enumerate(columns):
+            cur_count = counts[col]
+            while cur_count > 0:
+                counts[col] = cur_count + 1
+                col = f"{col}.{cur_count}"
+                cur_count = counts[col]
+            columns[idx] = col
+            counts[col] = cur_count + 1
+
+        df = pd.DataFrame(rows, columns=columns)
+        df.attrs["header_cells"] = header_cells
+        df.attrs["column_lefts"] = column_lefts(table["data"], len(columns))
+        if table.get("extraction_method"):
+            df.attrs["extraction_method"] = table["extraction_method"]
+        if "top" in table:
+            df.attrs["area"] = [round(table["top"], 1), round(table["left"], 1),
+                                round(table["top"] + table["height"], 1), round(table["left"] + table["width"], 1)]
+            df.attrs["column_separators"] = column_separators(table["data"], len(columns))
+        tables.append(df)
+    return tables
+
+class TabulaBackend:
+    """
+    tabula提取后端
+
+    - jvm模式: 在当前进程内启动一个常驻JVM，之后每个批次直接在JVM中调用tabula-java，
+      省去每批次启动Java进程的开销
+    - subprocess模式: 每次调用启动一个java子进程（原有方式）
+    - auto模式: 优先jvm，jpype未安装或JVM启动失败时回退到subprocess
+
+    一个进程内JVM只能启动一次，请通过 get_backend() 获取会话共享的实例
+    """
+
+    def __init__(self, mode=BACKEND_AUTO, java_options=None):
+        if mode not in TABULA_MODES:
+            raise ValueError(f"未知的后端模式: {mode}")
+        self.requested_mode = mode
+        self.java_options = java_options
+        self.mode = None  # 实际使用的模式，start()之后确定
+        self._vm = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """启动后端（jvm模式下启动常驻JVM），返回实际使用的模式"""
+        with self._lock:
+            if self._vm is None:
+                with span("backend_start", requested=self.requested_mode) as info:
+                    self._launch()
+                    if info is not None:
+                        info["mode"] = self.mode
+            return self.mode
+
+    def _launch(self):
+        """启动常驻JVM或准备子进程调用，设置实际使用的模式（调用方持有锁）"""
+        from tabula.backend import TabulaVm, SubprocessTabula
+
+        if self.requested_mode in (BACKEND_AUTO, BACKEND_JVM) and jpype_available():
+            # 打包版本附带的java目录（与PATH补丁一致），供jpype定位libjvm
+            bundled_java = os.path.join(os.path.dirname(sys.executable), "java")
+            if not os.environ.get("JAVA_HOME") and os.path.isdir(bundled_java):
+                os.environ["JAVA_HOME"] = bundled_java
+            try:
+                import jpype.config
+                # 退出时不等待销毁JVM：JVM由非主线程（转换线程）启动时，销毁会一直阻塞进程退出；
+                # JVM中只有只读打开的PDF，无需清理
+                jpype.config.destroy_jvm = False
+                vm = TabulaVm(java_options=build_java_options(self.java_options), silent=True)
+                if vm.tabula is None:
+                    raise RuntimeError("无法加载tabula-java")
+                self._vm = vm
+                self.mode = BACKEND_JVM
+                return self.mode
+            except Exception as e:
+                print(f"常驻JVM启动失败，回退到子进程模式: {str(e)}", file=sys.stderr)
+        elif self.requested_mode == BACKEND_JVM:
+            print("未安装jpype，回退到子进程模式", file=sys.stderr)
+
+        self._vm = SubprocessTabula(
+            java_options=build_java_options(self.java_options), silent=True, encoding="utf-8"
+        )
+        self.mode = BACKEND_SUBPROCESS
+        return self.mode
+
+    def read_json(self, pdf_path, pages, cancel_token=None, **options):
+        """
+        提取指定页的表格，返回tabula-java的原始JSON结构
+
+        subprocess模式下给出cancel_token时，请求取消后立即结束java子进程并抛出ExtractionCancelled；
+        jvm模式下一次调用无法中断，需要可取消的逐页提取请使用 open_document
+        """
+        from tabula.util import TabulaOption
+
+        if self._vm is None:
+            self.start()
+
+        tabula_options = TabulaOption(
+            pages=pages,
+            guess=options.pop("guess", True),
+            format="JSON",
+            silent=True,
+            multiple_tables=True,
+            **options
+        )
+        if cancel_token is not None and self.mode == BACKEND_SUBPROCESS:
+            output = self._call_subprocess(tabula_options, os.fspath(pdf_path), cancel_token)
+        else:
+            output = self._vm.call_tabula_java(tabula_options, os.fspath(pdf_path))
+        if not output:
+            return []
+        return json.loads(output)
+
+    def _call_subprocess(self, tabula_options, pdf_path, cancel_token):
+        """
+        与SubprocessTabula.call_tabula_java相同的命令行，但等待期间响应取消；
+        java子进程的标准错误记入当前批次的日志（见 extraction_log）
+        """
+        from tabula.backend import jar_path
+        from extraction_log import record_output
+
+        args = ["java"] + self._vm.java_options + ["-jar", jar_path()] + tabula_options.build_option_list()
+        process = subprocess.Popen(
+            args + [pdf_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.DEVNULL
+        )
+        while True:
+            try:
+                stdout, stderr = process.communicate(timeout=CANCEL_POLL_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                if cancel_requested(cancel_token):
+                    process.kill()
+                    process.communicate()
+                    raise ExtractionCancelled()
+        if stderr:
+            record_output("ERROR" if process.returncode else "WARNING", "tabula-java",
+                          stderr.decode(self._vm.encoding, errors="replace"))
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, args, stdout, stderr)
+        return stdout.decode(self._vm.encoding)
+
+    def read_pdf(self, pdf_path, pages, cancel_token=None, **options):
+        """提取指定页的表格，返回DataFrame列表"""
+        with span("parse_pages", pages=str(pages)):
+            raw_json = self.read_json(pdf_path, pages, cancel_token=cancel_token, **options)
+        with span("build_dataframes"):
+            return tables_from_json(raw_json)
+
+    def open_document(self, pdf_path, **options):
+        """打开PDF文档供多次提取使用，jvm模式下文档句柄和提取器常驻JVM"""
+        if self._vm is None:
+            self.start()
+        return TabulaDocument(self, pdf_path, **options)
+
+class TabulaDocument:
+    """
+    保持打开状态的PDF文档
+
+    jvm模式下PDF只解析一次，之后每个批次直接复用已打开的PDDocument和tabula提取器，
+    并逐页提取，每个表格的页码记录在 DataFrame.attrs["page"] 中；
+    subprocess模式下每次提取仍然启动一个java子进程
+
+    options 中的 method 为提取方式（见 extraction_methods，默认guess即tabula原有的自动判断）；
+    auto方式需要逐页提取，subprocess模式下按guess处理。
+    area（单个区域 [上, 左, 下, 右]）在jvm模式下由本类裁剪页面，与tabula命令行的处理相同
+    """
+
+    def __init__(self, backend, pdf_path, **options):
+        self.backend = backend
+        self.pdf_path = os.fspath(pdf_path)
+        self.method = options.pop("method", None) or METHOD_GUESS
+        self.options = options
+        # 缓存键中区分提取方式（guess为原有方式，缓存键保持不变）
+        self.extractor = None if self.method == METHOD_GUESS else f"tabula {self.method}"
+        # 各提取方式处理的页数，以及auto方式下重试的页数
+        self.method_counts = Counter()
+        self._document = None
+        self._extractors = {}
+        self._lock = threading.Lock()
+        if backend.mode == BACKEND_JVM:
+            self._open_in_jvm()
+
+    def _tabula_options(self, method):
+        from tabula.util import TabulaOption
+
+        options = dict(self.options)
+        return TabulaOption(
+            pages="1",
+            guess=options.pop("guess", True),
+            lattice=method == METHOD_LATTICE,
+            stream=method == METHOD_STREAM,
+            format="JSON",
+            silent=True,
+            multiple_tables=True,
+            **options
+        )
+
+    def _open_in_jvm(self):
+        """在常驻JVM中打开PDF"""
+        from java.io import File
+        from org.apache.pdfbox.pdmodel import PDDocument
+        from technology.tabula.writers import JSONWriter
+
+        password = self.options.get("password")
+        if password:
+            self._document = PDDocument.load(File(self.pdf_path), password)
+        else:
+            self._document = PDDocument.load(File(self.pdf_path))
+        self._object_extractor = self.backend._vm.tabula.ObjectExtractor(self._document)
+        self._json_writer = JSONWriter()
+
+    def _extractor(self, method):
+        """获取与命令行参数一致的tabula提取器，每种提取方式创建一次"""
+        extractor = self._extractors.get(method)
+        if extractor is None:
+            from java.lang import Class
+            from org.apache.commons.cli import DefaultParser
+
+            command_line = DefaultParser().parse(
+                self.backend._vm.tabula.CommandLineApp.buildOptions(),
+                self._tabula_options(method).build_option_list()
+            )
+            # CommandLineApp.createExtractor 是私有方法，通过反射调用以获得与命令行完全一致的提取配置
+            create_extractor = Class.forName("technology.tabula.CommandLineApp").getDeclaredMethod(
+                "createExtractor", Class.forName("org.apache.commons.cli.CommandLine")
+            )
+            create_extractor.setAccessible(True)
+            extractor = create_extractor.invoke(None, command_line)
+            self._extractors[method] = extractor
+        return extractor
+
+    def _extract_json(self, page, method):
+        """按指定方式提取一页，返回tabula-java的JSON结构"""
+        from java.lang import StringBuilder
+
+        output = StringBuilder()
+        self._json_writer.write(output, self._extractor(method).extractTables(page))
+        return json.loads(str(output.toString()))
+
+    @property
+    def page_aware(self):
+        """提取结果是否带有页码（仅jvm模式逐页提取）"""
+        return self._document is not None
+
+    def extract(self, pages, cancel_token=None):
+        """
+        提取指定页码列表中的表格，返回DataFrame列表
+
+        给出cancel_token时，jvm模式下每页开始前检查取消，subprocess模式下取消时结束java子进程，
+        取消后抛出ExtractionCancelled
+        """
+        pages = list(pages)
+        if self._document is None:
+            # 子进程模式：整段页码一次调用
+            options = dict(self.options)
+            if self.method in (METHOD_LATTICE, METHOD_STREAM):
+                options[self.method] = True
+            tables = self.backend.read_pdf(self.pdf_path, ",".join(map(str, pages)),
+                                           cancel_token=cancel_token, **options)
+            if len(pages) == 1:
+                for table in tables:
+                    table.attrs["page"] = pages[0]
+            return tables
+
+        tables = []
+        # PDDocument不是线程安全的，同一文档的提取串行执行
+        with self._lock:
+            for page_number in pages:
+                if cancel_requested(cancel_token):
+                    raise ExtractionCancelled()
+                with span("parse_page", page=page_number):
+                    raw_json = self._extract_page_json(page_number)
+                with span("build_dataframes"):
+                    for table in tables_from_json(raw_json):
+                        table.attrs["page"] = page_number
+                        tables.append(table)
+        return tables
+
+    def _extract_page_json(self, page_number):
+        """在JVM中解析一页并提取表格，返回tabula-java的JSON结构"""
+        page = self._object_extractor.extract(page_number)
+        area = self.options.get("area")
+        if area:
+            # 提取器只处理传入的页面，区域由tabula命令行在提取前裁剪，这里同样处理
+            page = page.getArea(*(float(value) for value in area))
+        if self.method == METHOD_AUTO:
+            raw_json, method, retried = choose_page_tables(
+                lambda method: self._extract_json(page, method), page.getRulings().size())
+            self.method_counts[method] += 1
+            self.method_counts["retried"] += retried
+        else:
+            raw_json = self._extract_json(page, self.method)
+            self.method_counts[self.method] += 1
+        return raw_json
+
+    def close(self):
+        """关闭文档，释放JVM中的PDF对象"""
+        with self._lock:
+            if self._document is not None:
+                self._document.close()
+                self._document = None
+
+# 每个进程的会话后端，按模式缓存（JVM在进程内只能启动一次）
+_backends = {}
+_backends_lock = threading.Lock()
+
+def get_backend(mode=BACKEND_AUTO, java_options=None):
+    """获取当前进程共享的提取后端，首次调用时启动（java_options仅在首次创建时生效）"""
+    with _backends_lock:
+        backend = _backends.get(mode)
+        if backend is None:
+            if mode == BACKEND_PDFPLUMBER:
+                from plumber_backend import PlumberBackend
+                backend = PlumberBackend(mode)
+            else:
+                backend = TabulaBackend(mode, java_options)
+            _backends[mode] = backend
+    backend.start()
+    return backend
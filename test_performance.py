@@ -8,15 +8,37 @@ PDF表格转Excel工具 - 性能测试脚本
 
 import os
 import sys
+import gc
+import json
 import time
+import subprocess
 import PyPDF2
 import pandas as pd
 from pathlib import Path
+import tempfile
+import threading
 import concurrent.futures
 import multiprocessing
+from collections import Counter
 
 # 导入原始和优化后的处理函数
-from pdf_table_converter_tkinter import extract_tables_silent, process_batch
+from converter_engine import (extract_tables_silent, process_batch, convert_pdf_to_excel,
+                              extract_batch_cached, save_tables_chunk, template_options)
+from table_stitching import TableStitcher
+from table_writers import create_writer
+from output_formats import OUTPUT_FORMATS, FORMAT_EXTENSIONS, output_files
+from tabula_backend import TabulaBackend, BACKEND_JVM, BACKEND_SUBPROCESS, BACKEND_PDFPLUMBER, get_backend
+from table_writers import ExcelTableWriter
+from page_analysis import scan_pages, plan_work_units, MIN_TABLE_RULINGS, MIN_TABLE_COLUMNS
+from memory_budget import MemoryBudget, rss_mb
+from table_cleaning import optimize_dataframe
+from extraction_methods import METHOD_AUTO, METHOD_GUESS, METHOD_LATTICE, METHOD_STREAM, table_score
+from extraction_log import capture_extraction_output
+from progress_channel import ProgressChannel, FRAME_INTERVAL_MS, STATUS_LOG_LINES
+from conversion_trace import ConversionTrace
+from layout_templates import TemplateRegistry, pdf_fingerprint, table_layout
+from pdf_subsetting import BatchSplitter
+from extraction_pool import create_process_pool, extract_batch_in_worker, deserialize_tables, choose_worker_count, ENGINE_PROCESS
 
 def test_performance(pdf_path, method="original", batch_size=10, workers=1):
     """
@@ -24,7 +46,7 @@ def test_performance(pdf_path, method="original", batch_size=10, workers=1):
     
     参数:
     - pdf_path: PDF文件路径
-    - method: 处理方法 ("original" 或 "optimized")
+    - method: 处理方法 ("original"、"optimized" 线程池 或 "process" 进程池)
     - batch_size: 批处理大小
     - workers: 并行处理的工作线程数
     
@@ -58,7 +80,7 @@ def test_performance(pdf_path, method="original", batch_size=10, workers=1):
             except Exception as e:
                 print(f"处理页 {page_range} 出错: {str(e)}")
     
-    else:  # optimized
+    else:  # optimized / process
         # 优化方法：并行处理批次
         batches = []
         for batch in range(0, total_pages, batch_size):
@@ -66,12 +88,21 @@ def test_performance(pdf_path, method="original", batch_size=10, workers=1):
             end_page = min(batch + batch_size, total_pages)
             batches.append((pdf_path, start_page, end_page))
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
-            futures = [executor.submit(process_batch, batch) for batch in batches]
+        if method == "process":
+            executor = create_process_pool(workers)
+            batch_func = extract_batch_in_worker
+        else:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+            batch_func = process_batch
+        
+        with executor:
+            futures = [executor.submit(batch_func, batch) for batch in batches]
             
             for future in concurrent.futures.as_completed(futures):
                 try:
-                    tables, count = future.result()
+                    tables, count = future.result()[:2]
+                    if method == "process":
+                        tables = deserialize_tables(tables)
                     tables_found += count
                     batch_index = futures.index(future)
                     start_page = batches[batch_index][1]
@@ -86,6 +117,1033 @@ def test_performance(pdf_path, method="original", batch_size=10, workers=1):
     print(f"处理完成！共找到 {tables_found} 个表格，用时: {processing_time:.2f} 秒")
     return processing_time, tables_found
 
+def benchmark_backends(pdf_path, batch_size=20, max_batches=10):
+    """
+    比较提取后端的单批次耗时：每批次启动java子进程 vs 常驻JVM
+    
+    参数:
+    - pdf_path: PDF文件路径
+    - batch_size: 批处理大小
+    - max_batches: 最多测试的批次数
+    
+    返回:
+    - 列表 [(模式, 启动时间, 单批次耗时列表, 表格数)]
+    """
+    with open(pdf_path, 'rb') as pdf_file:
+        total_pages = len(PyPDF2.PdfReader(pdf_file).pages)
+    
+    page_ranges = []
+    for batch in range(0, total_pages, batch_size):
+        page_ranges.append(f"{batch + 1}-{min(batch + batch_size, total_pages)}")
+    page_ranges = page_ranges[:max_batches]
+    
+    results = []
+    for mode in (BACKEND_SUBPROCESS, BACKEND_JVM):
+        backend = TabulaBackend(mode)
+        start_time = time.time()
+        actual_mode = backend.start()
+        startup_time = time.time() - start_time
+        if actual_mode != mode:
+            print(f"后端 {mode} 不可用（实际为 {actual_mode}），跳过")
+            continue
+        
+        batch_times = []
+        tables_found = 0
+        for page_range in page_ranges:
+            batch_start = time.time()
+            tables = backend.read_pdf(pdf_path, page_range)
+            batch_times.append(time.time() - batch_start)
+            tables_found += len(tables)
+            print(f"[{mode}] 处理页 {page_range} 用时 {batch_times[-1]:.2f} 秒")
+        results.append((mode, startup_time, batch_times, tables_found))
+    
+    print("\n=== 提取后端对比 (每批次) ===")
+    print(f"{'后端':<12} {'启动(秒)':<10} {'首批(秒)':<10} {'平均(秒)':<10} {'总计(秒)':<10} {'表格数':<10}")
+    print("-" * 70)
+    for mode, startup_time, batch_times, tables_found in results:
+        avg_time = sum(batch_times) / len(batch_times) if batch_times else 0
+        first_time = batch_times[0] if batch_times else 0
+        print(f"{mode:<12} {startup_time:<10.2f} {first_time:<10.2f} {avg_time:<10.2f} {startup_time + sum(batch_times):<10.2f} {tables_found:<10}")
+    
+    return results
+
+def benchmark_excel_writers(table_counts=(100, 200, 400), rows=50, cols=6, chunk_size=100):
+    """
+    比较Excel保存方式：每块重新以追加模式打开工作簿 vs 单次流式写入
+    
+    返回:
+    - 列表 [(表格数, 追加模式耗时, 流式写入耗时)]
+    """
+    import tempfile
+    
+    df = pd.DataFrame({f"col{c}": [f"{r * cols + c:,}" for r in range(rows)] for c in range(cols)})
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for count in table_counts:
+            # 原方式：每块表格以追加模式重新打开并重写整个工作簿
+            append_path = os.path.join(tmp_dir, f"append_{count}.xlsx")
+            start_time = time.time()
+            for chunk_start in range(0, count, chunk_size):
+                mode = 'a' if os.path.exists(append_path) else 'w'
+                with pd.ExcelWriter(append_path, engine='openpyxl', mode=mode) as writer:
+                    for idx in range(chunk_start, min(chunk_start + chunk_size, count)):
+                        df.to_excel(writer, sheet_name=f"Table_{idx+1}", index=False)
+            append_time = time.time() - start_time
+            
+            # 新方式：一个写入器独占文件，逐表流式写出
+            stream_path = os.path.join(tmp_dir, f"stream_{count}.xlsx")
+            start_time = time.time()
+            with ExcelTableWriter(stream_path) as writer:
+                for idx in range(count):
+                    writer.write_table(df, f"Table_{idx+1}")
+            stream_time = time.time() - start_time
+            
+            results.append((count, append_time, stream_time))
+    
+    print("\n=== Excel保存方式对比 ===")
+    print(f"{'表格数':<10} {'追加模式(秒)':<15} {'流式写入(秒)':<15} {'加速比':<10}")
+    print("-" * 55)
+    for count, append_time, stream_time in results:
+        speedup = append_time / stream_time if stream_time > 0 else 0
+        print(f"{count:<10} {append_time:<15.2f} {stream_time:<15.2f} {speedup:<10.2f}")
+    
+    return results
+
+def run_schedule(pdf_path, page_ranges, workers):
+    """
+    按给定的页码范围并行提取，返回 (总用时, 每个单元的耗时列表, 尾部延迟)
+    
+    尾部延迟: 待处理单元少于工作数（开始有工作者空闲）到全部完成之间的时间
+    """
+    start_time = time.time()
+    unit_times = []
+    completion_times = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        def timed_batch(batch):
+            batch_start = time.time()
+            process_batch(batch)
+            return time.time() - batch_start
+        
+        futures = [executor.submit(timed_batch, (pdf_path, start, end)) for start, end in page_ranges]
+        for future in concurrent.futures.as_completed(futures):
+            unit_times.append(future.result())
+            completion_times.append(time.time() - start_time)
+    
+    total_time = time.time() - start_time
+    idle_index = len(completion_times) - workers
+    tail_latency = total_time - completion_times[idle_index] if idle_index >= 0 else total_time
+    return total_time, unit_times, tail_latency
+
+def percentile(values, fraction):
+    """简单的百分位数（最近秩）"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def benchmark_scheduling(pdf_path, workers=None, batch_size=50):
+    """
+    比较固定页数批次与按预扫描开销划分的自适应工作单元
+    
+    返回:
+    - 列表 [(调度方式, 单元数, 总用时, 页/秒, P50, P95, 尾部延迟)]
+    """
+    workers = workers or max(1, min(multiprocessing.cpu_count() - 1, 4))
+    with open(pdf_path, 'rb') as pdf_file:
+        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        total_pages = len(pdf_reader.pages)
+        scan_start = time.time()
+        page_stats = scan_pages(pdf_reader)
+        scan_time = time.time() - scan_start
+    
+    schedules = [
+        (f"固定 (批次={batch_size})",
+         [(start, min(start + batch_size - 1, total_pages)) for start in range(1, total_pages + 1, batch_size)]),
+        ("自适应", plan_work_units(page_stats, workers)),
+    ]
+    
+    results = []
+    for name, page_ranges in schedules:
+        total_time, unit_times, tail_latency = run_schedule(pdf_path, page_ranges, workers)
+        if name == "自适应":
+            total_time += scan_time  # 预扫描也计入总用时
+        results.append((name, len(page_ranges), total_time, total_pages / total_time if total_time > 0 else 0,
+                        percentile(unit_times, 0.5), percentile(unit_times, 0.95), tail_latency))
+    
+    print(f"\n=== 批次调度对比 (工作线程={workers}, 预扫描用时={scan_time:.2f}秒) ===")
+    print(f"{'调度方式':<20} {'单元数':<8} {'总用时(秒)':<12} {'页/秒':<10} {'P50(秒)':<10} {'P95(秒)':<10} {'尾部(秒)':<10}")
+    print("-" * 85)
+    for name, units, total_time, throughput, p50, p95, tail in results:
+        print(f"{name:<20} {units:<8} {total_time:<12.2f} {throughput:<10.2f} {p50:<10.2f} {p95:<10.2f} {tail:<10.2f}")
+    
+    return results
+
+def benchmark_table_filter(pdf_path, thresholds=((1, 2), (MIN_TABLE_RULINGS, MIN_TABLE_COLUMNS), (8, 4), (16, 5))):
+    """
+    评估无表格页预筛选：以逐页完整提取的结果为准，计算不同阈值下的准确率和召回率
+    
+    参数:
+    - pdf_path: PDF文件路径
+    - thresholds: 要评估的 (最少框线数, 最少对齐列数) 组合，越往后越激进
+    
+    返回:
+    - 列表 [(阈值, 准确率, 召回率, 跳过页比例, 漏掉的表格数)]
+    """
+    with open(pdf_path, 'rb') as pdf_file:
+        scan_start = time.time()
+        page_stats = scan_pages(PyPDF2.PdfReader(pdf_file))
+        scan_time = time.time() - scan_start
+    
+    # 逐页完整提取，得到每页实际的表格数
+    backend = TabulaBackend(BACKEND_JVM)
+    if backend.start() != BACKEND_JVM:
+        print("逐页评估需要常驻JVM后端，跳过预筛选评估")
+        return []
+    document = backend.open_document(pdf_path)
+    tables_per_page = {}
+    extract_start = time.time()
+    try:
+        for stat in page_stats:
+            tables_per_page[stat.page] = len(document.extract([stat.page]))
+    finally:
+        document.close()
+    extract_time = time.time() - extract_start
+    
+    results = []
+    for min_rulings, min_columns in thresholds:
+        true_pos = false_pos = false_neg = missed_tables = 0
+        for stat in page_stats:
+            predicted = stat.might_contain_table(min_rulings, min_columns)
+            actual = tables_per_page[stat.page] > 0
+            if predicted and actual:
+                true_pos += 1
+            elif predicted:
+                false_pos += 1
+            elif actual:
+                false_neg += 1
+                missed_tables += tables_per_page[stat.page]
+        precision = true_pos / (true_pos + false_pos) if true_pos + false_pos else 1.0
+        recall = true_pos / (true_pos + false_neg) if true_pos + false_neg else 1.0
+        skipped = 1 - (true_pos + false_pos) / len(page_stats) if page_stats else 0
+        results.append((f"框线>={min_rulings}/列>={min_columns}", precision, recall, skipped, missed_tables))
+    
+    table_pages = sum(1 for count in tables_per_page.values() if count)
+    print(f"\n=== 无表格页预筛选 ({len(page_stats)}页, 有表格{table_pages}页, "
+          f"预扫描{scan_time:.2f}秒, 完整提取{extract_time:.2f}秒) ===")
+    print(f"{'阈值':<20} {'准确率':<10} {'召回率':<10} {'跳过页':<10} {'漏掉表格':<10}")
+    print("-" * 65)
+    for name, precision, recall, skipped, missed_tables in results:
+        print(f"{name:<20} {precision:<10.1%} {recall:<10.1%} {skipped:<10.1%} {missed_tables:<10}")
+    
+    return results
+
+# 在子进程中运行：记录导入界面模块和显示第一个窗口的时刻
+STARTUP_PROBE = """
+import sys, time, json
+sys.path.insert(0, {package_dir!r})
+result = {{}}
+import_start = time.time()
+import {module}
+result["imported"] = time.time()
+try:
+    import tkinter as tk
+    root = tk.Tk()
+    {module}.PDFTableConverterApp(root)
+    root.update()
+    result["window"] = time.time()
+    root.destroy()
+except Exception as e:
+    result["window_error"] = str(e)
+print(json.dumps(result))
+"""
+
+def benchmark_startup(modules=("pdf_table_converter_tkinter", "converter_engine", "pdf2excel"), runs=3):
+    """
+    测量冷启动时间：从启动解释器到模块导入完成、到第一个窗口显示的时间（取多次的中位数）
+    
+    没有图形显示环境时只报告导入时间
+    
+    返回:
+    - 列表 [(模块, 导入用时, 首个窗口用时或None)]
+    """
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for module in modules:
+        import_times = []
+        window_times = []
+        for _ in range(runs):
+            code = STARTUP_PROBE.format(package_dir=package_dir, module=module)
+            start_time = time.time()
+            output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True).stdout
+            try:
+                probe = json.loads(output.strip().splitlines()[-1])
+            except (IndexError, ValueError):
+                print(f"{module} 启动失败")
+                break
+            import_times.append(probe["imported"] - start_time)
+            if "window" in probe:
+                window_times.append(probe["window"] - start_time)
+        if import_times:
+            results.append((module, percentile(import_times, 0.5),
+                            percentile(window_times, 0.5) if window_times else None))
+    
+    print(f"\n=== 冷启动时间 (中位数, {runs}次) ===")
+    print(f"{'模块':<32} {'导入完成(秒)':<14} {'首个窗口(秒)':<14}")
+    print("-" * 62)
+    for module, import_time, window_time in results:
+        window_text = f"{window_time:.2f}" if window_time is not None else "-"
+        print(f"{module:<32} {import_time:<14.2f} {window_text:<14}")
+    
+    return results
+
+def build_large_pdf(pdf_path, output_path, min_pages=2000):
+    """重复源PDF的页面，生成至少min_pages页的大文件"""
+    reader = PyPDF2.PdfReader(pdf_path)
+    writer = PyPDF2.PdfWriter()
+    while len(writer.pages) < min_pages:
+        for page in reader.pages:
+            writer.add_page(page)
+    with open(output_path, 'wb') as output_file:
+        writer.write(output_file)
+    return len(writer.pages)
+
+def child_process_count():
+    """当前进程的子进程数（工作进程和java子进程，不含multiprocessing常驻的resource_tracker）"""
+    import psutil
+    children = psutil.Process().children(recursive=True)
+    return sum(1 for child in children if "resource_tracker" not in " ".join(child.cmdline()))
+
+def benchmark_cancellation(pdf_path, engines=("thread", ENGINE_PROCESS), cancel_after=10.0, min_pages=2000):
+    """
+    测量取消延迟：在大文件转换进行中取消，记录转换函数返回和子进程全部退出所用的时间
+    
+    返回:
+    - 列表 [(引擎, 返回用时, 子进程退出用时, 剩余子进程数)]
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        large_pdf = os.path.join(work_dir, "large.pdf")
+        total_pages = build_large_pdf(pdf_path, large_pdf, min_pages)
+        print(f"\n取消测试文件: {total_pages} 页")
+        for engine in engines:
+            cancel_flag = {"cancel": False}
+            finished = threading.Event()
+            worker = threading.Thread(
+                target=lambda: (convert_pdf_to_excel(
+                    large_pdf, os.path.join(work_dir, f"{engine}.xlsx"), lambda *args: None, cancel_flag,
+                    engine=engine, use_cache=False, adaptive=False
+                ), finished.set()),
+                daemon=True
+            )
+            worker.start()
+            time.sleep(cancel_after)
+            
+            cancel_time = time.time()
+            cancel_flag["cancel"] = True
+            finished.wait()
+            return_latency = time.time() - cancel_time
+            # 转换返回后等待工作进程和java子进程退出（最多30秒）
+            while child_process_count() and time.time() - cancel_time < 30:
+                time.sleep(0.05)
+            exit_latency = time.time() - cancel_time
+            results.append((engine, return_latency, exit_latency, child_process_count()))
+    
+    print(f"\n=== 取消延迟 (转换开始{cancel_after:.0f}秒后取消) ===")
+    print(f"{'引擎':<10} {'函数返回(秒)':<14} {'子进程退出(秒)':<16} {'剩余子进程':<10}")
+    print("-" * 54)
+    for engine, return_latency, exit_latency, remaining in results:
+        print(f"{engine:<10} {return_latency:<14.2f} {exit_latency:<16.2f} {remaining:<10}")
+    
+    return results
+
+def legacy_free_memory():
+    """旧版MemoryManager.free_memory：三次分代回收、malloc_trim并启动一个空进程"""
+    gc.collect(0)
+    gc.collect(1)
+    gc.collect(2)
+    if hasattr(os, 'malloc_trim'):
+        os.malloc_trim(0)
+    p = multiprocessing.Process(target=lambda: None)
+    p.start()
+    p.join()
+    return gc.get_count()[0]
+
+def legacy_check_and_free_memory(threshold=1000):
+    """旧版MemoryManager.check_and_free_memory（去掉打印）"""
+    if rss_mb() > threshold:
+        legacy_free_memory()
+        rss_mb()
+        return True
+    return False
+
+def benchmark_memory_control(calls=200, legacy_free_calls=20):
+    """
+    比较旧版内存管理与内存预算每次调用的开销
+    
+    旧版在每个批次和每个保存块都调用，超过阈值（500MB，常驻JVM的进程很容易超过）时每次都完整回收；
+    新版每次只读取限频采样的RSS，超过上限时按冷却时间回收
+    
+    返回:
+    - 列表 [(场景, 每次调用用时(毫秒))]
+    """
+    # 模拟提取过程中存活的对象，使回收有实际工作量
+    live_tables = [pd.DataFrame({"a": range(1000), "b": ["x"] * 1000}) for _ in range(200)]
+    
+    def per_call(func, count):
+        start_time = time.perf_counter()
+        for _ in range(count):
+            func()
+        return (time.perf_counter() - start_time) * 1000 / count
+    
+    usage = rss_mb()
+    under_budget = MemoryBudget(limit_mb=usage * 10)
+    over_budget = MemoryBudget(limit_mb=usage / 10)
+    
+    def budget_step(budget):
+        budget.window(8)
+        budget.maybe_release()
+    
+    results = [
+        ("旧: free_memory (每个保存块)", per_call(legacy_free_memory, legacy_free_calls)),
+        ("旧: check_and_free_memory 超过阈值", per_call(lambda: legacy_check_and_free_memory(0), legacy_free_calls)),
+        ("旧: check_and_free_memory 未超阈值", per_call(lambda: legacy_check_and_free_memory(usage * 10), calls)),
+        ("新: 预算检查 未超上限", per_call(lambda: budget_step(under_budget), calls)),
+        ("新: 预算检查 超过上限", per_call(lambda: budget_step(over_budget), calls)),
+    ]
+    del live_tables
+    
+    print(f"\n=== 内存管理开销 (当前RSS {usage:.0f} MB) ===")
+    print(f"{'场景':<36} {'每次调用(毫秒)':<14}")
+    print("-" * 52)
+    for name, millis in results:
+        print(f"{name:<36} {millis:<14.3f}")
+    print(f"超过上限时 {calls} 次检查共回收 {over_budget.releases} 次")
+    
+    return results
+
+def legacy_suppress_stdout_stderr(func):
+    """旧版 suppress_stdout_stderr：提取期间把整个解释器的sys.stdout/sys.stderr换成空设备"""
+    def wrapper(*args, **kwargs):
+        try:
+            original_stdout = sys.stdout
+            original_stderr = sys.stderr
+            with open(os.devnull, 'w') as devnull:
+                sys.stdout = devnull
+                sys.stderr = devnull
+                return func(*args, **kwargs)
+        finally:
+            sys.stdout = original_stdout
+            sys.stderr = original_stderr
+    return wrapper
+
+def benchmark_output_capture(workers=4, batches=200, batch_seconds=0.002):
+    """
+    比较并发批次下旧的全局替换标准输出与按线程收集提取器输出
+    
+    每个模拟批次通过pdfminer的日志记录器输出一条警告后等待batch_seconds（模拟提取），
+    同时主线程（相当于界面或命令行）不断输出；统计主线程输出的保留比例、
+    泄漏到主线程输出中的提取器警告、结束后sys.stdout是否恢复，以及批次日志收集到的记录数
+    
+    返回:
+    - 列表 [(方式, 用时, 主线程输出保留比例, 泄漏的警告数, sys.stdout是否恢复, 收集的记录数)]
+    """
+    import io
+    import logging
+    
+    marker = "模拟的提取器警告"
+    extractor_logger = logging.getLogger("pdfminer.benchmark")
+    
+    def fake_extract():
+        extractor_logger.warning(marker)
+        time.sleep(batch_seconds)
+    
+    def legacy_batch():
+        legacy_suppress_stdout_stderr(fake_extract)()
+        return []
+    
+    def captured_batch():
+        with capture_extraction_output() as log:
+            fake_extract()
+        return log.to_records()
+    
+    results = []
+    for name, batch in (("旧: 全局替换标准输出", legacy_batch), ("新: 按线程收集", captured_batch)):
+        console = io.StringIO()
+        original_stdout, original_stderr = sys.stdout, sys.stderr
+        sys.stdout = sys.stderr = console
+        attempted = 0
+        start_time = time.perf_counter()
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(batch) for _ in range(batches)]
+                while not all(future.done() for future in futures):
+                    attempted += 1
+                    try:
+                        print(f"console line {attempted}")
+                    except ValueError:
+                        pass  # sys.stdout停留在已关闭的空设备上
+                    time.sleep(0.0005)
+                records = sum(len(future.result()) for future in futures)
+            seconds = time.perf_counter() - start_time
+            restored = sys.stdout is console and sys.stderr is console
+        finally:
+            sys.stdout, sys.stderr = original_stdout, original_stderr
+        output = console.getvalue()
+        kept = output.count("console line") / attempted if attempted else 1.0
+        results.append((name, seconds, kept, output.count(marker), restored, records))
+    
+    print(f"\n=== 并发批次的输出收集 ({batches}批次, {workers}线程) ===")
+    print(f"{'方式':<22} {'用时(秒)':<10} {'主线程输出保留':<14} {'泄漏警告':<10} {'标准输出已恢复':<14} {'批次日志记录':<12}")
+    print("-" * 90)
+    for name, seconds, kept, leaked, restored, records in results:
+        print(f"{name:<22} {seconds:<10.2f} {kept:<14.1%} {leaked:<10} {str(restored):<14} {records:<12}")
+    
+    return results
+
+def benchmark_progress_channel(jobs=4, updates=20000, log_every=50, frame_ms=FRAME_INTERVAL_MS):
+    """
+    比较界面进度的两种传递方式（无需显示器，用队列模拟Tk的事件队列，用列表模拟状态区）
+    
+    旧: 每次进度回调排一个事件（root.after(0, ...)），每个事件向状态区追加一行且从不删除；
+    新: 回调推入ProgressChannel，界面线程每frame_ms毫秒取出一次，同一任务的进度合并，状态区最多保留STATUS_LOG_LINES行
+    jobs个线程各发出updates次进度，每log_every次附带一条批次日志
+    
+    返回:
+    - 列表 [(方式, 推送用时, 界面处理的事件数, 最大积压, 状态区行数, 推送结束后界面追上所需时间)]
+    """
+    import queue
+    from collections import deque
+    
+    def produce(push_progress, push_log):
+        def run(job_id):
+            for idx in range(updates):
+                push_progress(job_id, f"[job{job_id}] 已提取: {idx}/{updates}批次")
+                if idx % log_every == 0:
+                    push_log([f"[job{job_id}] 页 {idx}-{idx} WARNING pdfminer: 模拟的提取器警告"])
+        threads = [threading.Thread(target=run, args=(job_id,)) for job_id in range(jobs)]
+        for thread in threads:
+            thread.start()
+        return threads
+    
+    results = []
+    
+    # 旧方式：每次回调一个事件
+    events = queue.Queue()
+    widget = []
+    stats = {"handled": 0, "backlog": 0}
+    done = threading.Event()
+    
+    def legacy_ui():
+        while not (done.is_set() and events.empty()):
+            stats["backlog"] = max(stats["backlog"], events.qsize())
+            try:
+                callback = events.get(timeout=0.01)
+            except queue.Empty:
+                continue
+            callback()
+            stats["handled"] += 1
+    
+    ui = threading.Thread(target=legacy_ui)
+    ui.start()
+    start_time = time.perf_counter()
+    threads = produce(lambda job_id, text: events.put(lambda: widget.append(text)),
+                      lambda lines: events.put(lambda: widget.append("\n".join(lines))))
+    for thread in threads:
+        thread.join()
+    pushed = time.perf_counter()
+    done.set()
+    ui.join()
+    results.append(("旧: 每次回调一个事件", pushed - start_time, stats["handled"], stats["backlog"], len(widget),
+                    time.perf_counter() - pushed))
+    
+    # 新方式：进度通道，固定帧率取出
+    channel = ProgressChannel()
+    widget = deque(maxlen=STATUS_LOG_LINES)
+    stats = {"handled": 0, "backlog": 0}
+    done = threading.Event()
+    
+    def channel_ui():
+        while True:
+            finished = done.is_set()
+            lines, dropped = channel.drain()
+            stats["handled"] += 1
+            stats["backlog"] = max(stats["backlog"], len(lines))
+            widget.extend(lines)
+            if finished:
+                return
+            time.sleep(frame_ms / 1000)
+    
+    ui = threading.Thread(target=channel_ui)
+    ui.start()
+    start_time = time.perf_counter()
+    threads = produce(channel.set_status, channel.log)
+    for thread in threads:
+        thread.join()
+    pushed = time.perf_counter()
+    done.set()
+    ui.join()
+    results.append(("新: 进度通道", pushed - start_time, stats["handled"], stats["backlog"], len(widget),
+                    time.perf_counter() - pushed))
+    
+    print(f"\n=== 界面进度传递 ({jobs}个任务 x {updates}次进度, 每{log_every}次一条日志, 帧间隔{frame_ms}ms) ===")
+    print(f"{'方式':<22} {'推送用时(秒)':<14} {'界面事件数':<12} {'最大积压':<10} {'状态区行数':<12} {'追上用时(秒)':<12}")
+    print("-" * 90)
+    for name, push_seconds, handled, backlog, lines, lag in results:
+        print(f"{name:<22} {push_seconds:<14.2f} {handled:<12} {backlog:<10} {lines:<12} {lag:<12.2f}")
+    
+    return results
+
+def legacy_optimize_dataframe(df):
+    """旧版optimize_dataframe：每个文本列都做全列nunique，只转换类别类型，不解析数字"""
+    for col in df.select_dtypes(include=['object', 'string']).columns:
+        if df[col].nunique() < len(df[col]) * 0.5:
+            df[col] = df[col].astype('category')
+    for col in df.select_dtypes(include=['float']).columns:
+        df[col] = pd.to_numeric(df[col], downcast='float')
+    for col in df.select_dtypes(include=['int']).columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+def synthetic_text_table(rows, seed=0):
+    """模拟tabula输出的全字符串表格：千分位数字、百分比、金额、编号、类别和自由文本"""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(0, 10_000_000, rows) / 100
+    return pd.DataFrame({
+        "金额": [f"{value:,.2f}" for value in amounts],
+        "增长率": [f"{value:.1f}%" for value in rng.normal(5, 10, rows)],
+        "单价": [f"${value:,.2f}" if value >= 0 else f"(${-value:,.2f})" for value in rng.normal(50, 80, rows)],
+        "数量": rng.integers(1, 5000, rows).astype(str),
+        "编号": [f"{value:06d}" for value in rng.integers(0, 999_999, rows)],
+        "地区": rng.choice(["华东", "华南", "华北", "西南", "东北"], rows),
+        "备注": [f"备注文本 {value}" for value in rng.integers(0, 10**9, rows)],
+    }, dtype=object)
+
+def benchmark_dataframe_cleaning(rows=(10_000, 100_000), runs=3):
+    """
+    比较旧版与向量化的optimize_dataframe：清洗用时、写入Excel用时、内存占用和转换为数值的列数
+    
+    返回:
+    - 列表 [(行数, 方法, 清洗用时, 写入用时, 内存MB, 数值列数)]
+    """
+    methods = (("旧版", legacy_optimize_dataframe), ("向量化", optimize_dataframe))
+    results = []
+    for row_count in rows:
+        source = synthetic_text_table(row_count)
+        source_mb = source.memory_usage(deep=True).sum() / 1024 / 1024
+        for name, func in methods:
+            times = []
+            for _ in range(runs):
+                df = source.copy()
+                start_time = time.perf_counter()
+                df = func(df)
+                times.append(time.perf_counter() - start_time)
+            memory_mb = df.memory_usage(deep=True).sum() / 1024 / 1024
+            numeric_columns = sum(1 for dtype in df.dtypes if pd.api.types.is_numeric_dtype(dtype))
+            with tempfile.TemporaryDirectory() as work_dir:
+                start_time = time.perf_counter()
+                with ExcelTableWriter(os.path.join(work_dir, "cleaning.xlsx")) as writer:
+                    writer.write_table(df, "Table_1")
+                write_time = time.perf_counter() - start_time
+            results.append((row_count, name, percentile(times, 0.5), write_time, memory_mb, numeric_columns, source_mb))
+    
+    print(f"\n=== DataFrame清洗 (7列合成表格, 清洗取{runs}次中位数) ===")
+    print(f"{'行数':<10} {'方法':<8} {'清洗(秒)':<10} {'写入(秒)':<10} {'原始内存(MB)':<14} {'优化后(MB)':<12} {'数值列':<8}")
+    print("-" * 78)
+    for row_count, name, seconds, write_time, memory_mb, numeric_columns, source_mb in results:
+        print(f"{row_count:<10} {name:<8} {seconds:<10.3f} {write_time:<10.2f} {source_mb:<14.1f} "
+              f"{memory_mb:<12.1f} {numeric_columns:<8}")
+    
+    return [result[:6] for result in results]
+
+def benchmark_stitching(pdf_path, runs=3):
+    """
+    比较拼接跨页续表前后的写入：工作表数和写入用时（表格只提取一次，只计写入阶段）
+    
+    返回:
+    - 列表 [(方式, 工作表数, 拼接的续表数, 写入用时)]
+    """
+    with open(pdf_path, 'rb') as pdf_file:
+        total_pages = len(PyPDF2.PdfReader(pdf_file).pages)
+    tables, _, _ = extract_batch_cached(pdf_path, range(1, total_pages + 1))
+    tables = [df for df in tables if not df.empty]
+    
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name, stitch in (("每个片段一个工作表", False), ("拼接跨页续表", True)):
+            times = []
+            for _ in range(runs):
+                start_time = time.perf_counter()
+                with ExcelTableWriter(os.path.join(work_dir, "stitching.xlsx")) as writer:
+                    stitcher = TableStitcher() if stitch else None
+                    _, sheets, stitched, _ = save_tables_chunk(([df.copy() for df in tables], 0, writer, stitcher))
+                times.append(time.perf_counter() - start_time)
+            results.append((name, sheets, stitched, percentile(times, 0.5)))
+    
+    print(f"\n=== 跨页表格拼接 ({len(tables)}个表格片段, 写入取{runs}次中位数) ===")
+    print(f"{'方式':<20} {'工作表数':<10} {'拼接续表':<10} {'写入(秒)':<10}")
+    print("-" * 54)
+    for name, sheets, stitched, seconds in results:
+        print(f"{name:<20} {sheets:<10} {stitched:<10} {seconds:<10.2f}")
+    
+    return results
+
+def benchmark_output_formats(table_count=100, rows=500, formats=OUTPUT_FORMATS):
+    """
+    比较各输出格式的写入吞吐量（合成表格经过清洗后写入，只计写入时间）
+    
+    返回:
+    - 列表 [(格式, 写入用时, 每秒单元格数, 输出大小MB)]
+    """
+    tables = []
+    for idx in range(table_count):
+        df = optimize_dataframe(synthetic_text_table(rows, seed=idx))
+        df.attrs["page"] = idx + 1
+        tables.append(df)
+    cells = sum(df.size for df in tables)
+    
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for output_format in formats:
+            output_path = os.path.join(work_dir, f"{output_format}{FORMAT_EXTENSIONS[output_format]}")
+            start_time = time.perf_counter()
+            try:
+                with create_writer(output_path, output_format) as writer:
+                    for idx, df in enumerate(tables):
+                        writer.write_table(df, f"Table_{idx+1}")
+            except RuntimeError as e:
+                print(f"{output_format}: {str(e)}")
+                continue
+            seconds = time.perf_counter() - start_time
+            size_mb = sum(os.path.getsize(path) for path in output_files(output_path, output_format)) / 1024 / 1024
+            results.append((output_format, seconds, cells / seconds, size_mb))
+    
+    print(f"\n=== 输出格式写入吞吐量 ({table_count}个表格 x {rows}行 x 7列) ===")
+    print(f"{'格式':<12} {'写入(秒)':<10} {'单元格/秒':<14} {'大小(MB)':<10}")
+    print("-" * 48)
+    for output_format, seconds, throughput, size_mb in results:
+        print(f"{output_format:<12} {seconds:<10.2f} {throughput:<14,.0f} {size_mb:<10.1f}")
+    
+    return results
+
+def table_cell_texts(df):
+    """表格的全部单元格文本（含表头），忽略空白差异，空单元格为空字符串"""
+    rows = [df.attrs.get("header_cells") or list(df.columns)] + df.astype(object).values.tolist()
+    return [[" ".join(str(cell).split()) if cell is not None and not pd.isna(cell) else "" for cell in row]
+            for row in rows]
+
+def compare_tables(reference, candidate):
+    """
+    按页比较两个后端的提取结果（同一页的表格按出现顺序配对）
+
+    返回 (表格数一致的页比例, 形状一致的表格比例, 单元格召回率)；
+    单元格召回率为参考结果的非空单元格中，在配对表格里找到相同文本的比例（不要求位置相同）
+    """
+    pages = sorted(set(reference) | set(candidate))
+    count_matches = 0
+    shape_matches = 0
+    reference_tables = 0
+    found_cells = 0
+    reference_cells = 0
+    for page in pages:
+        page_reference = reference.get(page, [])
+        page_candidate = candidate.get(page, [])
+        count_matches += len(page_reference) == len(page_candidate)
+        for idx, ref_cells in enumerate(page_reference):
+            reference_tables += 1
+            ref_counter = Counter(cell for row in ref_cells for cell in row if cell)
+            reference_cells += sum(ref_counter.values())
+            if idx >= len(page_candidate):
+                continue
+            cand_cells = page_candidate[idx]
+            shape_matches += (len(cand_cells) == len(ref_cells)
+                              and len(cand_cells[0]) == len(ref_cells[0]))
+            cand_counter = Counter(cell for row in cand_cells for cell in row if cell)
+            found_cells += sum((ref_counter & cand_counter).values())
+    return (count_matches / len(pages) if pages else 1.0,
+            shape_matches / reference_tables if reference_tables else 1.0,
+            found_cells / reference_cells if reference_cells else 1.0)
+
+def benchmark_extraction_backends(pdf_path, backends=(BACKEND_JVM, BACKEND_PDFPLUMBER), workers=None):
+    """
+    比较tabula与pdfplumber后端：单进程逐页提取的速度和与tabula结果的一致程度，
+    以及进程池引擎下完整转换的用时（不使用缓存）
+
+    返回:
+    - 列表 [(后端, 启动用时, 提取用时, 表格数, 表格数一致的页比例, 形状一致的表格比例, 单元格召回率, 进程池转换用时)]
+    """
+    with open(pdf_path, 'rb') as pdf_file:
+        total_pages = len(PyPDF2.PdfReader(pdf_file).pages)
+    pages = range(1, total_pages + 1)
+    workers = workers or choose_worker_count(ENGINE_PROCESS)
+    
+    extracted = {}
+    timings = {}
+    for backend_mode in backends:
+        start_time = time.perf_counter()
+        try:
+            backend = get_backend(backend_mode)
+        except RuntimeError as e:
+            print(f"{backend_mode}: {str(e)}")
+            continue
+        startup_time = time.perf_counter() - start_time
+        document = backend.open_document(pdf_path)
+        start_time = time.perf_counter()
+        try:
+            tables = document.extract(pages)
+        finally:
+            document.close()
+        extract_time = time.perf_counter() - start_time
+        
+        page_tables = {}
+        for df in tables:
+            page_tables.setdefault(df.attrs.get("page"), []).append(table_cell_texts(df))
+        extracted[backend_mode] = page_tables
+        timings[backend_mode] = (startup_time, extract_time, len(tables))
+    
+    results = []
+    reference = extracted.get(backends[0], {})
+    with tempfile.TemporaryDirectory() as work_dir:
+        for backend_mode in extracted:
+            output_path = os.path.join(work_dir, f"{backend_mode}.xlsx")
+            start_time = time.perf_counter()
+            ok = convert_pdf_to_excel(pdf_path, output_path, lambda *_: None, {"cancel": False},
+                                      backend=backend_mode, engine=ENGINE_PROCESS, use_cache=False,
+                                      workers=workers)
+            pool_time = time.perf_counter() - start_time if ok else float("nan")
+            startup_time, extract_time, table_count = timings[backend_mode]
+            results.append((backend_mode, startup_time, extract_time, table_count)
+                           + compare_tables(reference, extracted[backend_mode]) + (pool_time,))
+    
+    print(f"\n=== 提取后端对比 ({total_pages}页, 一致性以{backends[0]}为参照, 进程池{workers}个进程) ===")
+    print(f"{'后端':<12} {'启动(秒)':<10} {'提取(秒)':<10} {'页/秒':<8} {'表格数':<8} {'表格数一致页':<14} "
+          f"{'形状一致表格':<14} {'单元格召回':<12} {'进程池转换(秒)':<14}")
+    print("-" * 110)
+    for (backend_mode, startup_time, extract_time, table_count,
+         page_ratio, shape_ratio, cell_recall, pool_time) in results:
+        print(f"{backend_mode:<12} {startup_time:<10.2f} {extract_time:<10.2f} {total_pages / extract_time:<8.1f} "
+              f"{table_count:<8} {page_ratio:<14.1%} {shape_ratio:<14.1%} {cell_recall:<12.1%} {pool_time:<14.2f}")
+    
+    return results
+
+def benchmark_extraction_methods(pdf_path, backends=(BACKEND_JVM, BACKEND_PDFPLUMBER),
+                                 methods=(METHOD_GUESS, METHOD_LATTICE, METHOD_STREAM, METHOD_AUTO)):
+    """
+    比较提取方式：固定使用一种方式、tabula原有的自动判断，以及逐页选择并只重试低分页的auto
+
+    质量用与auto相同的启发式衡量（有表格的页数、非空表格的平均得分）；
+    每个后端先完整提取一遍预热（JIT和字体缓存），计时不含预热
+
+    返回:
+    - 列表 [(后端, 方式, 用时, 表格数, 有表格的页数, 平均表格得分, 重试页数)]
+    """
+    with open(pdf_path, 'rb') as pdf_file:
+        total_pages = len(PyPDF2.PdfReader(pdf_file).pages)
+    pages = range(1, total_pages + 1)
+    
+    results = []
+    for backend_mode in backends:
+        try:
+            backend = get_backend(backend_mode)
+        except RuntimeError as e:
+            print(f"{backend_mode}: {str(e)}")
+            continue
+        for method in (methods[0],) + tuple(methods):
+            document = backend.open_document(pdf_path, method=method)
+            start_time = time.perf_counter()
+            try:
+                tables = [df for df in document.extract(pages) if not df.empty]
+            finally:
+                document.close()
+            seconds = time.perf_counter() - start_time
+            scores = [table_score([[{"text": text} for text in row] for row in table_cell_texts(df)])
+                      for df in tables]
+            results.append((backend_mode, method, seconds, len(tables), len({df.attrs["page"] for df in tables}),
+                            sum(scores) / len(scores) if scores else 0.0, document.method_counts["retried"]))
+        del results[-len(methods) - 1]  # 预热
+    
+    print(f"\n=== 提取方式对比 ({total_pages}页) ===")
+    print(f"{'后端':<12} {'方式':<10} {'用时(秒)':<10} {'表格数':<8} {'有表格页':<10} {'平均得分':<10} {'重试页':<8}")
+    print("-" * 72)
+    for backend_mode, method, seconds, table_count, table_pages, mean_score, retried in results:
+        print(f"{backend_mode:<12} {method:<10} {seconds:<10.2f} {table_count:<8} {table_pages:<10} "
+              f"{mean_score:<10.3f} {retried:<8}")
+    
+    return results
+
+def benchmark_layout_templates(pdf_path, backends=(BACKEND_JVM, BACKEND_PDFPLUMBER)):
+    """
+    比较按版式模板提取与逐页检测表格（auto）
+
+    每个后端先用auto提取一遍（同时作为预热），用结果在临时目录中保存模板并按第一页指纹匹配，
+    再分别计时auto和模板提取；一致性以auto的结果为参考（见 compare_tables）
+
+    返回:
+    - 列表 [(后端, 方式, 用时, 表格数, 表格数一致的页比例, 形状一致比例, 单元格召回率)]
+    """
+    with open(pdf_path, 'rb') as pdf_file:
+        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        total_pages = len(pdf_reader.pages)
+        fingerprint = pdf_fingerprint(pdf_reader)
+    pages = range(1, total_pages + 1)
+    
+    def run(backend, method, hints):
+        document = backend.open_document(pdf_path, method=method, **hints)
+        start_time = time.perf_counter()
+        try:
+            tables = [df for df in document.extract(pages) if not df.empty]
+        finally:
+            document.close()
+        return time.perf_counter() - start_time, tables
+    
+    results = []
+    with tempfile.TemporaryDirectory() as template_dir:
+        registry = TemplateRegistry(template_dir)
+        for backend_mode in backends:
+            try:
+                backend = get_backend(backend_mode)
+            except RuntimeError as e:
+                print(f"{backend_mode}: {str(e)}")
+                continue
+            _, tables = run(backend, METHOD_AUTO, {})
+            registry.save_from_run(backend_mode, pdf_path, [table_layout(df) for df in tables])
+            template = registry.match(fingerprint)
+            if template is None or template["name"] != backend_mode:
+                print(f"{backend_mode}: 无法生成或匹配版式模板")
+                continue
+            method, hints = template_options(template)
+            
+            seconds, tables = run(backend, METHOD_AUTO, {})
+            reference = {}
+            for df in tables:
+                reference.setdefault(df.attrs["page"], []).append(table_cell_texts(df))
+            results.append((backend_mode, METHOD_AUTO, seconds, len(tables), 1.0, 1.0, 1.0))
+            
+            seconds, tables = run(backend, method, hints)
+            candidate = {}
+            for df in tables:
+                candidate.setdefault(df.attrs["page"], []).append(table_cell_texts(df))
+            results.append((backend_mode, f"模板({method})", seconds, len(tables))
+                           + compare_tables(reference, candidate))
+    
+    print(f"\n=== 版式模板对比 ({total_pages}页) ===")
+    print(f"{'后端':<12} {'方式':<16} {'用时(秒)':<10} {'表格数':<8} {'表格数一致':<10} {'形状一致':<10} {'单元格召回':<10}")
+    print("-" * 80)
+    for backend_mode, label, seconds, table_count, count_match, shape_match, recall in results:
+        print(f"{backend_mode:<12} {label:<16} {seconds:<10.2f} {table_count:<8} {count_match:<10.1%} "
+              f"{shape_match:<10.1%} {recall:<10.1%}")
+    
+    return results
+
+def benchmark_batch_subsetting(page_count=5000, batch_size=50, sample_batches=4,
+                               backends=(BACKEND_JVM, BACKEND_PDFPLUMBER, BACKEND_SUBPROCESS)):
+    """
+    比较大文件的批次直接提取源文件与先拆分为子文档（见 pdf_subsetting）的每批次用时
+    
+    在固定种子生成的page_count页合成PDF（见 synthetic_pdf）中均匀抽取sample_batches个批次，
+    每个后端先预热一次，再对每个批次交替运行两种方式（线程引擎的process_batch，每个批次打开一次文档）；
+    拆分方式的用时包括写子文档的时间，另外单独列出拆分器读取源文件的一次性开销；
+    打开文档的用时取自批次的open_document时间段（tabula加载文档，subprocess模式下为0，解析在每次调用的java中）
+    
+    返回:
+    - 字典 {后端: (直接提取的平均每批次用时, 拆分后的平均每批次用时, 平均拆分用时,
+                  直接提取的平均打开用时, 拆分后的平均打开用时, 两种方式的表格数是否一致)}
+    """
+    from synthetic_pdf import write_pdf, PAGE_KINDS
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        pdf_path = os.path.join(work_dir, f"synthetic_{page_count}.pdf")
+        write_pdf(pdf_path, page_count, PAGE_KINDS)
+        
+        start_time = time.perf_counter()
+        splitter = BatchSplitter(pdf_path, work_dir)
+        splitter.discard(splitter.write_subset([1]))
+        load_seconds = time.perf_counter() - start_time
+        
+        step = page_count // sample_batches
+        starts = [idx * step + 1 for idx in range(sample_batches)]
+        try:
+            for backend in backends:
+                try:
+                    get_backend(backend).start()
+                except Exception as e:
+                    print(f"跳过 {backend}: {str(e)}")
+                    continue
+                # 预热：启动JVM、加载类和即时编译
+                process_batch((pdf_path, 1, 2, backend))
+                direct_times, subset_times, split_times, direct_opens, subset_opens = [], [], [], [], []
+                consistent = True
+                for start_page in starts:
+                    end_page = min(start_page + batch_size - 1, page_count)
+                    # 记录时间段，以便统计打开文档的用时
+                    batch = (pdf_path, start_page, end_page, backend, False, None, None, None, None, None, True)
+                    
+                    batch_start = time.perf_counter()
+                    direct = process_batch(batch)
+                    direct_times.append(time.perf_counter() - batch_start)
+                    direct_opens.append(sum(item["dur"] for item in direct[4] if item["name"] == "open_document"))
+                    
+                    batch_start = time.perf_counter()
+                    subset_path = splitter.write_subset(list(range(start_page, end_page + 1)))
+                    split_times.append(time.perf_counter() - batch_start)
+                    subset = process_batch(batch[:9] + (subset_path, True))
+                    subset_times.append(time.perf_counter() - batch_start)
+                    subset_opens.append(sum(item["dur"] for item in subset[4] if item["name"] == "open_document"))
+                    splitter.discard(subset_path)
+                    consistent = consistent and direct[1] == subset[1]
+                results[backend] = (sum(direct_times) / len(direct_times), sum(subset_times) / len(subset_times),
+                                    sum(split_times) / len(split_times), sum(direct_opens) / len(direct_opens),
+                                    sum(subset_opens) / len(subset_opens), consistent)
+        finally:
+            splitter.close()
+    
+    print(f"\n=== 按批次拆分PDF ({page_count}页合成PDF, 每批次{batch_size}页, 抽取{sample_batches}个批次, "
+          f"拆分器读取源文件 {load_seconds:.2f}秒) ===")
+    print(f"{'后端':<12} {'直接提取(秒/批次)':<18} {'拆分后(秒/批次)':<16} {'其中拆分(秒)':<14} "
+          f"{'打开文档(直接/拆分)':<20} {'加速比':<8} {'表格数一致':<10}")
+    print("-" * 110)
+    for backend, (direct_seconds, subset_seconds, split_seconds, direct_open, subset_open, consistent) in results.items():
+        opens = f"{direct_open:.3f}/{subset_open:.3f}"
+        print(f"{backend:<12} {direct_seconds:<18.3f} {subset_seconds:<16.3f} {split_seconds:<14.3f} "
+              f"{opens:<20} {direct_seconds / subset_seconds:<8.2f} {str(consistent):<10}")
+    
+    return results
+
+def benchmark_tracing(pdf_path, runs=2):
+    """
+    比较记录阶段计时（trace）与不记录时的完整转换用时，并显示用时最多的阶段
+
+    两种方式交替运行runs次（先运行一次预热JVM），取中位数；不使用缓存和版式模板
+    
+    返回:
+    - 字典 {"plain": 不记录的用时, "traced": 记录的用时, "spans": 时间段数, "summary": 阶段汇总}
+    """
+    import statistics
+    
+    def convert(trace, output_dir):
+        start_time = time.perf_counter()
+        convert_pdf_to_excel(pdf_path, os.path.join(output_dir, "trace.xlsx"), lambda *args: None,
+                             {"cancel": False}, use_cache=False, use_templates=False, trace=trace)
+        return time.perf_counter() - start_time
+    
+    plain_times, traced_times = [], []
+    trace = None
+    with tempfile.TemporaryDirectory() as output_dir:
+        convert(None, output_dir)
+        for _ in range(runs):
+            plain_times.append(convert(None, output_dir))
+            trace = ConversionTrace(pdf_path)
+            traced_times.append(convert(trace, output_dir))
+    
+    plain, traced = statistics.median(plain_times), statistics.median(traced_times)
+    print(f"\n=== 阶段计时 ===")
+    print(f"不记录: {plain:.2f}秒，记录: {traced:.2f}秒 ({(traced / plain - 1):+.1%})，"
+          f"时间段数: {len(trace.spans)}")
+    print(trace.format_summary())
+    
+    return {"plain": plain, "traced": traced, "spans": len(trace.spans), "summary": trace.summary()}
+
 def run_performance_tests(pdf_path):
     """运行不同配置的性能测试"""
     if not os.path.exists(pdf_path):
@@ -117,6 +1175,16 @@ def run_performance_tests(pdf_path):
         )
         results.append((f"优化方法 (批次={batch_size})", batch_size, workers, time_opt, tables_opt))
     
+    # 测试进程池引擎
+    process_workers = choose_worker_count(ENGINE_PROCESS)
+    time_proc, tables_proc = test_performance(
+        pdf_path,
+        method="process",
+        batch_size=50,
+        workers=process_workers
+    )
+    results.append(("进程池 (批次=50)", 50, process_workers, time_proc, tables_proc))
+    
     # 显示性能对比
     print("\n=== 性能测试结果 ===")
     print(f"{'方法':<25} {'批次大小':<10} {'线程数':<10} {'处理时间(秒)':<15} {'加速比':<10} {'表格数':<10}")
@@ -126,6 +1194,58 @@ def run_performance_tests(pdf_path):
     for method, batch_size, workers, proc_time, tables in results:
         speedup = baseline_time / proc_time if proc_time > 0 else 0
         print(f"{method:<25} {batch_size:<10} {workers:<10} {proc_time:<15.2f} {speedup:<10.2f} {tables:<10}")
+    
+    # 比较提取后端
+    print()
+    benchmark_backends(pdf_path)
+    
+    # 比较tabula与pdfplumber后端
+    benchmark_extraction_backends(pdf_path)
+    
+    # 比较提取方式（lattice/stream逐页选择）
+    benchmark_extraction_methods(pdf_path)
+    
+    # 版式模板
+    benchmark_layout_templates(pdf_path)
+    
+    # 比较批次调度方式
+    benchmark_scheduling(pdf_path)
+    
+    # 评估无表格页预筛选
+    benchmark_table_filter(pdf_path)
+    
+    # 冷启动时间
+    benchmark_startup()
+    
+    # 取消延迟
+    benchmark_cancellation(pdf_path)
+    
+    # 内存管理开销
+    benchmark_memory_control()
+    
+    # 并发批次的输出收集
+    benchmark_output_capture()
+    
+    # 大文件按批次拆分
+    benchmark_batch_subsetting()
+    
+    # 界面进度传递
+    benchmark_progress_channel()
+    
+    # 阶段计时的开销和各阶段用时
+    benchmark_tracing(pdf_path)
+    
+    # DataFrame清洗
+    benchmark_dataframe_cleaning()
+    
+    # 跨页表格拼接
+    benchmark_stitching(pdf_path)
+    
+    # 输出格式
+    benchmark_output_formats()
+    
+    # 比较Excel保存方式
+    benchmark_excel_writers()
 
 if __name__ == "__main__":
     # 获取PDF文件路径
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+表格清洗的回归测试（python -m pytest test_table_cleaning.py）
+"""
+
+import pandas as pd
+
+from table_cleaning import optimize_dataframe, parse_numeric, coerce_row
+
+# 16~19位的身份证号、银行卡号，转换为float64会被舍入
+LONG_NUMBERS = ["110101199003079999", "6222021234567890123", "4392260012345678", "62148301234567890"]
+
+def test_long_digit_strings_stay_text():
+    df = optimize_dataframe(pd.DataFrame({"账号": LONG_NUMBERS, "金额": ["1,234.50", "(20.00)", "3", "4.25"]}))
+    assert list(df["账号"]) == LONG_NUMBERS
+    assert pd.api.types.is_numeric_dtype(df["金额"])
+    assert list(df["金额"]) == [1234.5, -20.0, 3.0, 4.25]
+
+def test_long_digit_strings_in_large_column_stay_text():
+    # 行数足够时抽样判断，样本之外的超长数字串也不能被转换
+    values = [str(1000 + idx) for idx in range(199)] + ["6222021234567890123"]
+    df = optimize_dataframe(pd.DataFrame({"编号": values}))
+    assert df["编号"].iloc[-1] == "6222021234567890123"
+
+def test_fifteen_significant_digits_are_numeric():
+    parsed = parse_numeric(pd.Series(["123456789012345", "-0.00012345678901234", "1,234,567,890.12345"]))
+    assert parsed is not None
+    numbers, is_percent = parsed
+    assert not is_percent
+    assert numbers.iloc[0] == 123456789012345
+
+def test_long_digit_strings_rejected():
+    for value in LONG_NUMBERS + ["1234567890123456", "1,234,567,890,123,456", "12345678901234.56"]:
+        assert parse_numeric(pd.Series([value])) is None, value
+
+def test_coerce_row_keeps_long_numbers():
+    df = optimize_dataframe(pd.DataFrame({"金额": ["1", "2", "3"]}))
+    assert coerce_row(["6222021234567890123"], df) == ["6222021234567890123"]
+    assert coerce_row(["7"], df) == [7]
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+跨页表格拼接的回归测试（python -m pytest test_table_stitching.py）
+"""
+
+import pandas as pd
+
+from table_stitching import TableStitcher, STITCH_NEW, STITCH_REPEATED_HEADER, STITCH_HEADERLESS
+
+def make_table(page, columns=("日期", "摘要", "金额"), lefts=(30.0, 120.0, 400.0)):
+    df = pd.DataFrame([["2024-01-01", "收入", "100"]], columns=list(columns))
+    df.attrs["page"] = page
+    df.attrs["column_lefts"] = list(lefts)
+    return df
+
+def test_paged_tables_after_pageless_table():
+    # subprocess模式的多页批次没有页码，紧接着的有页码的表格不能与之比较页码
+    stitcher = TableStitcher()
+    assert stitcher.classify(make_table(None)) is STITCH_NEW
+    assert stitcher.classify(make_table(5)) is STITCH_NEW
+    assert stitcher.classify(make_table(6)) == STITCH_REPEATED_HEADER
+    assert stitcher.classify(make_table(7, columns=("2024-01-02", "支出", "50"))) == STITCH_HEADERLESS
+
+def test_pageless_tables_never_stitch():
+    stitcher = TableStitcher()
+    assert stitcher.classify(make_table(3)) is STITCH_NEW
+    assert stitcher.classify(make_table(None)) is STITCH_NEW
+    assert stitcher.classify(make_table(None)) is STITCH_NEW
+    assert stitcher.classify(make_table(4)) is STITCH_NEW